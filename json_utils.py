@@ -0,0 +1,68 @@
+"""
+JSON encoding shared by the strategy modules
+
+dumps_json/loads_json use orjson when it is installed and the stdlib json
+module otherwise. Saved files carry the same values either way: non-string
+keys become strings, numpy values become numbers/lists, other unknown types
+(Timestamp, Decimal, ...) are written as str(), and NaN/inf are kept as the
+stdlib's NaN/Infinity literals rather than orjson's null.
+"""
+
+import json
+import math
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+if orjson is not None:
+    # Datetimes go through _default as well, so they are written as str() like the stdlib path
+    _ORJSON_OPTIONS = (orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+                       | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+
+
+def _default(obj):
+    """Encoder fallback: numpy scalars/arrays as Python values, anything else as str()"""
+    kind = getattr(getattr(obj, 'dtype', None), 'kind', None)
+    # datetime64/timedelta64 .tolist() can give bare integers; str() keeps them readable
+    if kind is not None and kind not in 'mM' and hasattr(obj, 'tolist'):
+        return obj.tolist()
+    return str(obj)
+
+
+def _has_non_finite(obj) -> bool:
+    """Whether obj holds a NaN or infinite float anywhere (numpy values included)"""
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_has_non_finite(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_non_finite(value) for value in obj)
+    if getattr(getattr(obj, 'dtype', None), 'kind', None) in ('f', 'c'):
+        return _has_non_finite(obj.tolist())
+    return False
+
+
+def dumps_json(obj) -> bytes:
+    """Serialize obj as indented JSON bytes (orjson when available)"""
+    if orjson is not None:
+        try:
+            encoded = orjson.dumps(obj, option=_ORJSON_OPTIONS, default=_default)
+        except orjson.JSONEncodeError:
+            pass  # e.g. integers beyond 64 bits; the stdlib encoder handles them
+        else:
+            # orjson writes NaN/inf as null; only then is the slower check needed
+            if b'null' not in encoded or not _has_non_finite(obj):
+                return encoded
+    return json.dumps(obj, indent=2, ensure_ascii=False, default=_default).encode('utf-8')
+
+
+def loads_json(data: bytes):
+    """Parse JSON bytes (orjson when available)"""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # NaN/Infinity literals are accepted by the stdlib parser only
+    return json.loads(data)
@@ -0,0 +1,105 @@
+"""
+Optimizer Kernels
+Compiled reductions used by StrategyOptimizer when scoring backtests
+
+numba is optional: without it the kernels run as plain Python over the same
+float64 arrays, so results do not depend on whether it is installed.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:  # numba is optional; kernels run as plain Python
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def trade_pair_stats(buys, sells):
+    """
+    One pass over paired BUY/SELL fill prices
+
+    A pair with a positive price difference is a win; every other pair
+    (including break-even) counts as a loss of abs(difference).
+
+    Returns:
+        (wins, n_losses, sum_profit, sum_loss)
+    """
+    wins = 0
+    n_losses = 0
+    sum_profit = 0.0
+    sum_loss = 0.0
+    for i in range(buys.shape[0]):
+        profit = sells[i] - buys[i]
+        if profit > 0:
+            wins += 1
+            sum_profit += profit
+        else:
+            n_losses += 1
+            sum_loss += abs(profit)
+    return wins, n_losses, sum_profit, sum_loss
+
+
+@njit(cache=True, error_model='numpy')
+def equity_stats(equity):
+    """
+    Annualized Sharpe ratio and max drawdown (%) of an equity curve in one pass
+
+    Matches the array formulas: simple returns with NaN returns dropped,
+    sample std (ddof=1), sqrt(252) annualization; drawdown against the
+    running peak. A NaN in the curve makes the drawdown NaN, as
+    np.maximum.accumulate would.
+
+    Returns:
+        (sharpe_ratio, max_drawdown)
+    """
+    n_returns = 0
+    mean = 0.0
+    m2 = 0.0
+    peak = equity[0]
+    worst = 0.0
+    has_nan = np.isnan(peak)
+    for i in range(1, equity.shape[0]):
+        value = equity[i]
+        if np.isnan(value):
+            has_nan = True
+        else:
+            ret = value / equity[i - 1] - 1
+            if not np.isnan(ret):
+                # Welford update of the return mean and squared deviations
+                n_returns += 1
+                delta = ret - mean
+                mean += delta / n_returns
+                m2 += delta * (ret - mean)
+            if value > peak:
+                peak = value
+            drawdown = (value - peak) / peak
+            if drawdown < worst:
+                worst = drawdown
+
+    sharpe_ratio = 0.0
+    if n_returns > 1:
+        std = np.sqrt(m2 / (n_returns - 1))
+        if std > 0:
+            sharpe_ratio = mean / std * np.sqrt(252.0)
+    max_drawdown = np.nan if has_nan else abs(worst) * 100
+    return sharpe_ratio, max_drawdown
+
+
+def warmup():
+    """
+    Compile (or load from numba's on-disk cache) every kernel once
+
+    Called before a worker pool starts: forked workers inherit the compiled
+    code, and spawned workers find it in the cache the parent just wrote,
+    so no worker pays the JIT cost inside its first evaluation.
+    """
+    unit = np.ones(2)
+    trade_pair_stats(unit, unit)
+    equity_stats(unit)
@@ -3,11 +3,14 @@
 Comprehensive test of all features
 """
 
+import os
+from contextlib import redirect_stdout
 from datetime import datetime, timedelta
 from short_term_strategy import ShortTermStrategy
 from simple_strategy import SimpleMeanReversionStrategy
-from ml_strategy import MLTradingStrategy
-from optimized_ml_strategy import OptimizedMLStrategy
+import smoke_cache
+
+smoke_cache.install()  # Same-day re-runs read downloads from data_cache/
 
 print("=" * 80)
 print("COMPREHENSIVE FEATURE TEST")
@@ -16,13 +19,43 @@ print("=" * 80)
 tests_passed = 0
 tests_failed = 0
 
+# One batched download for every symbol below, sized for its longest window
+END = datetime.now()
+WINDOWS = {'SPY': 365, 'AAPL': 30, 'BTC-USD': 30, 'QQQ': 60, 'TSLA': 45}
+
+
+def prefetch(windows, end):
+    """Download all symbols in one yf.download call; {} if it fails (strategies then fetch their own)"""
+    try:
+        import yfinance as yf
+        start = end - timedelta(days=int(max(windows.values()) * 1.5))
+        frames = yf.download(list(windows), start=start, end=end, group_by='ticker',
+                             progress=False, threads=True)
+        return {symbol: frames[symbol].dropna(how='all') for symbol in windows
+                if symbol in frames.columns.get_level_values(0)}
+    except Exception as e:
+        print(f"   (batch download failed, falling back to per-strategy downloads: {str(e)[:80]})")
+        return {}
+
+
+def prefetched(symbol, days):
+    """Prefetched rows for the buffered window a strategy would download itself, or None"""
+    data = PREFETCHED.get(symbol)
+    if data is None or data.empty:
+        return None
+    return data.loc[END - timedelta(days=int(days * 1.5)):]
+
+
+print("\nPrefetching market data...")
+PREFETCHED = prefetch(WINDOWS, END)
+
 # Test 1: Short-Term Strategy (2 weeks)
 print("\n1. Short-Term Strategy (21 calendar days = ~14 trading days)...")
 try:
     strategy = ShortTermStrategy('SPY')
-    end = datetime.now()
+    end = END
     start = end - timedelta(days=21)
-    data, trades, final, equity = strategy.backtest(start, end)
+    data, trades, final, equity = strategy.backtest(start, end, data=prefetched('SPY', 21))
     print(f"   ✅ PASSED: {len(data)} trading days, {len(trades)} trades")
     tests_passed += 1
 except Exception as e:
@@ -33,9 +66,9 @@ except Exception as e:
 print("\n2. Short-Term Strategy on AAPL (30 calendar days)...")
 try:
     strategy = ShortTermStrategy('AAPL')
-    end = datetime.now()
+    end = END
     start = end - timedelta(days=30)
-    data, trades, final, equity = strategy.backtest(start, end)
+    data, trades, final, equity = strategy.backtest(start, end, data=prefetched('AAPL', 30))
     print(f"   ✅ PASSED: {len(data)} trading days, {len(trades)} trades")
     tests_passed += 1
 except Exception as e:
@@ -46,9 +79,9 @@ except Exception as e:
 print("\n3. Simple Mean Reversion (45 calendar days)...")
 try:
     strategy = SimpleMeanReversionStrategy('SPY', lookback=10)
-    end = datetime.now()
+    end = END
     start = end - timedelta(days=45)
-    data, trades, final, equity = strategy.backtest(start, end)
+    data, trades, final, equity = strategy.backtest(start, end, data=prefetched('SPY', 45))
     print(f"   ✅ PASSED: {len(data)} trading days, {len(trades)} trades")
     tests_passed += 1
 except Exception as e:
@@ -58,24 +91,18 @@ except Exception as e:
 # Test 4: ML Strategy (130 calendar days = ~90 trading days)
 print("\n4. ML Strategy (130 calendar days, quiet mode)...")
 try:
+    from ml_strategy import MLTradingStrategy  # Deferred: loads the ML stack
     strategy = MLTradingStrategy('SPY', lookback=30, prediction_horizon=3)
-    end = datetime.now()
+    end = END
     start = end - timedelta(days=130)
     
-    # Redirect output to suppress prints
-    import sys
-    import io
-    old_stdout = sys.stdout
-    sys.stdout = io.StringIO()
+    # Discard the backtest's progress prints; stdout is restored even if it raises
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        df, trades, final, equity = strategy.backtest(start, end, data=prefetched('SPY', 130))
     
-    df, trades, final, equity = strategy.backtest(start, end)
-    
-    sys.stdout = old_stdout
     print(f"   ✅ PASSED: {len(trades)} trades")
     tests_passed += 1
 except Exception as e:
-    import sys
-    sys.stdout = old_stdout
     print(f"   ❌ FAILED: {str(e)[:80]}")
     tests_failed += 1
 
@@ -83,9 +110,9 @@ except Exception as e:
 print("\n5. Short-Term on BTC-USD (30 calendar days)...")
 try:
     strategy = ShortTermStrategy('BTC-USD')
-    end = datetime.now()
+    end = END
     start = end - timedelta(days=30)
-    data, trades, final, equity = strategy.backtest(start, end)
+    data, trades, final, equity = strategy.backtest(start, end, data=prefetched('BTC-USD', 30))
     print(f"   ✅ PASSED: {len(data)} trading days, {len(trades)} trades")
     tests_passed += 1
 except Exception as e:
@@ -96,9 +123,9 @@ except Exception as e:
 print("\n6. Simple Strategy on QQQ (60 calendar days)...")
 try:
     strategy = SimpleMeanReversionStrategy('QQQ', lookback=15)
-    end = datetime.now()
+    end = END
     start = end - timedelta(days=60)
-    data, trades, final, equity = strategy.backtest(start, end)
+    data, trades, final, equity = strategy.backtest(start, end, data=prefetched('QQQ', 60))
     print(f"   ✅ PASSED: {len(data)} trading days, {len(trades)} trades")
     tests_passed += 1
 except Exception as e:
@@ -109,9 +136,9 @@ except Exception as e:
 print("\n7. Short-Term on TSLA (45 calendar days)...")
 try:
     strategy = ShortTermStrategy('TSLA')
-    end = datetime.now()
+    end = END
     start = end - timedelta(days=45)
-    data, trades, final, equity = strategy.backtest(start, end)
+    data, trades, final, equity = strategy.backtest(start, end, data=prefetched('TSLA', 45))
     print(f"   ✅ PASSED: {len(data)} trading days, {len(trades)} trades")
     tests_passed += 1
 except Exception as e:
@@ -121,23 +148,18 @@ except Exception as e:
 # Test 8: Optimized Strategy (longer period)
 print("\n8. Optimized Ensemble (365 calendar days, 3 trials, quiet)...")
 try:
+    from optimized_ml_strategy import OptimizedMLStrategy  # Deferred: loads the ML stack
     strategy = OptimizedMLStrategy('SPY', lookback=40, prediction_horizon=5)
-    end = datetime.now()
+    end = END
     start = end - timedelta(days=365)
     
-    import sys
-    import io
-    old_stdout = sys.stdout
-    sys.stdout = io.StringIO()
-    
-    df, trades, final, equity = strategy.backtest(start, end, optimize_params=True, n_trials=3)
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        df, trades, final, equity = strategy.backtest(start, end, optimize_params=True, n_trials=3,
+                                                     data=prefetched('SPY', 365))
     
-    sys.stdout = old_stdout
     print(f"   ✅ PASSED: {len(trades)} trades")
     tests_passed += 1
 except Exception as e:
-    import sys
-    sys.stdout = old_stdout
     print(f"   ❌ FAILED: {str(e)[:80]}")
     tests_failed += 1
 
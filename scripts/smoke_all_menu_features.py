@@ -13,15 +13,15 @@ print('=' * 60)
 print('COMPREHENSIVE MENU FEATURE TESTING')
 print('=' * 60)
 
-# Import all required modules
-from advanced_trading_interface import AdvancedTradingInterface, Portfolio
-from ml_strategy import MLTradingStrategy
+# Lightweight modules only; ML and interface modules are imported by the tests that use them
 from simple_strategy import SimpleMeanReversionStrategy
-from optimized_ml_strategy import OptimizedMLStrategy
-from short_term_strategy import ShortTermStrategy
 from strategy_manager import StrategyManager, StrategyConfig
+import smoke_cache
+
+smoke_cache.install()  # Same-day re-runs read downloads from data_cache/
 
 test_results = []
+NOW = datetime.now()  # One reference time for every backtest window below
 
 def test_feature(name, func):
     """Helper to test a feature"""
@@ -40,7 +40,7 @@ def test_feature(name, func):
 def test_single_strategy():
     """Test running a single strategy backtest"""
     strategy = SimpleMeanReversionStrategy('SPY', initial_capital=10000)
-    end_date = datetime.now()
+    end_date = NOW
     start_date = end_date - timedelta(days=60)
     data, trades, final_value = strategy.backtest(start_date, end_date)
     assert final_value > 0
@@ -53,12 +53,13 @@ test_feature('1. Single Strategy Backtest', test_single_strategy)
 # Test 2: Multiple Strategy Comparison
 def test_multiple_strategies():
     """Test comparing multiple strategies"""
+    from ml_strategy import MLTradingStrategy
     strategies = [
         ('Simple', SimpleMeanReversionStrategy('SPY', 10000)),
         ('ML', MLTradingStrategy('SPY', 10000)),
     ]
     
-    end_date = datetime.now()
+    end_date = NOW
     start_date = end_date - timedelta(days=90)
     
     results = []
@@ -79,6 +80,7 @@ test_feature('2. Multiple Strategy Comparison', test_multiple_strategies)
 # Test 3: Portfolio Creation
 def test_portfolio_creation():
     """Test creating a portfolio"""
+    from advanced_trading_interface import Portfolio
     portfolio = Portfolio('Test_Portfolio', 100000, 0.15)
     portfolio.strategy_allocations = {
         'AAPL': {'allocation': 0.5, 'strategy_type': 'ml'},
@@ -128,7 +130,7 @@ def test_asset_types():
         ('Crypto', 'BTC-USD')
     ]
     
-    end_date = datetime.now()
+    end_date = NOW
     start_date = end_date - timedelta(days=60)
     
     results = []
@@ -147,7 +149,7 @@ test_feature('5. Different Asset Types', test_asset_types)
 def test_time_periods():
     """Test different backtest time periods"""
     strategy = SimpleMeanReversionStrategy('SPY', 10000)
-    end_date = datetime.now()
+    end_date = NOW
     
     periods = [
         ('1 week', 7),
@@ -172,10 +174,11 @@ test_feature('6. Multiple Time Periods', test_time_periods)
 # Test 7: Technical Indicators
 def test_indicators():
     """Test technical indicator calculation"""
+    from ml_strategy import MLTradingStrategy
     strategy = MLTradingStrategy('SPY', 10000)
     
     import yfinance as yf
-    end_date = datetime.now()
+    end_date = NOW
     start_date = end_date - timedelta(days=90)
     
     ticker = yf.Ticker('SPY')
@@ -194,8 +197,9 @@ test_feature('7. Technical Indicators', test_indicators)
 # Test 8: ML Model Training
 def test_ml_training():
     """Test ML model training"""
+    from ml_strategy import MLTradingStrategy
     strategy = MLTradingStrategy('SPY', 10000)
-    end_date = datetime.now()
+    end_date = NOW
     start_date = end_date - timedelta(days=180)
     
     # This will train the model internally
@@ -212,6 +216,7 @@ test_feature('8. ML Model Training', test_ml_training)
 # Test 9: Portfolio Management Features
 def test_portfolio_management():
     """Test portfolio management operations"""
+    from advanced_trading_interface import AdvancedTradingInterface, Portfolio
     interface = AdvancedTradingInterface()
     
     # Create portfolio
@@ -0,0 +1,61 @@
+"""
+Disk cache for yfinance downloads made by the smoke scripts
+
+Re-running a smoke script on the same day reads each download back from
+data_cache/ (the directory DataManager already uses) instead of repeating the
+HTTPS request. Entries are pickled DataFrames keyed by tickers, dates and
+options, and expire after a day like DataManager's CSV cache.
+"""
+
+import hashlib
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+CACHE_DIR = Path("data_cache")
+MAX_AGE = timedelta(days=1)
+
+
+def _day(value) -> str:
+    """Date part of a datetime/str/None argument (downloads are daily bars)"""
+    if value is None:
+        return ''
+    return pd.Timestamp(value).strftime('%Y-%m-%d')
+
+
+def cache_path(tickers, start=None, end=None, **kwargs) -> Path:
+    """Cache file for one yf.download call"""
+    symbols = [tickers] if isinstance(tickers, str) else list(tickers)
+    options = sorted((k, repr(v)) for k, v in kwargs.items() if k not in ('progress', 'threads'))
+    digest = hashlib.sha1(repr(options).encode()).hexdigest()[:10]
+    name = f"yf_{'-'.join(symbols)}_{_day(start)}_{_day(end)}_{digest}.pkl"
+    return CACHE_DIR / name
+
+
+def install():
+    """Route yfinance.download through the disk cache; returns False if yfinance is missing"""
+    try:
+        import yfinance
+    except ImportError:
+        return False
+    if getattr(yfinance.download, '_smoke_cached', False):
+        return True
+    download = yfinance.download
+
+    def cached_download(tickers, start=None, end=None, **kwargs):
+        path = cache_path(tickers, start, end, **kwargs)
+        if path.exists() and datetime.now() - datetime.fromtimestamp(path.stat().st_mtime) < MAX_AGE:
+            try:
+                return pd.read_pickle(path)
+            except Exception:
+                pass  # Unreadable entry: download again and overwrite it
+        data = download(tickers, start=start, end=end, **kwargs)
+        if data is not None and len(data) > 0:
+            CACHE_DIR.mkdir(exist_ok=True)
+            data.to_pickle(path)
+        return data
+
+    cached_download._smoke_cached = True
+    yfinance.download = cached_download
+    return True
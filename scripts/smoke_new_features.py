@@ -4,6 +4,7 @@ Comprehensive test of all newly implemented features
 """
 import os
 import json
+from contextlib import redirect_stdout
 from datetime import datetime, timedelta
 
 print("=" * 80)
@@ -56,11 +57,8 @@ try:
         end = datetime.now()
         start = end - timedelta(days=45)
         
-        import sys, io
-        old_stdout = sys.stdout
-        sys.stdout = io.StringIO()
-        data, trades, final, equity = strategy.backtest(start, end)
-        sys.stdout = old_stdout
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            data, trades, final, equity = strategy.backtest(start, end)
         
         results.append({
             'symbol': sym,
@@ -95,11 +93,8 @@ try:
             end = datetime.now()
             start = end - timedelta(days=45)
             
-            import sys, io
-            old_stdout = sys.stdout
-            sys.stdout = io.StringIO()
-            data, trades, final, equity = strategy.backtest(start, end)
-            sys.stdout = old_stdout
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                data, trades, final, equity = strategy.backtest(start, end)
             
             results.append({
                 'symbol': sym,
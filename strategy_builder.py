@@ -1,14 +1,40 @@
 """
 Custom Strategy Builder - Create, test, and export custom trading strategies
 """
+import copy
+import hashlib
+import functools
+import importlib.util
 import json
 import os
 import re
 from datetime import datetime, timedelta
+from pathlib import Path
+from string import Template
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Any
 
+from json_utils import dumps_json
+
+
+def strategy_fingerprint(strategy: Dict[str, Any]) -> str:
+    """
+    Content fingerprint of a strategy definition, for cache keys and export tracking
+    
+    Hashes canonical JSON (sorted keys, compact) with BLAKE2b. The stdlib encoder
+    is used deliberately so fingerprints do not depend on whether orjson is installed.
+    """
+    canonical = json.dumps(strategy, sort_keys=True, separators=(',', ':'),
+                           ensure_ascii=False, default=str)
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
+
+
+# Characters not allowed in exported identifiers
+_SANITIZE_RE = re.compile(r'[^a-zA-Z0-9_]')
+
+
+@functools.lru_cache(maxsize=256)
 def sanitize_identifier(name: str) -> str:
     """
     Sanitize a string to be a valid Python identifier
@@ -25,7 +51,7 @@ def sanitize_identifier(name: str) -> str:
         Valid Python identifier
     """
     # Remove spaces and special chars, keep only alphanumeric and underscore
-    cleaned = re.sub(r'[^a-zA-Z0-9_]', '', name.replace(' ', '_'))
+    cleaned = _SANITIZE_RE.sub('', name.replace(' ', '_'))
     
     # Ensure doesn't start with digit
     if cleaned and cleaned[0].isdigit():
@@ -51,168 +77,325 @@ def sanitize_export_basename(name: str, timestamp: str) -> str:
     Returns:
         Safe filename base like 'export_MyStrategy_20251225_120000'
     """
+    # ASCII identifiers are already clean; skip the regex pass
+    if name.isascii() and name.isidentifier():
+        return f"export_{name}_{timestamp}"
     sanitized_name = sanitize_identifier(name)
     return f"export_{sanitized_name}_{timestamp}"
 
 
-class StrategyBuilder:
-    """Interactive strategy builder with export capabilities"""
+def _rules_block(rules: List[str], indent: str) -> str:
+    """Render rules as indented comment lines for the code templates"""
+    return '\n'.join(f'{indent}# {rule}' for rule in rules)
+
+
+def _template_fields(strategy: Dict[str, Any], name: str, now: datetime = None) -> Dict[str, Any]:
+    """Substitution values shared by the Python and LEAN code templates"""
+    parameters = strategy['parameters']
+    risk = strategy['risk_management']
+    return {
+        'name': name,
+        'strategy_name': strategy['name'],
+        'description': strategy['description'],
+        'type': strategy['type'],
+        'created': strategy.get('created', 'N/A'),
+        'generated_at': (now or datetime.now()).strftime("%Y-%m-%d %H:%M:%S"),
+        'indicators': strategy['indicators'],
+        'indicator_names': ', '.join(strategy['indicators']),
+        'lookback': parameters.get('lookback_period', 20),
+        'holding_period': parameters.get('holding_period', 5),
+        'position_size_pct': risk.get('position_size_pct', 10),
+        'stop_loss_pct': risk.get('stop_loss_pct', 5),
+        'take_profit_pct': risk.get('take_profit_pct', 15),
+        'max_positions': risk.get('max_positions', 5),
+        'entry_rules': _rules_block(strategy['entry_rules'], ' ' * 8),
+        'exit_rules': _rules_block(strategy['exit_rules'], ' ' * 8),
+        'kernel_entry_rules': _rules_block(strategy['entry_rules'], ' ' * 4),
+        'kernel_exit_rules': _rules_block(strategy['exit_rules'], ' ' * 4),
+        'simulate_kernel': _SIMULATE_KERNEL_SOURCE,
+        'aot_import': '',
+    }
+
+
+# Position simulation kernel shared by the JIT module and the AOT build file
+_SIMULATE_KERNEL_SOURCE = '''def _simulate(close, entry_sig, exit_sig, stop_pct, tp_pct, hold, size_pct, cash0,
+              fractional, min_position_value):
+    """
+    Path-dependent position simulation over plain float64/bool arrays.
     
-    def __init__(self):
-        self.strategies_dir = "custom_strategies"
-        self.exports_dir = "strategy_exports"
-        os.makedirs(self.strategies_dir, exist_ok=True)
-        os.makedirs(self.exports_dir, exist_ok=True)
+    Returns (equity_curve, trade_starts, trade_ends, trade_entry_px,
+    trade_exit_px, trade_shares); trade arrays are trimmed to the trade count.
+    """
+    n = close.shape[0]
+    equity_curve = np.empty(n, dtype=np.float64)
+    trade_starts = np.empty(n, dtype=np.int64)
+    trade_ends = np.empty(n, dtype=np.int64)
+    trade_entry_px = np.empty(n, dtype=np.float64)
+    trade_exit_px = np.empty(n, dtype=np.float64)
+    trade_shares = np.empty(n, dtype=np.float64)
     
-    def create_custom_strategy(self) -> Dict[str, Any]:
-        """Interactive custom strategy creation"""
-        print("\n" + "="*60)
-        print("CUSTOM STRATEGY BUILDER")
-        print("="*60)
-        
-        strategy = {
-            'name': '',
-            'description': '',
-            'type': '',
-            'parameters': {},
-            'indicators': [],
-            'entry_rules': [],
-            'exit_rules': [],
-            'risk_management': {},
-            'created': datetime.now().isoformat()
-        }
+    n_trades = 0
+    cash = cash0
+    horizon = max(hold, 1)
+    
+    idx = 0
+    while idx < n:
+        current_price = close[idx]
         
-        # Basic info
-        strategy['name'] = input("\n[INPUT] Strategy Name: ").strip()
-        strategy['description'] = input("[INPUT] Description: ").strip()
+        # Check entry (fractional share support mirrors sizing.calculate_shares)
+        shares = 0.0
+        if entry_sig[idx] and current_price > 0:
+            position_value = cash * size_pct
+            if position_value > 0:
+                shares = position_value / current_price
+                if not fractional:
+                    shares = np.floor(shares)
+                if shares * current_price < min_position_value:
+                    shares = 0.0
         
-        # Strategy type
-        print("\n🎯 Strategy Type:")
-        print("1. Trend Following")
-        print("2. Mean Reversion")
-        print("3. Momentum")
-        print("4. Breakout")
-        print("5. ML-Based")
-        print("6. Hybrid")
+        if shares <= 0:
+            equity_curve[idx] = cash
+            idx += 1
+            continue
         
-        type_choice = input("\nSelect type (1-6): ").strip()
-        types = {
-            '1': 'trend_following',
-            '2': 'mean_reversion',
-            '3': 'momentum',
-            '4': 'breakout',
-            '5': 'ml_based',
-            '6': 'hybrid'
-        }
-        strategy['type'] = types.get(type_choice, 'custom')
+        cash -= shares * current_price
+        entry_price = current_price
+        equity_curve[idx] = cash + shares * current_price
         
-        # Technical indicators
-        print("\n[INFO] Add Technical Indicators (comma separated):")
-        print("Available: SMA, EMA, RSI, MACD, Bollinger, ATR, Stochastic, Volume, OBV")
-        indicators_input = input("Indicators: ").strip()
-        if indicators_input:
-            strategy['indicators'] = [ind.strip() for ind in indicators_input.split(',')]
+        # Branchless pre-screen of the holding window: first bar hitting the stop,
+        # the target or a rule exit, else the max holding period
+        last = min(idx + horizon, n - 1)
+        tail = close[idx + 1:last + 1]
+        hit = ((tail <= entry_price * (1 - stop_pct))
+               | (tail >= entry_price * (1 + tp_pct))
+               | exit_sig[idx + 1:last + 1])
+        if hit.any():
+            exit_idx = idx + 1 + np.argmax(hit)
+        else:
+            # Max holding period, or the last bar if the data ends first
+            exit_idx = last
         
-        # Parameters
-        print("\n⚙️  Strategy Parameters:")
-        strategy['parameters']['lookback_period'] = int(input("Lookback period (days): ") or "20")
-        strategy['parameters']['holding_period'] = int(input("Max holding period (days): ") or "5")
+        # Track equity while holding, then exit (an entry on the last bar
+        # closes on that same bar)
+        equity_curve[idx + 1:exit_idx] = cash + shares * close[idx + 1:exit_idx]
+        cash += shares * close[exit_idx]
+        trade_starts[n_trades] = idx
+        trade_ends[n_trades] = exit_idx
+        trade_entry_px[n_trades] = entry_price
+        trade_exit_px[n_trades] = close[exit_idx]
+        trade_shares[n_trades] = shares
+        n_trades += 1
+        equity_curve[exit_idx] = cash
+        idx = exit_idx + 1
+    
+    return (equity_curve, trade_starts[:n_trades], trade_ends[:n_trades],
+            trade_entry_px[:n_trades], trade_exit_px[:n_trades], trade_shares[:n_trades])'''
+
+# numba.pycc signature of _simulate for ahead-of-time compilation
+_SIMULATE_AOT_SIGNATURE = ('Tuple((f8[:], i8[:], i8[:], f8[:], f8[:], f8[:]))'
+                           '(f8[:], b1[:], b1[:], f8, f8, i8, f8, f8, b1, f8)')
+
+# Code templates for exported strategies, parsed once at import time.
+# Placeholders use string.Template syntax ($name / ${name}); braces are literal.
+_PYTHON_CLASS_TEMPLATE = Template('''"""
+$strategy_name - $description
+Auto-generated on $generated_at
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    import talib
+    _HAS_TALIB = True
+except ImportError:  # TA-Lib is optional; indicators fall back to pandas
+    talib = None
+    _HAS_TALIB = False
+
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except ImportError:  # numba is optional; the kernel runs as plain Python
+    _HAS_NUMBA = False
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+try:
+    from core_config import PORTFOLIO_CFG
+except ImportError:  # running outside the trader package; use its sizing defaults
+    PORTFOLIO_CFG = None
+
+
+# Windows up to this length use a strided view + one vectorised reduction;
+# longer windows go through pandas' running-sum rolling mean.
+_SMALL_WINDOW = 64
+
+
+def _rolling_mean(arr, window):
+    """Trailing rolling mean with NaN warm-up (pandas rolling(window).mean())"""
+    out = np.full(arr.shape[0], np.nan)
+    if arr.shape[0] < window:
+        return out
+    if window <= _SMALL_WINDOW:
+        out[window - 1:] = sliding_window_view(arr, window).mean(axis=1)
+    else:
+        out[window - 1:] = pd.Series(arr).rolling(window).mean().to_numpy()[window - 1:]
+    return out
+
+
+# fastmath without nnan/ninf: warm-up bars are NaN by design
+_FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _all_indicators(close, lookback, want_sma, want_ema, want_rsi, want_macd, want_bb):
+    """
+    Every selected indicator in one pass over close, matching the pandas
+    fallback (recursive EMAs, 14-bar mean RSI, 20-bar ddof=1 Bollinger).
+    
+    Returns (sma, ema, rsi, macd, macd_signal, bb_middle, bb_std); arrays for
+    indicators that were not requested are empty.
+    """
+    n = close.shape[0]
+    sma = np.full(n if want_sma else 0, np.nan)
+    ema = np.full(n if want_ema else 0, np.nan)
+    rsi = np.full(n if want_rsi else 0, np.nan)
+    macd = np.full(n if want_macd else 0, np.nan)
+    macd_signal = np.full(n if want_macd else 0, np.nan)
+    bb_middle = np.full(n if want_bb else 0, np.nan)
+    bb_std = np.full(n if want_bb else 0, np.nan)
+    
+    a_ema = 2.0 / (lookback + 1)
+    a12 = 2.0 / 13
+    a26 = 2.0 / 27
+    a9 = 2.0 / 10
+    sma_sum = 0.0
+    ema_v = 0.0
+    ema12 = 0.0
+    ema26 = 0.0
+    signal = 0.0
+    gain_sum = 0.0
+    loss_sum = 0.0
+    
+    for i in range(n):
+        x = close[i]
         
-        # Entry rules
-        print("\n[ENTRY] Entry Rules (type 'done' when finished):")
-        rule_num = 1
-        while True:
-            rule = input(f"Rule {rule_num}: ").strip()
-            if rule.lower() == 'done' or not rule:
-                break
-            strategy['entry_rules'].append(rule)
-            rule_num += 1
+        if want_sma:
+            sma_sum += x
+            if i >= lookback:
+                sma_sum -= close[i - lookback]
+            if i >= lookback - 1:
+                sma[i] = sma_sum / lookback
         
-        # Exit rules
-        print("\n[EXIT] Exit Rules (type 'done' when finished):")
-        rule_num = 1
-        while True:
-            rule = input(f"Rule {rule_num}: ").strip()
-            if rule.lower() == 'done' or not rule:
-                break
-            strategy['exit_rules'].append(rule)
-            rule_num += 1
+        if want_ema:
+            ema_v = x if i == 0 else a_ema * x + (1 - a_ema) * ema_v
+            if i >= lookback - 1:
+                ema[i] = ema_v
         
-        # Risk management
-        print("\n[RISK] Risk Management:")
-        strategy['risk_management']['position_size_pct'] = float(input("Position size (% of capital, default 10): ") or "10")
-        strategy['risk_management']['stop_loss_pct'] = float(input("Stop loss (%, default 5): ") or "5")
-        strategy['risk_management']['take_profit_pct'] = float(input("Take profit (%, default 15): ") or "15")
-        strategy['risk_management']['max_positions'] = int(input("Max concurrent positions (default 5): ") or "5")
+        if want_rsi:
+            if i >= 1:
+                delta = x - close[i - 1]
+                if delta > 0:
+                    gain_sum += delta
+                else:
+                    loss_sum -= delta
+            if i >= 15:
+                delta = close[i - 14] - close[i - 15]
+                if delta > 0:
+                    gain_sum -= delta
+                else:
+                    loss_sum += delta
+            if i >= 13:
+                if loss_sum > 0:
+                    rsi[i] = 100 - 100 / (1 + gain_sum / loss_sum)
+                elif gain_sum > 0:
+                    rsi[i] = 100.0
         
-        # Save strategy
-        self.save_strategy(strategy)
+        if want_macd:
+            ema12 = x if i == 0 else a12 * x + (1 - a12) * ema12
+            ema26 = x if i == 0 else a26 * x + (1 - a26) * ema26
+            if i >= 25:
+                m = ema12 - ema26
+                macd[i] = m
+                signal = m if i == 25 else a9 * m + (1 - a9) * signal
+                if i >= 33:
+                    macd_signal[i] = signal
         
-        print(f"\n[OK] Strategy '{strategy['name']}' created successfully!")
-        return strategy
-    
-    def save_strategy(self, strategy: Dict[str, Any]):
-        """Save strategy to JSON file"""
-        filename = f"{self.strategies_dir}/{strategy['name'].replace(' ', '_')}.json"
-        with open(filename, 'w') as f:
-            json.dump(strategy, f, indent=2)
-        print(f"[SAVED] Saved to: {filename}")
-    
-    def load_strategy(self, name: str) -> Dict[str, Any]:
-        """Load strategy from JSON file"""
-        filename = f"{self.strategies_dir}/{name.replace(' ', '_')}.json"
-        if os.path.exists(filename):
-            with open(filename, 'r') as f:
-                return json.load(f)
-        return None
+        if want_bb and i >= 19:
+            total = 0.0
+            for j in range(i - 19, i + 1):
+                total += close[j]
+            mean = total / 20
+            sq = 0.0
+            for j in range(i - 19, i + 1):
+                sq += (close[j] - mean) * (close[j] - mean)
+            bb_middle[i] = mean
+            bb_std[i] = np.sqrt(sq / 19)
     
-    def list_strategies(self) -> List[str]:
-        """List all saved strategies"""
-        if not os.path.exists(self.strategies_dir):
-            return []
-        files = [f.replace('.json', '').replace('_', ' ') 
-                for f in os.listdir(self.strategies_dir) if f.endswith('.json')]
-        return sorted(files)
+    return sma, ema, rsi, macd, macd_signal, bb_middle, bb_std
+
+
+@njit(cache=True)
+def check_entry_signal(close, open_, high, low, idx):
+    """
+    Per-bar entry rule over raw OHLC arrays (JIT-compiled when numba is installed)
     
-    def export_for_live_trading(self, strategy_name: str, export_format: str = 'python'):
-        """Export strategy for live trading implementation"""
-        strategy = self.load_strategy(strategy_name)
-        if not strategy:
-            print(f"❌ Strategy '{strategy_name}' not found")
-            return
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        if export_format == 'python':
-            self._export_python_class(strategy, timestamp)
-        elif export_format == 'json':
-            self._export_json_config(strategy, timestamp)
-        elif export_format == 'lean':
-            self._export_lean_algorithm(strategy, timestamp)
-        else:
-            print(f"❌ Unknown format: {export_format}")
+    Entry Rules:
+$kernel_entry_rules
+    """
+    # Implement your entry logic here
+    return False
+
+
+@njit(cache=True)
+def check_exit_signal(close, open_, high, low, idx):
+    """
+    Per-bar exit rule over raw OHLC arrays (JIT-compiled when numba is installed)
     
-    def _export_python_class(self, strategy: Dict[str, Any], timestamp: str):
-        """Export as standalone Python class"""
-        # Sanitize name to be a valid Python identifier
-        name = sanitize_identifier(strategy['name'])
-        # Use export_ prefix to avoid pytest collection
-        basename = sanitize_export_basename(strategy['name'], timestamp)
-        filename = f"{self.exports_dir}/{basename}.py"
-        
-        code = f'''"""
-{strategy['name']} - {strategy['description']}
-Auto-generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-"""
+    Exit Rules:
+$kernel_exit_rules
+    """
+    # Implement your exit logic here
+    return False
 
-import pandas as pd
-import numpy as np
-from datetime import datetime
 
-class {name}Strategy:
+@njit(cache=True)
+def _scan_entry(close, open_, high, low):
+    sig = np.zeros(close.shape[0], dtype=np.bool_)
+    for idx in range(close.shape[0]):
+        sig[idx] = check_entry_signal(close, open_, high, low, idx)
+    return sig
+
+
+@njit(cache=True)
+def _scan_exit(close, open_, high, low):
+    sig = np.zeros(close.shape[0], dtype=np.bool_)
+    for idx in range(close.shape[0]):
+        sig[idx] = check_exit_signal(close, open_, high, low, idx)
+    return sig
+
+
+def _ohlc_arrays(df: pd.DataFrame):
+    """(close, open, high, low) as float64 arrays; missing columns fall back to close"""
+    close = df['close'].to_numpy(dtype=np.float64)
+    open_ = df['open'].to_numpy(dtype=np.float64) if 'open' in df.columns else close
+    high = df['high'].to_numpy(dtype=np.float64) if 'high' in df.columns else close
+    low = df['low'].to_numpy(dtype=np.float64) if 'low' in df.columns else close
+    return close, open_, high, low
+
+
+@njit(cache=True)
+$simulate_kernel
+$aot_import
+
+class ${name}Strategy:
     """
-    Type: {strategy['type']}
-    Indicators: {', '.join(strategy['indicators'])}
+    Type: $type
+    Indicators: $indicator_names
     """
     
     def __init__(self, symbol: str, initial_capital: float = 100000):
@@ -223,202 +406,274 @@ class {name}Strategy:
         self.trades = []
         
         # Strategy parameters
-        self.lookback = {strategy['parameters'].get('lookback_period', 20)}
-        self.holding_period = {strategy['parameters'].get('holding_period', 5)}
+        self.lookback = $lookback
+        self.holding_period = $holding_period
         
         # Risk management
-        self.position_size_pct = {strategy['risk_management'].get('position_size_pct', 10)} / 100
-        self.stop_loss_pct = {strategy['risk_management'].get('stop_loss_pct', 5)} / 100
-        self.take_profit_pct = {strategy['risk_management'].get('take_profit_pct', 15)} / 100
-        self.max_positions = {strategy['risk_management'].get('max_positions', 5)}
+        self.position_size_pct = $position_size_pct / 100
+        self.stop_loss_pct = $stop_loss_pct / 100
+        self.take_profit_pct = $take_profit_pct / 100
+        self.max_positions = $max_positions
+        
+        # Indicators computed by calculate_indicators
+        self.indicators = $indicators
     
     def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Calculate technical indicators"""
+        """
+        Calculate technical indicators
+        
+        With numba installed, the fused _all_indicators kernel computes every
+        selected indicator in a single pass (for a lone indicator TA-Lib is
+        preferred when installed). Otherwise uses TA-Lib's C implementations
+        when installed. TA-Lib follows its own
+        conventions for EMA/MACD (SMA-seeded) and RSI (Wilder smoothing), so
+        warm-up values differ slightly from the pandas fallback.
+        """
         # Add your indicator calculations here
-        indicators = {strategy['indicators']}
+        # Rebuilt per call so later edits to self.indicators still apply
+        indicators = frozenset(self.indicators)
+        close = df['close'].to_numpy(dtype=np.float64)
+        
+        wanted = [ind in indicators for ind in ('SMA', 'EMA', 'RSI', 'MACD', 'Bollinger')]
+        if (_HAS_NUMBA and (sum(wanted) > 1 or (any(wanted) and not _HAS_TALIB))
+                and np.isfinite(close).all()):
+            sma, ema, rsi, macd, macd_signal, bb_middle, bb_std = _all_indicators(
+                close, self.lookback, *wanted)
+            want_sma, want_ema, want_rsi, want_macd, want_bb = wanted
+            if want_sma:
+                df['SMA'] = sma
+            if want_ema:
+                df['EMA'] = ema
+            if want_rsi:
+                df['RSI'] = rsi
+            if want_macd:
+                df['MACD'] = macd
+                df['MACD_signal'] = macd_signal
+            if want_bb:
+                df['BB_middle'] = bb_middle
+                df['BB_std'] = bb_std
+                df['BB_upper'] = bb_middle + (2 * bb_std)
+                df['BB_lower'] = bb_middle - (2 * bb_std)
+            return df
+        
+        # EMA(lookback) and the MACD legs share spans when lookback is 12 or 26
+        _ema_cache = {}
+        def _ema(span):
+            if span not in _ema_cache:
+                _ema_cache[span] = df['close'].ewm(span=span, adjust=False, min_periods=span).mean()
+            return _ema_cache[span]
         
         if 'SMA' in indicators:
-            df['SMA'] = df['close'].rolling(window=self.lookback).mean()
+            if _HAS_TALIB:
+                df['SMA'] = talib.SMA(close, timeperiod=self.lookback)
+            else:
+                df['SMA'] = _rolling_mean(close, self.lookback)
         
         if 'EMA' in indicators:
-            df['EMA'] = df['close'].ewm(span=self.lookback).mean()
+            if _HAS_TALIB:
+                df['EMA'] = talib.EMA(close, timeperiod=self.lookback)
+            else:
+                df['EMA'] = _ema(self.lookback)
         
         if 'RSI' in indicators:
-            delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            df['RSI'] = 100 - (100 / (1 + rs))
+            if _HAS_TALIB:
+                df['RSI'] = talib.RSI(close, timeperiod=14)
+            else:
+                delta = np.diff(close, prepend=np.nan)
+                gain = _rolling_mean(np.where(delta > 0, delta, 0.0), 14)
+                loss = _rolling_mean(np.where(delta < 0, -delta, 0.0), 14)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    rs = gain / loss
+                df['RSI'] = 100 - (100 / (1 + rs))
         
         if 'MACD' in indicators:
-            ema12 = df['close'].ewm(span=12).mean()
-            ema26 = df['close'].ewm(span=26).mean()
-            df['MACD'] = ema12 - ema26
-            df['MACD_signal'] = df['MACD'].ewm(span=9).mean()
+            if _HAS_TALIB:
+                macd, macd_signal, _ = talib.MACD(close, fastperiod=12, slowperiod=26, signalperiod=9)
+                df['MACD'] = macd
+                df['MACD_signal'] = macd_signal
+            else:
+                df['MACD'] = _ema(12) - _ema(26)
+                df['MACD_signal'] = df['MACD'].ewm(span=9, adjust=False, min_periods=9).mean()
         
         if 'Bollinger' in indicators:
-            df['BB_middle'] = df['close'].rolling(window=20).mean()
-            df['BB_std'] = df['close'].rolling(window=20).std()
-            df['BB_upper'] = df['BB_middle'] + (2 * df['BB_std'])
-            df['BB_lower'] = df['BB_middle'] - (2 * df['BB_std'])
+            if _HAS_TALIB:
+                # TA-Lib uses the population std; scale the band width to keep ddof=1 bands
+                nbdev = 2 * np.sqrt(20 / 19)
+                bb_upper, bb_middle, bb_lower = talib.BBANDS(
+                    close, timeperiod=20, nbdevup=nbdev, nbdevdn=nbdev, matype=0)
+                df['BB_middle'] = bb_middle
+                df['BB_std'] = (bb_upper - bb_middle) / 2
+                df['BB_upper'] = bb_upper
+                df['BB_lower'] = bb_lower
+            else:
+                # One strided view feeds both reductions (sample std, ddof=1);
+                # a 20-bar SMA is already the middle band
+                reuse_sma = 'SMA' in indicators and self.lookback == 20
+                bb_mean = df['SMA'].to_numpy() if reuse_sma else np.full(len(close), np.nan)
+                bb_std = np.full(len(close), np.nan)
+                if len(close) >= 20:
+                    windows = sliding_window_view(close, 20)
+                    if not reuse_sma:
+                        bb_mean[19:] = windows.mean(axis=1)
+                    bb_std[19:] = windows.std(axis=1, ddof=1)
+                df['BB_middle'] = bb_mean
+                df['BB_std'] = bb_std
+                df['BB_upper'] = bb_mean + (2 * bb_std)
+                df['BB_lower'] = bb_mean - (2 * bb_std)
         
         return df
     
-    def check_entry_signal(self, df: pd.DataFrame, idx: int) -> bool:
+    def prepare_data(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Narrow copy of data (OHLC columns only) with indicators attached
+        
+        Other input columns (volume, fundamentals, ...) are not carried into
+        the backtest frame; add them here if custom rules need them.
+        """
+        columns = [col for col in ('open', 'high', 'low', 'close') if col in data.columns]
+        return self.calculate_indicators(data[columns].copy())
+    
+    def entry_signals(self, df: pd.DataFrame, ohlc: tuple) -> np.ndarray:
         """
         Entry Rules:
-{chr(10).join([f'        # {rule}' for rule in strategy['entry_rules']])}
+$entry_rules
+        
+        Returns a boolean array with one element per bar of df. ohlc holds the
+        (close, open, high, low) float64 arrays already extracted from df.
+        Defaults to scanning the per-bar check_entry_signal kernel; override
+        with a vectorised expression over df columns if preferred.
         """
-        # Implement your entry logic here
-        return False
+        return _scan_entry(*ohlc)
     
-    def check_exit_signal(self, df: pd.DataFrame, idx: int, entry_price: float, days_held: int) -> bool:
+    def exit_signals(self, df: pd.DataFrame, ohlc: tuple) -> np.ndarray:
         """
         Exit Rules:
-{chr(10).join([f'        # {rule}' for rule in strategy['exit_rules']])}
+$exit_rules
+        
+        Stop loss, take profit and max holding period are applied by the
+        simulator; return True here only for rule-based exits.
         """
-        current_price = df.iloc[idx]['close']
+        return _scan_exit(*ohlc)
+    
+    def backtest(self, data: pd.DataFrame, start_date: str, end_date: str,
+                 indicators_df: pd.DataFrame = None):
+        """
+        Run backtest on historical data
         
-        # Stop loss
-        if current_price <= entry_price * (1 - self.stop_loss_pct):
-            return True
+        indicators_df: optional frame already built by prepare_data (e.g. shared
+        by strategies with the same indicator set); skips recomputation.
         
-        # Take profit
-        if current_price >= entry_price * (1 + self.take_profit_pct):
-            return True
+        Returns (df, trades, final_value, equity_curve); equity_curve is a
+        float64 ndarray aligned with df's rows.
+        """
+        df = self.prepare_data(data) if indicators_df is None else indicators_df
+        df = df.dropna()
         
-        # Max holding period
-        if days_held >= self.holding_period:
-            return True
+        # Filter date range (binary search on a sorted index, no boolean masks)
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        df = df.loc[start_date:end_date]
         
-        # Implement your exit logic here
-        return False
-    
-    def backtest(self, data: pd.DataFrame, start_date: str, end_date: str):
-        """Run backtest on historical data"""
-        df = self.calculate_indicators(data.copy())
-        df = df.dropna()
+        # Convert OHLC to ndarrays once; signals and simulation work on raw arrays
+        ohlc = _ohlc_arrays(df)
+        close_arr = ohlc[0]
+        entry_sig = np.asarray(self.entry_signals(df, ohlc), dtype=np.bool_)
+        exit_sig = np.asarray(self.exit_signals(df, ohlc), dtype=np.bool_)
+        
+        # Bind hot attributes to locals once; the kernel only sees plain scalars
+        cash = float(self.cash)
+        stop = float(self.stop_loss_pct)
+        tp = float(self.take_profit_pct)
+        hold = int(self.holding_period)
+        sz = float(self.position_size_pct)
+        if PORTFOLIO_CFG is not None:
+            fractional = bool(PORTFOLIO_CFG.FRACTIONAL_SHARES_ALLOWED)
+            min_value = float(PORTFOLIO_CFG.MIN_POSITION_VALUE)
+        else:
+            fractional, min_value = True, 1.0
         
-        # Filter date range
-        df = df[(df.index >= start_date) & (df.index <= end_date)]
-        
-        equity_curve = []
-        entry_price = None
-        entry_idx = None
-        
-        for idx in range(len(df)):
-            current_price = df.iloc[idx]['close']
-            
-            # Check exit
-            if self.position > 0 and entry_price:
-                days_held = idx - entry_idx
-                if self.check_exit_signal(df, idx, entry_price, days_held):
-                    # Sell
-                    self.cash += self.position * current_price
-                    pnl = (current_price - entry_price) * self.position
-                    self.trades.append({{
-                        'entry_date': df.index[entry_idx],
-                        'exit_date': df.index[idx],
-                        'entry_price': entry_price,
-                        'exit_price': current_price,
-                        'shares': self.position,
-                        'pnl': pnl
-                    }})
-                    self.position = 0
-                    entry_price = None
-                    entry_idx = None
-            
-            # Check entry
-            elif self.position == 0:
-                if self.check_entry_signal(df, idx):
-                    # Buy with fractional share support
-                    from sizing import calculate_shares
-                    position_value = self.cash * self.position_size_pct
-                    shares, _ = calculate_shares(position_value, current_price)
-                    if shares > 0:
-                        cost = shares * current_price
-                        self.cash -= cost
-                        self.position = shares
-                        entry_price = current_price
-                        entry_idx = idx
-            
-            # Track equity
-            portfolio_value = self.cash + (self.position * current_price)
-            equity_curve.append(portfolio_value)
-        
-        # Close any open position
-        if self.position > 0:
-            final_price = df.iloc[-1]['close']
-            self.cash += self.position * final_price
-            pnl = (final_price - entry_price) * self.position
-            self.trades.append({{
-                'entry_date': df.index[entry_idx],
-                'exit_date': df.index[-1],
+        (equity_curve, trade_starts, trade_ends, trade_entry_px,
+         trade_exit_px, trade_shares) = _simulate(
+            close_arr, entry_sig, exit_sig, stop, tp, hold, sz, cash, fractional, min_value,
+        )
+        
+        # Unbox the trade arrays in bulk (tolist) rather than per element
+        append_trade = self.trades.append
+        pnls = (trade_exit_px - trade_entry_px) * trade_shares
+        for entry_date, exit_date, entry_price, exit_price, shares, pnl in zip(
+                df.index[trade_starts], df.index[trade_ends], trade_entry_px.tolist(),
+                trade_exit_px.tolist(), trade_shares.tolist(), pnls.tolist()):
+            append_trade({
+                'entry_date': entry_date,
+                'exit_date': exit_date,
                 'entry_price': entry_price,
-                'exit_price': final_price,
-                'shares': self.position,
+                'exit_price': exit_price,
+                'shares': shares,
                 'pnl': pnl
-            }})
-            self.position = 0
+            })
+        
+        if len(equity_curve):
+            self.cash = float(equity_curve[-1])
+        self.position = 0
         
         final_value = self.cash
         return df, self.trades, final_value, equity_curve
 
 # Strategy metadata
-STRATEGY_INFO = {{
-    'name': '{strategy['name']}',
-    'type': '{strategy['type']}',
-    'created': '{strategy.get('created', 'N/A')}',
-    'description': '{strategy['description']}'
-}}
-'''
-        
-        with open(filename, 'w') as f:
-            f.write(code)
-        
-        print(f"[OK] Exported Python class to: {filename}")
-        print(f"[INPUT] Import with: from {basename} import {name}Strategy")
-    
-    def _export_json_config(self, strategy: Dict[str, Any], timestamp: str):
-        """Export as JSON configuration"""
-        # Use export_ prefix to avoid pytest collection
-        basename = sanitize_export_basename(strategy['name'], timestamp)
-        filename = f"{self.exports_dir}/{basename}_config.json"
-        
-        config = {
-            'strategy': strategy,
-            'export_info': {
-                'exported_at': datetime.now().isoformat(),
-                'format': 'json_config',
-                'ready_for_live': True
-            }
-        }
-        
-        with open(filename, 'w') as f:
-            json.dump(config, f, indent=2)
-        
-        print(f"[OK] Exported JSON config to: {filename}")
-    
-    def _export_lean_algorithm(self, strategy: Dict[str, Any], timestamp: str):
-        """Export as QuantConnect LEAN algorithm"""
-        # Sanitize name to be a valid Python identifier
-        name = sanitize_identifier(strategy['name'])
-        # Use export_ prefix to avoid pytest collection
-        basename = sanitize_export_basename(strategy['name'], timestamp)
-        filename = f"{self.exports_dir}/{basename}_lean.py"
-        
-        code = f'''"""
-{strategy['name']} - LEAN Algorithm
-{strategy['description']}
-Auto-generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+STRATEGY_INFO = {
+    'name': '$strategy_name',
+    'type': '$type',
+    'created': '$created',
+    'description': '$description'
+}
+''')
+
+_AOT_KERNELS_TEMPLATE = Template('''"""
+$strategy_name - ahead-of-time compiled simulation kernel
+Auto-generated on $generated_at
+
+Builds the $kernels_module extension module next to this file:
+    python $aot_filename
+"""
+
+import os
+
+import numpy as np
+from numba.pycc import CC
+
+cc = CC('$kernels_module')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+@cc.export('_simulate', '$simulate_signature')
+$simulate_kernel
+
+
+if __name__ == '__main__':
+    cc.compile()
+''')
+
+_AOT_IMPORT_TEMPLATE = Template('''
+
+# Prefer the ahead-of-time compiled kernel (built at export time) when present
+try:
+    from $kernels_module import _simulate
+except ImportError:
+    pass
+''')
+
+_LEAN_ALGORITHM_TEMPLATE = Template('''"""
+$strategy_name - LEAN Algorithm
+$description
+Auto-generated on $generated_at
 """
 
 from AlgorithmImports import *
 
-class {name}Algorithm(QCAlgorithm):
+class ${name}Algorithm(QCAlgorithm):
     """
-    Type: {strategy['type']}
-    Indicators: {', '.join(strategy['indicators'])}
+    Type: $type
+    Indicators: $indicator_names
     """
     
     def Initialize(self):
@@ -431,10 +686,10 @@ class {name}Algorithm(QCAlgorithm):
         self.symbol = self.AddEquity("SPY", Resolution.Daily).Symbol
         
         # Strategy parameters
-        self.lookback = {strategy['parameters'].get('lookback_period', 20)}
-        self.position_size = {strategy['risk_management'].get('position_size_pct', 10)} / 100
-        self.stop_loss = {strategy['risk_management'].get('stop_loss_pct', 5)} / 100
-        self.take_profit = {strategy['risk_management'].get('take_profit_pct', 15)} / 100
+        self.lookback = $lookback
+        self.position_size = $position_size_pct / 100
+        self.stop_loss = $stop_loss_pct / 100
+        self.take_profit = $take_profit_pct / 100
         
         # Initialize indicators
         self.InitializeIndicators()
@@ -448,7 +703,7 @@ class {name}Algorithm(QCAlgorithm):
     
     def InitializeIndicators(self):
         """Initialize technical indicators"""
-        indicators = {strategy['indicators']}
+        indicators = frozenset($indicators)
         
         if 'SMA' in indicators:
             self.sma = self.SMA(self.symbol, self.lookback)
@@ -471,10 +726,10 @@ class {name}Algorithm(QCAlgorithm):
             return
         
         # Entry Rules:
-{chr(10).join([f'        # {rule}' for rule in strategy['entry_rules']])}
+$entry_rules
         
         # Exit Rules:
-{chr(10).join([f'        # {rule}' for rule in strategy['exit_rules']])}
+$exit_rules
         
         holdings = self.Portfolio[self.symbol]
         
@@ -484,12 +739,12 @@ class {name}Algorithm(QCAlgorithm):
             if self.CheckEntrySignal():
                 # Use SetHoldings for fractional share support
                 self.SetHoldings(self.symbol, self.position_size)
-                self.Debug(f"BUY: Set holdings to {{self.position_size*100}}% at {{self.Securities[self.symbol].Price}}")
+                self.Debug(f"BUY: Set holdings to {self.position_size*100}% at {self.Securities[self.symbol].Price}")
         else:
             # Check exit signal
             if self.CheckExitSignal():
                 self.Liquidate(self.symbol)
-                self.Debug(f"SELL: Liquidated at {{self.Securities[self.symbol].Price}}")
+                self.Debug(f"SELL: Liquidated at {self.Securities[self.symbol].Price}")
     
     def CheckEntrySignal(self) -> bool:
         """Check if entry conditions are met"""
@@ -517,12 +772,244 @@ class {name}Algorithm(QCAlgorithm):
         pass
 
 # Strategy metadata
-# Type: {strategy['type']}
-# Created: {strategy.get('created', 'N/A')}
-'''
+# Type: $type
+# Created: $created
+''')
+
+
+class StrategyBuilder:
+    """Interactive strategy builder with export capabilities"""
+    
+    def __init__(self):
+        self.strategies_dir = "custom_strategies"
+        self.exports_dir = "strategy_exports"
+        # Also emit and build an AOT-compiled simulation kernel with Python exports
+        self.export_aot: bool = False
+        os.makedirs(self.strategies_dir, exist_ok=True)
+        os.makedirs(self.exports_dir, exist_ok=True)
+        # filename -> ((st_mtime_ns, st_size), parsed strategy)
+        self._strategy_cache: Dict[str, tuple] = {}
+    
+    def create_custom_strategy(self) -> Dict[str, Any]:
+        """Interactive custom strategy creation"""
+        print("\n" + "="*60)
+        print("CUSTOM STRATEGY BUILDER")
+        print("="*60)
+        
+        strategy = {
+            'name': '',
+            'description': '',
+            'type': '',
+            'parameters': {},
+            'indicators': [],
+            'entry_rules': [],
+            'exit_rules': [],
+            'risk_management': {},
+            'created': datetime.now().isoformat()
+        }
+        
+        # Basic info
+        strategy['name'] = input("\n[INPUT] Strategy Name: ").strip()
+        strategy['description'] = input("[INPUT] Description: ").strip()
+        
+        # Strategy type
+        print("\n🎯 Strategy Type:")
+        print("1. Trend Following")
+        print("2. Mean Reversion")
+        print("3. Momentum")
+        print("4. Breakout")
+        print("5. ML-Based")
+        print("6. Hybrid")
+        
+        type_choice = input("\nSelect type (1-6): ").strip()
+        types = {
+            '1': 'trend_following',
+            '2': 'mean_reversion',
+            '3': 'momentum',
+            '4': 'breakout',
+            '5': 'ml_based',
+            '6': 'hybrid'
+        }
+        strategy['type'] = types.get(type_choice, 'custom')
+        
+        # Technical indicators
+        print("\n[INFO] Add Technical Indicators (comma separated):")
+        print("Available: SMA, EMA, RSI, MACD, Bollinger, ATR, Stochastic, Volume, OBV")
+        indicators_input = input("Indicators: ").strip()
+        if indicators_input:
+            strategy['indicators'] = [ind.strip() for ind in indicators_input.split(',')]
+        
+        # Parameters
+        print("\n⚙️  Strategy Parameters:")
+        strategy['parameters']['lookback_period'] = int(input("Lookback period (days): ") or "20")
+        strategy['parameters']['holding_period'] = int(input("Max holding period (days): ") or "5")
+        
+        # Entry rules
+        print("\n[ENTRY] Entry Rules (type 'done' when finished):")
+        rule_num = 1
+        while True:
+            rule = input(f"Rule {rule_num}: ").strip()
+            if rule.lower() == 'done' or not rule:
+                break
+            strategy['entry_rules'].append(rule)
+            rule_num += 1
+        
+        # Exit rules
+        print("\n[EXIT] Exit Rules (type 'done' when finished):")
+        rule_num = 1
+        while True:
+            rule = input(f"Rule {rule_num}: ").strip()
+            if rule.lower() == 'done' or not rule:
+                break
+            strategy['exit_rules'].append(rule)
+            rule_num += 1
+        
+        # Risk management
+        print("\n[RISK] Risk Management:")
+        strategy['risk_management']['position_size_pct'] = float(input("Position size (% of capital, default 10): ") or "10")
+        strategy['risk_management']['stop_loss_pct'] = float(input("Stop loss (%, default 5): ") or "5")
+        strategy['risk_management']['take_profit_pct'] = float(input("Take profit (%, default 15): ") or "15")
+        strategy['risk_management']['max_positions'] = int(input("Max concurrent positions (default 5): ") or "5")
+        
+        # Save strategy
+        self.save_strategy(strategy)
+        
+        print(f"\n[OK] Strategy '{strategy['name']}' created successfully!")
+        return strategy
+    
+    def save_strategy(self, strategy: Dict[str, Any]):
+        """Save strategy to JSON file"""
+        filename = f"{self.strategies_dir}/{strategy['name'].replace(' ', '_')}.json"
+        Path(filename).write_bytes(dumps_json(strategy))
+        self._strategy_cache.pop(filename, None)
+        print(f"[SAVED] Saved to: {filename}")
+    
+    def load_strategy(self, name: str) -> Dict[str, Any]:
+        """
+        Load strategy from JSON file
+        
+        Parsed strategies are cached in-process and revalidated against the
+        file's mtime/size. Callers get their own copy, so changing it never
+        affects later loads.
+        """
+        filename = f"{self.strategies_dir}/{name.replace(' ', '_')}.json"
+        try:
+            st = os.stat(filename)
+        except OSError:
+            self._strategy_cache.pop(filename, None)
+            return None
+        
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self._strategy_cache.get(filename)
+        if cached is not None and cached[0] == stamp:
+            return copy.deepcopy(cached[1])
+        
+        with open(filename, 'r') as f:
+            strategy = json.load(f)
+        self._strategy_cache[filename] = (stamp, strategy)
+        return copy.deepcopy(strategy)
+    
+    def list_strategies(self) -> List[str]:
+        """List all saved strategies"""
+        if not os.path.exists(self.strategies_dir):
+            return []
+        with os.scandir(self.strategies_dir) as entries:
+            names = [entry.name[:-5].replace('_', ' ') for entry in entries
+                     if entry.name.endswith('.json') and entry.is_file()]
+        return sorted(names)
+    
+    def export_for_live_trading(self, strategy_name: str, export_format: str = 'python'):
+        """Export strategy for live trading implementation"""
+        strategy = self.load_strategy(strategy_name)
+        if not strategy:
+            print(f"❌ Strategy '{strategy_name}' not found")
+            return
+        
+        # One clock read per export; file names and embedded stamps agree
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+        
+        if export_format == 'python':
+            self._export_python_class(strategy, timestamp, now)
+        elif export_format == 'json':
+            self._export_json_config(strategy, timestamp, now)
+        elif export_format == 'lean':
+            self._export_lean_algorithm(strategy, timestamp, now)
+        else:
+            print(f"❌ Unknown format: {export_format}")
+    
+    def _export_python_class(self, strategy: Dict[str, Any], timestamp: str, now: datetime = None):
+        """Export as standalone Python class"""
+        # Sanitize name to be a valid Python identifier
+        name = sanitize_identifier(strategy['name'])
+        # Use export_ prefix to avoid pytest collection
+        basename = sanitize_export_basename(strategy['name'], timestamp)
+        filename = f"{self.exports_dir}/{basename}.py"
+        
+        fields = _template_fields(strategy, name, now)
+        if self.export_aot:
+            kernels_module = f"{basename}_kernels"
+            aot_path = Path(self.exports_dir) / f"{basename}_aot.py"
+            aot_code = _AOT_KERNELS_TEMPLATE.substitute(
+                fields, kernels_module=kernels_module, aot_filename=aot_path.name,
+                simulate_signature=_SIMULATE_AOT_SIGNATURE)
+            aot_path.write_bytes(aot_code.encode('utf-8'))
+            if self._compile_aot_kernels(aot_path):
+                print(f"[OK] Compiled AOT kernel module: {kernels_module}")
+            fields['aot_import'] = _AOT_IMPORT_TEMPLATE.substitute(kernels_module=kernels_module)
+        
+        code = _PYTHON_CLASS_TEMPLATE.substitute(fields)
+        
+        # One write of the encoded payload, no text-mode newline translation
+        Path(filename).write_bytes(code.encode('utf-8'))
+        
+        print(f"[OK] Exported Python class to: {filename}")
+        print(f"[INPUT] Import with: from {basename} import {name}Strategy")
+    
+    def _compile_aot_kernels(self, aot_path: Path) -> bool:
+        """Build the AOT kernel extension next to aot_path; False if that is not possible"""
+        try:
+            spec = importlib.util.spec_from_file_location(aot_path.stem, aot_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            module.cc.compile()
+        except Exception as e:
+            # numba/pycc or a C compiler missing: the export still JIT-compiles on first use
+            print(f"[WARN] AOT kernel build failed ({e}); run {aot_path.name} to retry")
+            return False
+        return True
+    
+    def _export_json_config(self, strategy: Dict[str, Any], timestamp: str, now: datetime = None):
+        """Export as JSON configuration"""
+        # Use export_ prefix to avoid pytest collection
+        basename = sanitize_export_basename(strategy['name'], timestamp)
+        filename = f"{self.exports_dir}/{basename}_config.json"
+        
+        config = {
+            'strategy': strategy,
+            'export_info': {
+                'exported_at': (now or datetime.now()).isoformat(),
+                'format': 'json_config',
+                'fingerprint': strategy_fingerprint(strategy),
+                'ready_for_live': True
+            }
+        }
+        
+        Path(filename).write_bytes(dumps_json(config))
+        
+        print(f"[OK] Exported JSON config to: {filename}")
+    
+    def _export_lean_algorithm(self, strategy: Dict[str, Any], timestamp: str, now: datetime = None):
+        """Export as QuantConnect LEAN algorithm"""
+        # Sanitize name to be a valid Python identifier
+        name = sanitize_identifier(strategy['name'])
+        # Use export_ prefix to avoid pytest collection
+        basename = sanitize_export_basename(strategy['name'], timestamp)
+        filename = f"{self.exports_dir}/{basename}_lean.py"
+        
+        code = _LEAN_ALGORITHM_TEMPLATE.substitute(_template_fields(strategy, name, now))
         
-        with open(filename, 'w') as f:
-            f.write(code)
+        Path(filename).write_bytes(code.encode('utf-8'))
         
         print(f"[OK] Exported LEAN algorithm to: {filename}")
         print(f"    Upload to QuantConnect or run locally with LEAN CLI")
@@ -534,11 +1021,19 @@ class {name}Algorithm(QCAlgorithm):
         print("="*80)
         
         results = []
+        seen = {}  # configuration fingerprint -> first strategy name using it
         for name in strategy_names:
             strategy = self.load_strategy(name)
             if strategy:
+                # Identity fields do not affect trading; fingerprint the configuration only
+                fingerprint = strategy_fingerprint(
+                    {k: v for k, v in strategy.items() if k not in ('name', 'description', 'created')})
                 # Would implement backtest here
                 print(f"✓ {name}: Type={strategy['type']}, Indicators={len(strategy['indicators'])}")
+                if fingerprint in seen:
+                    print(f"  (same configuration as '{seen[fingerprint]}')")
+                else:
+                    seen[fingerprint] = name
                 results.append(strategy)
         
         return results
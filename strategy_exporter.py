@@ -6,9 +6,40 @@ Export strategies for live trading with real capital
 import json
 import pickle
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+from json_utils import dumps_json, loads_json
+
+try:
+    import joblib
+except ImportError:  # joblib is optional; fall back to plain pickle
+    joblib = None
+
+try:
+    import lz4.frame  # noqa: F401 - enables joblib's 'lz4' compressor
+    _MODEL_COMPRESS = ('lz4', 3)
+except ImportError:
+    _MODEL_COMPRESS = 0  # zlib/gzip cost more than they save on load time
+
+
+def _model_filename(strategy_name) -> str:
+    """
+    File name export_ml_model writes: .joblib for joblib dumps (which may be
+    lz4-compressed and need joblib.load), .pkl only for plain pickles
+    """
+    return f"{strategy_name}_model.joblib" if joblib is not None else f"{strategy_name}_model.pkl"
+
+
+# Default for getattr lookups where None is a legitimate attribute value
+_MISSING = object()
+
+# Characters kept when a backtest results key becomes part of a file name
+_RESULT_NAME_RE = re.compile(r'[^A-Za-z0-9_-]+')
+
+
 class StrategyExporter:
     """Handles exporting strategies for deployment"""
     
@@ -20,14 +51,14 @@ class StrategyExporter:
         self.export_dir.mkdir(exist_ok=True)
     
     def export_strategy_config(self, strategy_name, strategy_type, parameters, 
-                              backtest_results=None, model_path=None):
+                              backtest_results=None, model_path=None, created_at=None):
         """Export strategy configuration for live deployment"""
         
         config = {
             'strategy_name': strategy_name,
             'strategy_type': strategy_type,
             'parameters': parameters,
-            'created_at': datetime.now().isoformat(),
+            'created_at': created_at or datetime.now().isoformat(),
             'backtest_results': backtest_results or {},
             'model_path': model_path,
             'status': 'ready_for_deployment',
@@ -40,29 +71,32 @@ class StrategyExporter:
         
         # Save as JSON for easy reading
         json_path = self.export_dir / f"{strategy_name}_{strategy_type}_config.json"
-        with open(json_path, 'w') as f:
-            json.dump(config, f, indent=2)
+        json_path.write_bytes(dumps_json(config))
         
         print(f"✅ Exported config to: {json_path}")
         return json_path
     
-    def export_ml_model(self, strategy_name, model, feature_names=None):
+    def export_ml_model(self, strategy_name, model, feature_names=None, exported_at=None):
         """Export trained ML model for deployment"""
         
         model_dir = self.export_dir / 'models'
         model_dir.mkdir(exist_ok=True)
         
-        model_path = model_dir / f"{strategy_name}_model.pkl"
+        model_path = model_dir / _model_filename(strategy_name)
         
         export_data = {
             'model': model,
             'feature_names': feature_names or [],
-            'exported_at': datetime.now().isoformat(),
+            'exported_at': exported_at or datetime.now().isoformat(),
             'model_type': type(model).__name__
         }
         
-        with open(model_path, 'wb') as f:
-            pickle.dump(export_data, f)
+        if joblib is not None:
+            # joblib stores numpy buffers raw (protocol 5) instead of pickling them element-wise
+            joblib.dump(export_data, model_path, compress=_MODEL_COMPRESS, protocol=5)
+        else:
+            with open(model_path, 'wb') as f:
+                pickle.dump(export_data, f, protocol=pickle.HIGHEST_PROTOCOL)
         
         print(f"✅ Exported model to: {model_path}")
         return model_path
@@ -74,6 +108,14 @@ class StrategyExporter:
         package_dir = self.export_dir / strategy_name
         package_dir.mkdir(exist_ok=True)
         
+        # One clock read stamps every file in the package
+        generated = datetime.now().isoformat()
+        
+        # Array-valued results (equity curves, trade tables) go to columnar files;
+        # only the scalar summary is embedded in the config and README
+        summary, arrays = self._split_backtest_results(backtest_results)
+        result_files = self._export_result_arrays(package_dir, arrays)
+        
         # 1. Export configuration
         params = {
             'symbol': getattr(strategy_obj, 'symbol', 'SPY'),
@@ -81,30 +123,35 @@ class StrategyExporter:
             'initial_capital': getattr(strategy_obj, 'initial_capital', 100000),
         }
         
-        # Add strategy-specific params
-        if hasattr(strategy_obj, 'std_dev'):
-            params['std_dev'] = strategy_obj.std_dev
-        if hasattr(strategy_obj, 'prediction_horizon'):
-            params['prediction_horizon'] = strategy_obj.prediction_horizon
+        # Add strategy-specific params (one lookup each; the sentinel marks absence)
+        for attr in ('std_dev', 'prediction_horizon'):
+            value = getattr(strategy_obj, attr, _MISSING)
+            if value is not _MISSING:
+                params[attr] = value
         
+        strategy_type = type(strategy_obj).__name__
         config_path = self.export_strategy_config(
             strategy_name=strategy_name,
-            strategy_type=type(strategy_obj).__name__,
+            strategy_type=strategy_type,
             parameters=params,
-            backtest_results=backtest_results
+            backtest_results=summary,
+            created_at=generated
         )
         
         # 2. Export model if ML strategy
         model_path = None
-        if hasattr(strategy_obj, 'model') and strategy_obj.model is not None:
+        model = getattr(strategy_obj, 'model', None)
+        if model is not None:
             feature_names = getattr(strategy_obj, 'feature_names', None)
-            model_path = self.export_ml_model(strategy_name, strategy_obj.model, feature_names)
+            model_path = self.export_ml_model(strategy_name, model, feature_names,
+                                              exported_at=generated)
         
         # 3. Create deployment script
+        model_file = _model_filename(strategy_name)
         deployment_script = f'''#!/usr/bin/env python3
 """
 Live Trading Script for {strategy_name}
-Generated: {datetime.now().isoformat()}
+Generated: {generated}
 
 WARNING: This script is for live trading with real capital.
 Always paper trade first and verify performance.
@@ -116,7 +163,7 @@ from pathlib import Path
 
 def load_strategy():
     """Load strategy configuration and model"""
-    config_path = Path(__file__).parent / "{strategy_name}_{type(strategy_obj).__name__}_config.json"
+    config_path = Path(__file__).parent / "{strategy_name}_{strategy_type}_config.json"
     
     with open(config_path, 'r') as f:
         config = json.load(f)
@@ -129,16 +176,36 @@ def load_strategy():
 
 def load_model():
     """Load trained ML model if available"""
-    model_path = Path(__file__).parent / "models" / "{strategy_name}_model.pkl"
+    model_path = Path(__file__).parent / "models" / "{model_file}"
     
     if model_path.exists():
-        with open(model_path, 'rb') as f:
-            model_data = pickle.load(f)
+        if model_path.suffix == '.joblib':
+            import joblib  # joblib dumps (lz4-compressed when exported with lz4) need joblib.load
+            model_data = joblib.load(model_path)
+        else:
+            with open(model_path, 'rb') as f:
+                model_data = pickle.load(f)
         print(f"Loaded model: {{model_data['model_type']}}")
         return model_data['model'], model_data['feature_names']
     
     return None, None
 
+# Exported result file -> backtest results key
+RESULT_FILES = {result_files!r}
+
+def load_results():
+    """Load array-valued backtest results (equity curve, trades, ...) if exported"""
+    import pandas as pd
+    
+    results = {{}}
+    for name, key in RESULT_FILES.items():
+        path = Path(__file__).parent / name
+        if path.suffix == '.parquet':
+            results[key] = pd.read_parquet(path)
+        elif path.suffix == '.csv':
+            results[key] = pd.read_csv(path, index_col=0)
+    return results
+
 def run_live_trading():
     """Main live trading loop"""
     print("="*60)
@@ -159,24 +226,28 @@ if __name__ == '__main__':
 '''
         
         script_path = package_dir / f"deploy_{strategy_name}.py"
-        with open(script_path, 'w') as f:
-            f.write(deployment_script)
+        # One write of the encoded payload; UTF-8 regardless of platform locale
+        script_path.write_bytes(deployment_script.encode('utf-8'))
         os.chmod(script_path, 0o755)
         
         # 4. Create README
+        model_format = ('joblib format, load with joblib.load' if model_file.endswith('.joblib')
+                        else 'plain pickle, load with pickle.load')
+        results_listing = ''.join(f"\n- `{name}` (load with load_results())" for name in result_files)
         readme = f'''# {strategy_name} - Deployment Package
 
-Generated: {datetime.now().isoformat()}
+Generated: {generated}
 
 ## Contents
 
-- `{strategy_name}_{type(strategy_obj).__name__}_config.json`: Strategy configuration
-- `models/{strategy_name}_model.pkl`: Trained ML model (if applicable)
+- `{strategy_name}_{strategy_type}_config.json`: Strategy configuration
+- `models/{model_file}`: Trained ML model (if applicable; {model_format})
 - `deploy_{strategy_name}.py`: Deployment script template
 
 ## Backtest Results
 
-{json.dumps(backtest_results or {}, indent=2)}
+{json.dumps(summary, indent=2, default=str)}
+{results_listing}
 
 ## Deployment Steps
 
@@ -207,8 +278,7 @@ For issues or questions, review the main trading interface documentation.
 '''
         
         readme_path = package_dir / 'README.md'
-        with open(readme_path, 'w') as f:
-            f.write(readme)
+        readme_path.write_bytes(readme.encode('utf-8'))
         
         print("\n" + "="*60)
         print(f"✅ DEPLOYMENT PACKAGE CREATED")
@@ -219,16 +289,73 @@ For issues or questions, review the main trading interface documentation.
         if model_path:
             print(f"  • ML Model: models/{model_path.name}")
         print(f"  • Deployment Script: deploy_{strategy_name}.py")
+        for name in result_files:
+            print(f"  • Backtest Results: {name}")
         print(f"  • Documentation: README.md")
         print("="*60)
         
         return package_dir
     
+    @staticmethod
+    def _split_backtest_results(backtest_results):
+        """(scalar summary, array-like entries) of a backtest results dict"""
+        summary, arrays = {}, {}
+        for key, value in (backtest_results or {}).items():
+            # ndarray / Series / DataFrame; numpy scalars have ndim 0
+            if getattr(value, 'ndim', 0) >= 1:
+                arrays[key] = value
+            else:
+                summary[key] = value
+        return summary, arrays
+    
+    def _export_result_arrays(self, package_dir, arrays):
+        """
+        Write array-like results as zstd Parquet (CSV without a Parquet engine)
+        
+        Returns {file name: results key}. Keys are reduced to letters, digits,
+        '_' and '-' for the file name (numbered if two reduce alike), so no key
+        can leave package_dir; the mapping restores the original keys.
+        """
+        if not arrays:
+            return {}
+        import pandas as pd
+        
+        written = {}
+        stems = set()
+        for key, value in arrays.items():
+            if isinstance(value, pd.DataFrame) or getattr(value, 'ndim', 1) > 1:
+                frame = pd.DataFrame(value)
+                frame.columns = frame.columns.map(str)
+            else:
+                frame = pd.DataFrame({str(key): value})
+            stem = base = f"results_{_RESULT_NAME_RE.sub('_', str(key))}"
+            n = 1
+            while stem in stems:
+                n += 1
+                stem = f"{base}_{n}"
+            stems.add(stem)
+            path = package_dir / f"{stem}.parquet"
+            try:
+                frame.to_parquet(path, compression='zstd')
+            except ImportError:
+                # pyarrow/fastparquet not installed
+                path = path.with_suffix('.csv')
+                frame.to_csv(path)
+            written[path.name] = str(key)
+        return written
+    
     def list_exported_strategies(self):
         """List all exported strategies"""
         
-        configs = list(self.export_dir.glob("*_config.json"))
-        packages = [d for d in self.export_dir.iterdir() if d.is_dir() and d.name != 'models']
+        # One directory pass sorts entries into config files and package dirs
+        configs, packages = [], []
+        with os.scandir(self.export_dir) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if entry.name != 'models':
+                        packages.append(entry)
+                elif entry.name.endswith('_config.json'):
+                    configs.append(entry)
         
         print("\n" + "="*60)
         print("EXPORTED STRATEGIES")
@@ -236,10 +363,13 @@ For issues or questions, review the main trading interface documentation.
         
         if configs:
             print("\nConfiguration Files:")
-            for config_path in sorted(configs):
-                with open(config_path, 'r') as f:
-                    config = json.load(f)
-                print(f"\n  📄 {config_path.name}")
+            configs.sort(key=lambda entry: entry.name)
+            # File reads overlap in a small thread pool; map keeps the sorted order
+            with ThreadPoolExecutor(max_workers=min(8, len(configs))) as pool:
+                parsed = pool.map(lambda entry: loads_json(Path(entry.path).read_bytes()), configs)
+                loaded = list(zip(configs, parsed))
+            for config_entry, config in loaded:
+                print(f"\n  📄 {config_entry.name}")
                 print(f"     Type: {config['strategy_type']}")
                 print(f"     Created: {config['created_at'][:10]}")
                 if config.get('backtest_results'):
@@ -249,10 +379,10 @@ For issues or questions, review the main trading interface documentation.
         
         if packages:
             print("\nDeployment Packages:")
-            for pkg_dir in sorted(packages):
-                print(f"  📦 {pkg_dir.name}/")
-                files = list(pkg_dir.iterdir())
-                print(f"     Files: {len(files)}")
+            for pkg_entry in sorted(packages, key=lambda entry: entry.name):
+                print(f"  📦 {pkg_entry.name}/")
+                with os.scandir(pkg_entry.path) as files:
+                    print(f"     Files: {sum(1 for _ in files)}")
         
         if not configs and not packages:
             print("\n  No exported strategies yet.")
@@ -4,14 +4,21 @@ Strategy Configuration Manager
 Handles saving, loading, and managing strategy configurations
 """
 
-import json
+import heapq
 import os
+import shutil
+from collections.abc import MutableMapping
 from datetime import datetime
 from typing import Dict, List, Any, Optional
-from enhanced_utils import safe_json_load, safe_json_save, ValidationError
+from enhanced_utils import safe_json_load, ValidationError
+from json_utils import dumps_json, loads_json
+
 
 class StrategyConfig:
     """Represents a saved strategy configuration"""
+
+    __slots__ = ('name', 'strategy_type', 'parameters', 'description', 'tags', 'created_at',
+                 '_last_modified', '_last_modified_ts', 'performance_history', 'metadata')
     
     def __init__(self, name: str, strategy_type: str, parameters: Dict[str, Any] = None,
                  description: str = "", tags: List[str] = None, symbol: str = None,
@@ -26,10 +33,30 @@ class StrategyConfig:
             self.parameters['initial_capital'] = initial_capital
         self.description = description
         self.tags = tags or []
-        self.created_at = datetime.now().isoformat()
-        self.last_modified = self.created_at
+        self.created_at = self._touch()
         self.performance_history = []
         self.metadata = {}
+
+    @property
+    def last_modified(self) -> str:
+        """ISO timestamp of the last change"""
+        return self._last_modified
+
+    @last_modified.setter
+    def last_modified(self, value: str):
+        # Keep an epoch-seconds copy so list sorting compares floats, not strings
+        self._last_modified = value
+        try:
+            self._last_modified_ts = datetime.fromisoformat(value).timestamp()
+        except (TypeError, ValueError):
+            self._last_modified_ts = 0.0
+
+    def _touch(self) -> str:
+        """Mark the strategy as modified now and return the ISO timestamp used"""
+        now = datetime.now()
+        self._last_modified = now.isoformat()
+        self._last_modified_ts = now.timestamp()
+        return self._last_modified
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for serialization"""
@@ -41,6 +68,7 @@ class StrategyConfig:
             'tags': self.tags,
             'created_at': self.created_at,
             'last_modified': self.last_modified,
+            'last_modified_ts': self._last_modified_ts,
             'performance_history': self.performance_history,
             'metadata': self.metadata
         }
@@ -55,8 +83,14 @@ class StrategyConfig:
             description=data.get('description', ''),
             tags=data.get('tags', [])
         )
-        config.created_at = data.get('created_at', datetime.now().isoformat())
-        config.last_modified = data.get('last_modified', config.created_at)
+        config.created_at = data.get('created_at', config.created_at)
+        last_modified_ts = data.get('last_modified_ts')
+        if 'last_modified' in data and isinstance(last_modified_ts, (int, float)):
+            # Stored epoch copy: no ISO parsing on load
+            config._last_modified = data['last_modified']
+            config._last_modified_ts = float(last_modified_ts)
+        else:
+            config.last_modified = data.get('last_modified', config.created_at)
         config.performance_history = data.get('performance_history', [])
         config.metadata = data.get('metadata', {})
         return config
@@ -64,15 +98,82 @@ class StrategyConfig:
     def update_performance(self, results: Dict):
         """Add performance results to history"""
         self.performance_history.append({
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': self._touch(),
             'results': results
         })
-        self.last_modified = datetime.now().isoformat()
     
     def add_metadata(self, key: str, value: Any):
         """Add metadata to strategy"""
         self.metadata[key] = value
-        self.last_modified = datetime.now().isoformat()
+        self._touch()
+
+
+class _LazyStrategies(MutableMapping):
+    """
+    Name -> StrategyConfig mapping over the parsed config file
+
+    Entries stay as the raw dicts read from disk until first accessed, when
+    they are turned into StrategyConfig objects and cached in place. Raw
+    entries cannot change, so their encoded JSON is kept between saves.
+    """
+
+    def __init__(self, raw: Dict = None):
+        self._data = dict(raw or {})
+        self._encoded = {}  # name -> encoded '"name": {...}' member of a raw entry
+
+    def __getitem__(self, name: str) -> StrategyConfig:
+        value = self._data[name]
+        if not isinstance(value, StrategyConfig):
+            value = self._data[name] = StrategyConfig.from_dict(value)
+            self._encoded.pop(name, None)
+        return value
+
+    def __setitem__(self, name: str, config: StrategyConfig):
+        self._data[name] = config
+        self._encoded.pop(name, None)
+
+    def __delitem__(self, name: str):
+        del self._data[name]
+        self._encoded.pop(name, None)
+
+    def __contains__(self, name) -> bool:
+        return name in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def index_fields(self):
+        """Yield (name, strategy_type, tags) without building configs"""
+        for name, value in self._data.items():
+            if isinstance(value, StrategyConfig):
+                yield name, value.strategy_type, value.tags
+            else:
+                # Stored tags may be null; StrategyConfig normalizes that to []
+                yield name, value.get('strategy_type'), value.get('tags') or []
+
+    def encode(self) -> bytes:
+        """
+        Indented JSON {name: config dict}; only built configs are re-encoded
+
+        Each member is encoded on its own and nested one level by
+        re-indenting its lines (JSON strings never contain raw newlines),
+        which gives the same bytes as encoding the whole mapping at once.
+        """
+        members = []
+        for name, value in self._data.items():
+            member = self._encoded.get(name)
+            if member is None:
+                body = value.to_dict() if isinstance(value, StrategyConfig) else value
+                member = dumps_json(name) + b': ' + dumps_json(body).replace(b'\n', b'\n  ')
+                if not isinstance(value, StrategyConfig):
+                    self._encoded[name] = member
+            members.append(member)
+        if not members:
+            return b'{}'
+        return b'{\n  ' + b',\n  '.join(members) + b'\n}'
 
 
 class StrategyManager:
@@ -80,24 +181,64 @@ class StrategyManager:
     
     def __init__(self, config_file: str = 'strategy_configs.json'):
         self.config_file = config_file
-        self.strategies = {}
+        self.strategies = _LazyStrategies()
+        # Secondary indices: strategy type / tag -> names of matching strategies
+        self._by_type = {}
+        self._by_tag = {}
         self.load_strategies()
     
     def load_strategies(self):
-        """Load all saved strategies"""
-        data = safe_json_load(self.config_file, {})
-        self.strategies = {
-            name: StrategyConfig.from_dict(config)
-            for name, config in data.items()
-        }
+        """Load all saved strategies (configs are built on first access)"""
+        try:
+            with open(self.config_file, 'rb') as f:
+                data = loads_json(f.read())
+        except Exception:
+            # Missing or unreadable file: fall back to the backup-aware loader
+            data = safe_json_load(self.config_file, {})
+        self.strategies = _LazyStrategies(data)
+        self._rebuild_indices()
+
+    def _rebuild_indices(self):
+        """Rebuild the type and tag indices from self.strategies"""
+        self._by_type = {}
+        self._by_tag = {}
+        for name, strategy_type, tags in self.strategies.index_fields():
+            self._add_to_indices(name, strategy_type, tags)
+
+    def _add_to_indices(self, name: str, strategy_type: str, tags: List[str]):
+        self._by_type.setdefault(strategy_type, set()).add(name)
+        for tag in tags:
+            self._by_tag.setdefault(tag, set()).add(name)
+
+    def _index(self, config: StrategyConfig):
+        """Add a strategy to the type and tag indices"""
+        self._add_to_indices(config.name, config.strategy_type, config.tags)
+
+    def _unindex(self, config: StrategyConfig):
+        """Remove a strategy from the type and tag indices"""
+        for index, keys in ((self._by_type, [config.strategy_type]), (self._by_tag, config.tags)):
+            for key in keys:
+                names = index.get(key)
+                if names is not None:
+                    names.discard(config.name)
+                    if not names:
+                        del index[key]
     
     def save_strategies(self):
-        """Save all strategies to file"""
-        data = {
-            name: config.to_dict()
-            for name, config in self.strategies.items()
-        }
-        safe_json_save(self.config_file, data)
+        """Save all strategies to file, keeping the previous file as a .backup"""
+        data = self.strategies.encode()
+        if os.path.exists(self.config_file):
+            try:
+                shutil.copyfile(self.config_file, self.config_file + '.backup')
+            except OSError:
+                pass
+        try:
+            with open(self.config_file, 'wb') as f:
+                f.write(data)
+            return True
+        except Exception as e:
+            print(f"❌ Error saving {self.config_file}: {e}")
+            return False
     
     def save_strategy(self, config: StrategyConfig) -> bool:
         """Save a strategy configuration"""
@@ -106,6 +247,7 @@ class StrategyManager:
                 raise ValidationError(f"Strategy '{config.name}' already exists. Use update instead.")
             
             self.strategies[config.name] = config
+            self._index(config)
             self.save_strategies()
             return True
         except Exception as e:
@@ -115,10 +257,11 @@ class StrategyManager:
     def update_strategy(self, name: str, updates: Dict) -> bool:
         """Update an existing strategy"""
         try:
-            if name not in self.strategies:
+            config = self.strategies.get(name)
+            if config is None:
                 raise ValidationError(f"Strategy '{name}' not found")
             
-            config = self.strategies[name]
+            self._unindex(config)
             
             if 'description' in updates:
                 config.description = updates['description']
@@ -128,8 +271,9 @@ class StrategyManager:
                 config.parameters.update(updates['parameters'])
             if 'metadata' in updates:
                 config.metadata.update(updates['metadata'])
+            self._index(config)
             
-            config.last_modified = datetime.now().isoformat()
+            config._touch()
             self.save_strategies()
             return True
         except Exception as e:
@@ -139,10 +283,11 @@ class StrategyManager:
     def delete_strategy(self, name: str) -> bool:
         """Delete a strategy"""
         try:
-            if name not in self.strategies:
+            config = self.strategies.pop(name, None)
+            if config is None:
                 raise ValidationError(f"Strategy '{name}' not found")
             
-            del self.strategies[name]
+            self._unindex(config)
             self.save_strategies()
             return True
         except Exception as e:
@@ -159,25 +304,26 @@ class StrategyManager:
     
     def list_strategies(self, strategy_type: str = None, tags: List[str] = None) -> List[StrategyConfig]:
         """List strategies with optional filters"""
-        results = list(self.strategies.values())
-        
-        if strategy_type:
-            results = [s for s in results if s.strategy_type == strategy_type]
+        if not strategy_type and not tags:
+            results = self.strategies.values()
+        else:
+            names = self._by_type.get(strategy_type, set()) if strategy_type else None
+            if tags:
+                tagged = set().union(*(self._by_tag.get(tag, ()) for tag in tags))
+                names = tagged if names is None else names & tagged
+            results = [self.strategies[name] for name in names]
         
-        if tags:
-            results = [s for s in results if any(tag in s.tags for tag in tags)]
-        
-        return sorted(results, key=lambda x: x.last_modified, reverse=True)
+        return sorted(results, key=lambda x: x._last_modified_ts, reverse=True)
     
     def export_strategy(self, name: str, export_path: str) -> bool:
         """Export a strategy to JSON file"""
         try:
-            if name not in self.strategies:
+            config = self.strategies.get(name)
+            if config is None:
                 raise ValidationError(f"Strategy '{name}' not found")
             
-            config = self.strategies[name]
-            with open(export_path, 'w') as f:
-                json.dump(config.to_dict(), f, indent=2)
+            with open(export_path, 'wb') as f:
+                f.write(dumps_json(config.to_dict()))
             
             return True
         except Exception as e:
@@ -187,8 +333,8 @@ class StrategyManager:
     def import_strategy(self, import_path: str, new_name: str = None) -> bool:
         """Import a strategy from JSON file"""
         try:
-            with open(import_path, 'r') as f:
-                data = json.load(f)
+            with open(import_path, 'rb') as f:
+                data = loads_json(f.read())
             
             config = StrategyConfig.from_dict(data)
             
@@ -199,6 +345,7 @@ class StrategyManager:
                 raise ValidationError(f"Strategy '{config.name}' already exists")
             
             self.strategies[config.name] = config
+            self._index(config)
             self.save_strategies()
             return True
         except Exception as e:
@@ -208,13 +355,13 @@ class StrategyManager:
     def clone_strategy(self, source_name: str, new_name: str) -> bool:
         """Clone an existing strategy"""
         try:
-            if source_name not in self.strategies:
+            source = self.strategies.get(source_name)
+            if source is None:
                 raise ValidationError(f"Strategy '{source_name}' not found")
             
             if new_name in self.strategies:
                 raise ValidationError(f"Strategy '{new_name}' already exists")
             
-            source = self.strategies[source_name]
             cloned = StrategyConfig(
                 name=new_name,
                 strategy_type=source.strategy_type,
@@ -224,6 +371,7 @@ class StrategyManager:
             )
             
             self.strategies[new_name] = cloned
+            self._index(cloned)
             self.save_strategies()
             return True
         except Exception as e:
@@ -232,16 +380,13 @@ class StrategyManager:
     
     def get_best_performing(self, n: int = 5, metric: str = 'return') -> List[StrategyConfig]:
         """Get top N best performing strategies"""
-        strategies_with_perf = []
-        
-        for config in self.strategies.values():
-            if config.performance_history:
-                latest = config.performance_history[-1]['results']
-                if metric in latest:
-                    strategies_with_perf.append((config, latest[metric]))
-        
-        strategies_with_perf.sort(key=lambda x: x[1], reverse=True)
-        return [s[0] for s in strategies_with_perf[:n]]
+        strategies_with_perf = (
+            (config, config.performance_history[-1]['results'][metric])
+            for config in self.strategies.values()
+            if config.performance_history and metric in config.performance_history[-1]['results']
+        )
+        top = heapq.nlargest(n, strategies_with_perf, key=lambda x: x[1])
+        return [s[0] for s in top]
     
     def search_strategies(self, query: str) -> List[StrategyConfig]:
         """Search strategies by name, description, or tags"""
@@ -257,6 +402,14 @@ class StrategyManager:
         return results
 
 
+# Optional strategy attributes recorded by create_strategy_from_execution
+_EXECUTION_PARAMS = ('lookback', 'prediction_horizon', 'entry_threshold', 'exit_threshold',
+                     'n_estimators', 'use_ensemble')
+
+# Default for getattr lookups where None is a legitimate attribute value
+_MISSING = object()
+
+
 def create_strategy_from_execution(strategy_obj, name: str, description: str = "", 
                                    tags: List[str] = None) -> StrategyConfig:
     """Create a StrategyConfig from a strategy object"""
@@ -270,25 +423,11 @@ def create_strategy_from_execution(strategy_obj, name: str, description: str = "
         'initial_capital': getattr(strategy_obj, 'cash', 100000),
     }
     
-    # Type-specific parameters
-    if hasattr(strategy_obj, 'lookback'):
-        parameters['lookback'] = strategy_obj.lookback
-    
-    if hasattr(strategy_obj, 'prediction_horizon'):
-        parameters['prediction_horizon'] = strategy_obj.prediction_horizon
-    
-    if hasattr(strategy_obj, 'entry_threshold'):
-        parameters['entry_threshold'] = strategy_obj.entry_threshold
-    
-    if hasattr(strategy_obj, 'exit_threshold'):
-        parameters['exit_threshold'] = strategy_obj.exit_threshold
-    
-    # ML-specific parameters
-    if hasattr(strategy_obj, 'n_estimators'):
-        parameters['n_estimators'] = strategy_obj.n_estimators
-    
-    if hasattr(strategy_obj, 'use_ensemble'):
-        parameters['use_ensemble'] = strategy_obj.use_ensemble
+    # Type-specific and ML-specific parameters, one lookup each
+    for attr in _EXECUTION_PARAMS:
+        value = getattr(strategy_obj, attr, _MISSING)
+        if value is not _MISSING:
+            parameters[attr] = value
     
     return StrategyConfig(
         name=name,
@@ -6,14 +6,351 @@ Optimizes strategy parameters using grid search, random search, or Bayesian opti
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple, Any, Callable
+from collections import Counter
+from functools import lru_cache
 from itertools import product as iter_product
 import json
 import math
-from datetime import datetime, timedelta
+import multiprocessing
+import os
+import pickle
+import random
+import time
+from datetime import date, datetime, timedelta
 from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.shared_memory import SharedMemory
 import warnings
 warnings.filterwarnings('ignore')
 
+import optimizer_kernels
+from optimizer_kernels import equity_stats, trade_pair_stats
+
+try:
+    from tqdm.auto import tqdm
+except ImportError:  # tqdm is optional; fall back to periodic progress prints
+    tqdm = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; save_results falls back to the stdlib encoder
+    orjson = None
+
+_PROGRESS_INTERVAL = 0.5  # Minimum seconds between progress updates
+_SAVE_BUFFER_SIZE = 256 * 1024  # File buffer for save_results
+_DENSE_SURFACE_POINTS = 5000  # Above this, surface plots switch to lightweight markers
+
+
+def _progress(evaluations, total: int, desc: str, verbose: bool, skip_count: List[int] = None):
+    """
+    Wrap evaluations in a time-throttled progress display when verbose
+    
+    tqdm draws a bar when installed; otherwise _progress_lines prints one.
+    Either way output is rate-limited by the clock, not by result count.
+    skip_count is the _admitted counter feeding evaluations: combinations the
+    constraints reject count as done too, so the display reaches total.
+    """
+    if not verbose:
+        return evaluations
+    if tqdm is not None:
+        return _progress_bar(evaluations, total, desc, skip_count)
+    return _progress_lines(evaluations, total, skip_count)
+
+
+def _progress_bar(evaluations, total: int, desc: str, skip_count: List[int] = None):
+    """Pass evaluations through a tqdm bar advanced by evaluated and skipped combinations"""
+    evaluated = 0
+    with tqdm(total=total, desc=desc, mininterval=_PROGRESS_INTERVAL, leave=False) as bar:
+        for item in evaluations:
+            yield item
+            evaluated += 1
+            bar.update(evaluated + (skip_count[0] if skip_count else 0) - bar.n)
+        bar.update(evaluated + (skip_count[0] if skip_count else 0) - bar.n)
+
+
+def _progress_lines(evaluations, total: int, skip_count: List[int] = None):
+    """Pass evaluations through, printing count, rate and ETA at most every _PROGRESS_INTERVAL and at the end"""
+    start = last = time.monotonic()
+    evaluated = 0
+    done = 0
+    shown = 0
+    for item in evaluations:
+        yield item
+        evaluated += 1
+        done = evaluated + (skip_count[0] if skip_count else 0)
+        now = time.monotonic()
+        if now - last >= _PROGRESS_INTERVAL:
+            last = now
+            shown = done
+            rate = done / (now - start)
+            eta = max(total - done, 0) / rate
+            print(f"   Progress: {done}/{total} ({done/total*100:.1f}%) {rate:.1f}/s, ETA {eta:.0f}s")
+    done = evaluated + (skip_count[0] if skip_count else 0)
+    if done and shown != done:
+        print(f"   Progress: {done}/{total} ({done/total*100:.1f}%) in {time.monotonic() - start:.1f}s")
+
+
+def _say(message: str):
+    """Print a message without breaking an active progress bar"""
+    if tqdm is not None:
+        tqdm.write(message)
+    else:
+        print(message)
+
+
+def _combination_at(param_values: List[List], sizes: List[int], idx: int) -> tuple:
+    """
+    The idx-th tuple of itertools.product(*param_values), by mixed-radix decoding
+    
+    The last parameter varies fastest, matching product's iteration order.
+    """
+    values = [None] * len(sizes)
+    for pos in range(len(sizes) - 1, -1, -1):
+        idx, digit = divmod(idx, sizes[pos])
+        values[pos] = param_values[pos][digit]
+    return tuple(values)
+
+
+def _floyd_sample(n: int, k: int, rng: np.random.Generator) -> set:
+    """
+    k distinct integers from range(n) by Floyd's algorithm
+    
+    O(k) time and memory however large n is: step j draws t from [0, j] and
+    takes t, or j itself if t was already chosen.
+    """
+    steps = range(n - k, n)
+    if n < np.iinfo(np.int64).max:
+        # Each step's draw depends only on j, so all k draws come from one call
+        draws = rng.integers(0, np.arange(n - k + 1, n + 1, dtype=np.int64)).tolist()
+    else:
+        # Beyond int64: arbitrary-precision draws from a generator seeded by rng
+        local = random.Random(int(rng.integers(0, 2**63)))
+        draws = [local.randrange(j + 1) for j in steps]
+    chosen = set()
+    for j, t in zip(steps, draws):
+        chosen.add(t if t not in chosen else j)
+    return chosen
+
+
+def _to_equity_array(equity_curve) -> np.ndarray:
+    """
+    Equity curve as a contiguous float64 array
+    
+    Accepts a list of values, a list of {'Value': ...} dicts (read in one
+    fromiter pass), or an array/Series.
+    """
+    if equity_curve is None:
+        return np.empty(0)
+    if isinstance(equity_curve, (list, tuple)) and equity_curve and isinstance(equity_curve[0], dict):
+        return np.fromiter((e['Value'] for e in equity_curve), dtype=np.float64, count=len(equity_curve))
+    return np.ascontiguousarray(equity_curve, dtype=np.float64)
+
+
+def _orjson_dumps(obj, indent: bytes = b'') -> bytes:
+    """orjson encoding used by save_results, re-indented to nest at the given depth"""
+    encoded = orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2
+                           | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return encoded.replace(b'\n', b'\n' + indent) if indent else encoded
+
+
+def _write_json_streamed(f, data: Dict):
+    """
+    Write data as 2-space indented JSON, encoding list values element by element
+    
+    The bytes equal one orjson.dumps of the whole dict, but only one result
+    entry is encoded in memory at a time.
+    """
+    f.write(b'{')
+    for n, (key, value) in enumerate(data.items()):
+        f.write(b',\n  ' if n else b'\n  ')
+        f.write(_orjson_dumps(str(key)) + b': ')
+        if isinstance(value, list) and value:
+            for i, item in enumerate(value):
+                f.write(b',\n    ' if i else b'[\n    ')
+                f.write(_orjson_dumps(item, b'    '))
+            f.write(b'\n  ]')
+        else:
+            f.write(_orjson_dumps(value, b'  '))
+    f.write(b'\n}' if data else b'}')
+
+
+def _optimize_layout(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Give every strided numeric column of df its own contiguous buffer, in place
+    
+    A frame wrapping a row-major 2-D array without copying keeps each column
+    as a strided view, so every df[col].to_numpy() scan in every backtest
+    walks memory a row width apart. Columns that are already contiguous (the
+    usual case for normalized data) are left alone.
+    """
+    for col in df.columns:
+        values = df[col].to_numpy()
+        if values.dtype.kind in 'iuf' and not values.flags.c_contiguous:
+            df[col] = np.ascontiguousarray(values)
+    return df
+
+
+class _NoDataError(Exception):
+    """The data source returned no rows (raised, not returned, so lru_cache does not keep it)"""
+
+
+@lru_cache(maxsize=32)
+def _load_normalized(symbol: str, start: str, end: str, fetched_on: str) -> pd.DataFrame:
+    """
+    Fetch and normalize symbol's data between ISO dates; _NoDataError if there is none
+    
+    fetched_on (today's ISO date) only keys the cache: windows ending today
+    gain new bars, so entries expire daily like DataManager's CSV cache.
+    """
+    from data_manager import DataManager
+    from data_normalization import DataNormalizer
+    
+    raw_df = DataManager().fetch_data(symbol, start, end)
+    if raw_df is None or len(raw_df) == 0:
+        raise _NoDataError(f"No data available for {symbol}")
+    df, _ = DataNormalizer().normalize_market_data(raw_df, symbol=symbol, require_ohlc=False)
+    return _optimize_layout(df)
+
+
+def _fetch_and_normalize(symbol: str, start: str, end: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Normalized data for symbol between ISO dates, shared across searches
+    
+    Repeated searches over the same window on the same day reuse one fetch
+    and normalization. Returns (frame, source): frame is a deep copy the caller may modify on
+    any pandas version, source is the cached frame itself. source stays the
+    same object until the cache entry is dropped, so it identifies the data
+    for the outcome cache; it must not be modified.
+    """
+    source = _load_normalized(symbol, start, end, date.today().isoformat())
+    return source.copy(), source
+
+
+def clear_data_cache():
+    """Forget data fetched by earlier searches (e.g. after the source updates)"""
+    _load_normalized.cache_clear()
+
+
+def monotone(lower: str, upper: str) -> Callable[[Dict], bool]:
+    """Search constraint requiring params[lower] < params[upper] (e.g. fast < slow period)"""
+    return lambda params: params[lower] < params[upper]
+
+
+def _admitted(params_iter, constraints, skip_count: List[int]):
+    """Yield the parameter sets constraints accepts; rejected ones are counted in skip_count[0]"""
+    for params in params_iter:
+        if constraints is not None and not constraints(params):
+            skip_count[0] += 1
+            continue
+        yield params
+
+
+def _params_key(params: Dict):
+    """Hashable identity of a parameter set, or None if a value is unhashable"""
+    key = tuple(sorted(params.items()))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _reused(outcome):
+    """A cached outcome with its own metrics dict, so result entries stay independent"""
+    if isinstance(outcome, Exception):
+        return outcome
+    score, metrics, category = outcome
+    return score, dict(metrics), category
+
+
+class _SharedFrame:
+    """
+    Picklable handle to a DataFrame whose columns live in one SharedMemory block
+    
+    Columns are laid out one after another (column-major, 64-byte aligned), so
+    attaching gives each worker zero-copy NumPy views instead of its own
+    unpickled copy of the data. Only the index and column labels are pickled.
+    """
+    
+    __slots__ = ('name', 'columns', 'index', 'attrs')
+    
+    @classmethod
+    def create(cls, df):
+        """Copy df into a new shared block; (shm, handle), or (None, None) if df has non-NumPy columns"""
+        if not isinstance(df, pd.DataFrame) or df.empty or not df.columns.is_unique:
+            return None, None
+        layout, size = [], 0
+        for col, dtype in df.dtypes.items():
+            if not isinstance(dtype, np.dtype) or dtype.kind not in 'biufM':
+                return None, None
+            size = -(-size // 64) * 64
+            layout.append((col, dtype.str, size))
+            size += dtype.itemsize * len(df)
+        shm = SharedMemory(create=True, size=size)
+        for col, dtype, offset in layout:
+            view = np.ndarray((len(df),), dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            view[:] = df[col].to_numpy()
+            del view  # release the buffer export so shm can close
+        handle = cls()
+        handle.name = shm.name
+        handle.columns = layout
+        handle.index = df.index
+        handle.attrs = dict(df.attrs)
+        return shm, handle
+    
+    def attach(self):
+        """(shm, DataFrame of views into the block); keep shm open while the frame is in use"""
+        shm = SharedMemory(name=self.name)
+        n = len(self.index)
+        columns = {col: np.ndarray((n,), dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+                   for col, dtype, offset in self.columns}
+        df = pd.DataFrame(columns, index=self.index, copy=False)
+        df.attrs.update(self.attrs)
+        return shm, df
+    
+    def __getstate__(self):
+        return self.name, self.columns, self.index, self.attrs
+    
+    def __setstate__(self, state):
+        self.name, self.columns, self.index, self.attrs = state
+
+
+def _share_data_in_memory() -> bool:
+    """Whether pool workers need the data in shared memory (they do not inherit it via fork)"""
+    return multiprocessing.get_start_method() != 'fork'
+
+
+# Per-worker search context set by _init_worker: (optimizer, symbol, start_date,
+# end_date, initial_capital, data). Shipped once per worker process rather than
+# pickled with every task.
+_WORKER_CONTEXT = None
+_WORKER_SHM = None  # shared block backing the worker's data, kept open for its lifetime
+
+
+def _init_worker(strategy_class, metric, symbol, start_date, end_date, initial_capital, data):
+    """ProcessPoolExecutor initializer: keep the search context in this worker"""
+    global _WORKER_CONTEXT, _WORKER_SHM
+    optimizer_kernels.warmup()
+    if isinstance(data, _SharedFrame):
+        _WORKER_SHM, data = data.attach()
+    _WORKER_CONTEXT = (StrategyOptimizer(strategy_class, metric=metric),
+                       symbol, start_date, end_date, initial_capital, data)
+
+
+def _evaluate_outcome(params):
+    """
+    Evaluate one parameter set in a worker process
+    
+    Module-level so ProcessPoolExecutor can pickle it; only params travel with
+    each task. Returns the (score, metrics, category) tuple, or the exception
+    _evaluate_params raised so the parent can categorize it exactly as in a
+    serial run.
+    """
+    optimizer, symbol, start_date, end_date, initial_capital, data = _WORKER_CONTEXT
+    try:
+        return optimizer._evaluate_params(params, symbol, start_date, end_date, initial_capital, data)
+    except Exception as e:
+        return e
+
 
 class StrategyOptimizer:
     """Optimize strategy parameters"""
@@ -24,6 +361,12 @@ class StrategyOptimizer:
         self.best_params = None
         self.best_score = float('-inf')
         self.optimization_results = []
+        self.cache_hits = 0  # outcomes reused in the last search, from any source
+        self.duplicate_hits = 0  # of those, repeats of a parameter set within that search
+        # Outcomes by parameter key for the current (data, symbol, dates, capital);
+        # reused across searches on the same inputs
+        self._eval_cache = {}
+        self._eval_cache_inputs = None
         
     def grid_search(self, param_grid: Dict[str, List], 
                     symbol: str, start_date, end_date, 
@@ -31,7 +374,11 @@ class StrategyOptimizer:
                     max_combinations: int = 100,
                     data: pd.DataFrame = None,
                     verbose: bool = True,
-                    seed: int = 42) -> Dict[str, Any]:
+                    seed: int = 42,
+                    n_jobs: int = 1,
+                    constraints: Callable[[Dict], bool] = None,
+                    use_successive_halving: bool = False,
+                    initial_fraction: float = 0.2) -> Dict[str, Any]:
         """
         Grid search over parameter space
         
@@ -49,6 +396,18 @@ class StrategyOptimizer:
             verbose: Whether to print progress updates. Default True for
                      interactive use, set False for batch operations.
             seed: Random seed for deterministic sampling. Default 42.
+            n_jobs: Worker processes for evaluating combinations. Default 1
+                    (serial); -1 uses every core.
+            constraints: Optional predicate on a params dict; combinations it
+                         rejects (e.g. monotone('fast_period', 'slow_period'))
+                         are counted as skipped and never backtested.
+            use_successive_halving: Backtest every combination on the first
+                                    initial_fraction of the data and fully
+                                    backtest only those scoring at or above
+                                    the median partial score. Pruned
+                                    combinations are counted as skipped.
+            initial_fraction: Share of the data (0 < f < 1) used for the
+                              partial round. Default 0.2.
         
         Returns:
             Consistent schema dict with:
@@ -66,6 +425,27 @@ class StrategyOptimizer:
             - top_results: list (up to 10 best results)
             - all_results: list (for backwards compat)
         """
+        if use_successive_halving and not 0 < initial_fraction < 1:
+            raise ValueError(f"initial_fraction must be between 0 and 1, got {initial_fraction}")
+        
+        empty = [name for name, values in param_grid.items() if len(values) == 0]
+        if empty:
+            return {
+                'success': False,
+                'best_params': {},
+                'best_score': None,
+                'tested': 0,
+                'valid': 0,
+                'failures': 0,
+                'skipped': 0,
+                'error': f"No values to search for: {', '.join(empty)}",
+                'warnings': [],
+                'failure_summary': {'empty_grid': 1},
+                'example_failures': [],
+                'top_results': [],
+                'all_results': []
+            }
+        
         if verbose:
             print(f"\nStarting Grid Search Optimization")
             print(f"   Symbol: {symbol}")
@@ -78,29 +458,24 @@ class StrategyOptimizer:
         failures = 0
         skipped = 0
         failure_reasons = []
-        failure_categories = {}  # Track by category
+        failure_categories = Counter()  # Track by category
         warnings_list = []
         
         # USE PROVIDED DATA or FETCH ONCE for all combinations
-        df = data
+        df = source = data
         if df is not None:
             if verbose:
                 print(f"   Using provided data ({len(df)} rows)")
         else:
             try:
-                from data_manager import DataManager
-                from data_normalization import DataNormalizer, DataContractError
+                from data_normalization import DataContractError
                 
                 if verbose:
                     print(f"   Fetching and normalizing data...")
-                data_manager = DataManager()
-                raw_df = data_manager.fetch_data(
-                    symbol,
-                    start_date.strftime('%Y-%m-%d'),
-                    end_date.strftime('%Y-%m-%d')
-                )
-                
-                if raw_df is None or len(raw_df) == 0:
+                try:
+                    df, source = _fetch_and_normalize(symbol, start_date.strftime('%Y-%m-%d'),
+                                                      end_date.strftime('%Y-%m-%d'))
+                except _NoDataError:
                     return {
                         'success': False,
                         'best_params': {},
@@ -117,13 +492,6 @@ class StrategyOptimizer:
                         'all_results': []
                     }
                 
-                normalizer = DataNormalizer()
-                df, metadata = normalizer.normalize_market_data(
-                    raw_df,
-                    symbol=symbol,
-                    require_ohlc=False
-                )
-                
                 if verbose:
                     print(f"   OK Loaded {len(df)} rows of normalized data")
                 
@@ -187,15 +555,15 @@ class StrategyOptimizer:
                 print(f"   [WARN]  {msg}")
             warnings_list.append(msg)
             
-            # Use reservoir sampling or indexed sampling
-            np.random.seed(seed)
-            sampled_indices = set(np.random.choice(total_combinations, min(max_combinations, total_combinations), replace=False))
+            # Floyd-sample product indices (no N-sized buffer) and decode each directly
+            sampled_indices = _floyd_sample(total_combinations, max_combinations,
+                                            np.random.default_rng(seed))
+            sizes = [len(v) for v in param_values]
             
             def sampled_combinations():
-                """Yield only the sampled combinations without materializing all"""
-                for idx, values in enumerate(iter_product(*param_values)):
-                    if idx in sampled_indices:
-                        yield values
+                """Yield only the sampled combinations, in product order, without enumerating the grid"""
+                for idx in sorted(sampled_indices):
+                    yield _combination_at(param_values, sizes, idx)
             
             combinations_iter = sampled_combinations()
             num_to_test = len(sampled_indices)
@@ -203,43 +571,63 @@ class StrategyOptimizer:
         if verbose:
             print(f"   Testing {num_to_test} parameter combinations...")
         
-        results = []
-        for i, values in enumerate(combinations_iter, 1):
-            params = dict(zip(param_names, values))
+        skip_count = [0]
+        params_iter = _admitted((dict(zip(param_names, values)) for values in combinations_iter),
+                                constraints, skip_count)
+        if use_successive_halving:
+            candidates = list(params_iter)
+            params_iter, threshold = self._successive_halving(
+                candidates, symbol, start_date, end_date, initial_capital, df, n_jobs, initial_fraction)
+            pruned = len(candidates) - len(params_iter)
+            skipped += pruned
+            num_to_test = len(params_iter)
+            if pruned:
+                msg = (f"Successive halving pruned {pruned} of {len(candidates)} combinations "
+                       f"scoring below {threshold:.4f} on the first {initial_fraction:.0%} of the data")
+                warnings_list.append(msg)
+                if verbose:
+                    print(f"   {msg}")
+        # Constraint skips advance the progress display, unless halving already took them out of num_to_test
+        progress_skips = None if use_successive_halving else skip_count
+        
+        # One slot per combination; slots of failed combinations stay None / -inf
+        results = [None] * num_to_test
+        scores = np.full(num_to_test, -np.inf)
+        # Run backtests with these parameters (passing pre-fetched data)
+        evaluations = _progress(self._evaluations(
+            params_iter, symbol, start_date, end_date, initial_capital, df, n_jobs,
+            cache_source=source
+        ), num_to_test, 'grid_search', verbose, progress_skips)
+        for i, (params, outcome) in enumerate(evaluations, 1):
             tested += 1
             
             try:
-                # Run backtest with these parameters (passing pre-fetched data)
-                score, metrics, category = self._evaluate_params(
-                    params, symbol, start_date, end_date, initial_capital, df
-                )
+                if isinstance(outcome, Exception):
+                    raise outcome
+                score, metrics, category = outcome
                 
                 # Check for valid score
-                if score is None or not np.isfinite(score):
+                if score is None or not math.isfinite(score):
                     failures += 1
                     cat = category or 'invalid_score'
-                    failure_categories[cat] = failure_categories.get(cat, 0) + 1
-                    reason = f"{params}: Invalid score ({score})"
+                    failure_categories[cat] += 1
                     if len(failure_reasons) < 10:
-                        failure_reasons.append(reason)
+                        failure_reasons.append(f"{params}: Invalid score ({score})")
                     continue
                 
                 valid += 1
-                results.append({
+                scores[i - 1] = score
+                results[i - 1] = {
                     'params': params,
                     'score': score,
                     'metrics': metrics
-                })
+                }
                 
                 if score > self.best_score:
                     self.best_score = score
                     self.best_params = params
                     if verbose:
-                        print(f"   OK New best: {score:.4f} with {params}")
-                    
-                # Progress
-                if verbose and i % 10 == 0:
-                    print(f"   Progress: {i}/{num_to_test} ({i/num_to_test*100:.1f}%)")
+                        _say(f"   OK New best: {score:.4f} with {params}")
                     
             except Exception as e:
                 failures += 1
@@ -250,16 +638,16 @@ class StrategyOptimizer:
                     if error_str.startswith(f"{known_cat}:"):
                         cat = known_cat
                         break
-                failure_categories[cat] = failure_categories.get(cat, 0) + 1
-                reason = f"{params}: {type(e).__name__}: {str(e)[:100]}"
+                failure_categories[cat] += 1
                 if len(failure_reasons) < 10:
-                    failure_reasons.append(reason)
+                    failure_reasons.append(f"{params}: {type(e).__name__}: {error_str[:100]}")
                 if verbose:
-                    print(f"   X Error with {params}: {e}")
+                    _say(f"   X Error with {params}: {e}")
                 continue
+        skipped += skip_count[0]
         
-        # Sort results
-        self.optimization_results = sorted(results, key=lambda x: x['score'], reverse=True)
+        # Rank results (only the top 10 are sorted now)
+        top_results = self._set_results(results, scores)
         
         # Determine success
         success = valid > 0 and self.best_params is not None
@@ -275,10 +663,10 @@ class StrategyOptimizer:
             'skipped': skipped,
             'error': None,
             'warnings': warnings_list,
-            'failure_summary': failure_categories,
+            'failure_summary': dict(failure_categories),
             'example_failures': failure_reasons,
-            'top_results': self.optimization_results[:10],
-            'all_results': self.optimization_results[:10]  # For backwards compat
+            'top_results': top_results,
+            'all_results': list(top_results)  # For backwards compat
         }
         
         # Set error message if no valid results
@@ -296,6 +684,10 @@ class StrategyOptimizer:
         if verbose:
             print(f"\n{'[OK]' if success else '[FAIL]'} Optimization {'Complete' if success else 'Failed'}!")
             print(f"   Tested: {tested} | Valid: {valid} | Failed: {failures} | Skipped: {skipped}")
+            if self.duplicate_hits:
+                print(f"   Duplicate parameter sets reused: {self.duplicate_hits}")
+            if self.cache_hits > self.duplicate_hits:
+                print(f"   Outcomes reused from earlier searches: {self.cache_hits - self.duplicate_hits}")
             if success:
                 print(f"   Best Score: {self.best_score:.4f}")
                 print(f"   Best Params: {self.best_params}")
@@ -303,7 +695,7 @@ class StrategyOptimizer:
                 print(f"   Error: {result_dict['error']}")
                 if failure_categories:
                     print(f"   Failure categories:")
-                    for cat, count in sorted(failure_categories.items(), key=lambda x: -x[1])[:3]:
+                    for cat, count in failure_categories.most_common(3):
                         print(f"     {cat}: {count}")
                 if failure_reasons:
                     print(f"   Example failures (first {min(len(failure_reasons), 3)}):")
@@ -318,7 +710,9 @@ class StrategyOptimizer:
                       n_iterations: int = 50,
                       data: pd.DataFrame = None,
                       verbose: bool = True,
-                      seed: int = 42) -> Dict[str, Any]:
+                      seed: int = 42,
+                      n_jobs: int = 1,
+                      constraints: Callable[[Dict], bool] = None) -> Dict[str, Any]:
         """
         Random search over parameter space
         
@@ -336,6 +730,10 @@ class StrategyOptimizer:
             verbose: Whether to print progress updates. Default True for
                      interactive use, set False for batch operations.
             seed: Random seed for deterministic sampling. Default 42.
+            n_jobs: Worker processes for evaluating samples. Default 1
+                    (serial); -1 uses every core.
+            constraints: Optional predicate on a params dict; samples it
+                         rejects are counted as skipped and never backtested.
         
         param_distributions example:
         {
@@ -358,29 +756,24 @@ class StrategyOptimizer:
         failures = 0
         skipped = 0
         failure_reasons = []
-        failure_categories = {}
+        failure_categories = Counter()
         warnings_list = []
         
         # USE PROVIDED DATA or FETCH ONCE for all iterations
-        df = data
+        df = source = data
         if df is not None:
             if verbose:
                 print(f"   Using provided data ({len(df)} rows)")
         else:
             try:
-                from data_manager import DataManager
-                from data_normalization import DataNormalizer, DataContractError
+                from data_normalization import DataContractError
                 
                 if verbose:
                     print(f"   Fetching and normalizing data...")
-                data_manager = DataManager()
-                raw_df = data_manager.fetch_data(
-                    symbol,
-                    start_date.strftime('%Y-%m-%d'),
-                    end_date.strftime('%Y-%m-%d')
-                )
-                
-                if raw_df is None or len(raw_df) == 0:
+                try:
+                    df, source = _fetch_and_normalize(symbol, start_date.strftime('%Y-%m-%d'),
+                                                      end_date.strftime('%Y-%m-%d'))
+                except _NoDataError:
                     return {
                         'success': False,
                         'best_params': {},
@@ -397,13 +790,6 @@ class StrategyOptimizer:
                         'all_results': []
                     }
                 
-                normalizer = DataNormalizer()
-                df, metadata = normalizer.normalize_market_data(
-                    raw_df,
-                    symbol=symbol,
-                    require_ohlc=False
-                )
-                
                 if verbose:
                     print(f"   OK Loaded {len(df)} rows of normalized data")
                 
@@ -424,48 +810,62 @@ class StrategyOptimizer:
                     'all_results': []
                 }
         
-        results = []
-        np.random.seed(seed)
+        # A non-positive iteration count runs nothing rather than failing below
+        n_iterations = max(n_iterations, 0)
+        # One slot per iteration; slots of failed iterations stay None / -inf
+        results = [None] * n_iterations
+        scores = np.full(n_iterations, -np.inf)
+        skip_count = [0]
+        # Local generator (no global RNG state); every draw made in one call per parameter
+        rng = np.random.default_rng(seed)
+        samples = {}
+        for param_name, (min_val, max_val) in param_distributions.items():
+            if isinstance(min_val, int) and isinstance(max_val, int):
+                samples[param_name] = rng.integers(min_val, max_val + 1, size=n_iterations)
+            else:
+                samples[param_name] = rng.uniform(min_val, max_val, size=n_iterations)
         
-        for i in range(n_iterations):
-            # Sample random parameters
-            params = {}
-            for param_name, (min_val, max_val) in param_distributions.items():
-                if isinstance(min_val, int) and isinstance(max_val, int):
-                    params[param_name] = np.random.randint(min_val, max_val + 1)
-                else:
-                    params[param_name] = np.random.uniform(min_val, max_val)
-            
+        def sampled_params():
+            """One parameter set per iteration, as plain Python ints/floats"""
+            for i in range(n_iterations):
+                yield {param_name: values[i].item() for param_name, values in samples.items()}
+        
+        # Pass pre-fetched data to avoid per-iteration downloads
+        evaluations = _progress(self._evaluations(
+            _admitted(sampled_params(), constraints, skip_count),
+            symbol, start_date, end_date, initial_capital, df, n_jobs,
+            cache_source=source
+        ), n_iterations, 'random_search', verbose, skip_count)
+        for i, (params, outcome) in enumerate(evaluations):
             tested += 1
             
             try:
-                # Pass pre-fetched data to avoid per-iteration downloads
-                score, metrics, category = self._evaluate_params(
-                    params, symbol, start_date, end_date, initial_capital, df
-                )
+                if isinstance(outcome, Exception):
+                    raise outcome
+                score, metrics, category = outcome
                 
                 # Check for valid score
-                if score is None or not np.isfinite(score):
+                if score is None or not math.isfinite(score):
                     failures += 1
                     cat = category or 'invalid_score'
-                    failure_categories[cat] = failure_categories.get(cat, 0) + 1
-                    reason = f"{params}: Invalid score ({score})"
+                    failure_categories[cat] += 1
                     if len(failure_reasons) < 10:
-                        failure_reasons.append(reason)
+                        failure_reasons.append(f"{params}: Invalid score ({score})")
                     continue
                 
                 valid += 1
-                results.append({
+                scores[i] = score
+                results[i] = {
                     'params': params,
                     'score': score,
                     'metrics': metrics
-                })
+                }
                 
                 if score > self.best_score:
                     self.best_score = score
                     self.best_params = params
                     if verbose:
-                        print(f"   OK Iteration {i+1}: New best {score:.4f}")
+                        _say(f"   OK Iteration {i+1}: New best {score:.4f}")
                     
             except Exception as e:
                 failures += 1
@@ -476,15 +876,15 @@ class StrategyOptimizer:
                     if error_str.startswith(f"{known_cat}:"):
                         cat = known_cat
                         break
-                failure_categories[cat] = failure_categories.get(cat, 0) + 1
-                reason = f"{params}: {type(e).__name__}: {str(e)[:100]}"
+                failure_categories[cat] += 1
                 if len(failure_reasons) < 10:
-                    failure_reasons.append(reason)
+                    failure_reasons.append(f"{params}: {type(e).__name__}: {error_str[:100]}")
                 if verbose:
-                    print(f"   X Iteration {i+1} failed: {e}")
+                    _say(f"   X Iteration {i+1} failed: {e}")
                 continue
+        skipped += skip_count[0]
         
-        self.optimization_results = sorted(results, key=lambda x: x['score'], reverse=True)
+        top_results = self._set_results(results, scores)
         
         # Determine success
         success = valid > 0 and self.best_params is not None
@@ -500,10 +900,10 @@ class StrategyOptimizer:
             'skipped': skipped,
             'error': None,
             'warnings': warnings_list,
-            'failure_summary': failure_categories,
+            'failure_summary': dict(failure_categories),
             'example_failures': failure_reasons,
-            'top_results': self.optimization_results[:10],
-            'all_results': self.optimization_results[:10]
+            'top_results': top_results,
+            'all_results': list(top_results)
         }
         
         # Set error message if no valid results
@@ -517,13 +917,213 @@ class StrategyOptimizer:
         # Print summary
         if verbose:
             print(f"\n{'[OK]' if success else '[FAIL]'} Random Search {'Complete' if success else 'Failed'}!")
-            print(f"   Tested: {tested} | Valid: {valid} | Failed: {failures}")
+            print(f"   Tested: {tested} | Valid: {valid} | Failed: {failures} | Skipped: {skipped}")
+            if self.duplicate_hits:
+                print(f"   Duplicate parameter sets reused: {self.duplicate_hits}")
+            if self.cache_hits > self.duplicate_hits:
+                print(f"   Outcomes reused from earlier searches: {self.cache_hits - self.duplicate_hits}")
             if success:
                 print(f"   Best Score: {self.best_score:.4f}")
                 print(f"   Best Params: {self.best_params}")
         
         return result_dict
     
+    @property
+    def optimization_results(self) -> List[Dict]:
+        """Valid results of the last search, best score first (fully sorted on first access)"""
+        if not self._results_ranked:
+            order = np.argsort(-self._result_scores, kind='stable')
+            self._optimization_results = [self._optimization_results[i] for i in order]
+            self._results_ranked = True
+        return self._optimization_results
+    
+    @optimization_results.setter
+    def optimization_results(self, results: List[Dict]):
+        self._optimization_results = results
+        self._results_ranked = True
+    
+    def _set_results(self, results: List, scores: np.ndarray) -> List[Dict]:
+        """
+        Keep the valid entries of results and return the top 10, best first
+        
+        scores[i] is the score of results[i] (-inf for empty slots), so ranking
+        scans one float64 buffer instead of the result dicts. Every entry tied
+        with the 10th best score stays a candidate and candidates are ordered by
+        a stable sort, so ties rank in evaluation order; the full sort is
+        deferred until optimization_results is read.
+        """
+        filled = np.flatnonzero(scores > -np.inf)
+        self._optimization_results = [results[i] for i in filled]
+        self._result_scores = scores[filled]
+        self._results_ranked = False
+        valid_scores = self._result_scores
+        candidates = np.arange(len(valid_scores))
+        if len(valid_scores) > 10:
+            candidates = np.flatnonzero(valid_scores >= np.partition(valid_scores, -10)[-10])
+        top = candidates[np.argsort(-valid_scores[candidates], kind='stable')[:10]]
+        return [self._optimization_results[i] for i in top]
+    
+    def _evaluations(self, params_iter, symbol: str, start_date, end_date,
+                     initial_capital: float, data, n_jobs: int, use_cache: bool = True,
+                     cache_source=None):
+        """
+        Yield (params, outcome) for each parameter set, in submission order
+        
+        outcome is the (score, metrics, category) tuple from _evaluate_params, or
+        the exception it raised. With n_jobs > 1 (or -1 for all cores) the
+        evaluations run in a process pool; results are still consumed in
+        submission order so best-score ties resolve exactly as in a serial run.
+        The strategy class, dates and data reach each worker once, through the
+        pool initializer; tasks carry only their parameter set. Workers that do
+        not fork from this process read the data from shared memory rather than
+        unpickling a copy each. Strategy classes that cannot be pickled (e.g.
+        defined inside a function) are evaluated serially.
+        
+        Repeated parameter sets (common in random search over integer ranges)
+        reuse the first outcome instead of re-running the backtest. Every reuse
+        is counted in self.cache_hits, repeats within this pass also in
+        self.duplicate_hits. Outcomes stay cached for later searches on the
+        same data object (or cache_source, the cached frame data was copied
+        from), symbol, dates and capital. Strategy classes whose
+        backtests are not deterministic opt out with
+        STRATEGY_IS_DETERMINISTIC = False; use_cache=False bypasses the cache
+        for a single pass without disturbing it.
+        """
+        self.cache_hits = self.duplicate_hits = 0
+        cache = (self._outcome_cache(data if cache_source is None else cache_source,
+                                     symbol, start_date, end_date, initial_capital)
+                 if use_cache else None)
+        workers = os.cpu_count() if n_jobs == -1 else n_jobs
+        if workers and workers > 1 and self._picklable_strategy():
+            params_list = list(params_iter)
+            if not params_list:
+                return
+            # Compile the metric kernels here, before workers fork or spawn
+            optimizer_kernels.warmup()
+            shm, shared = _SharedFrame.create(data) if _share_data_in_memory() else (None, None)
+            context = (self.strategy_class, self.metric, symbol, start_date, end_date,
+                       initial_capital, data if shared is None else shared)
+            try:
+                yield from self._pool_evaluations(params_list, context, workers, cache)
+            finally:
+                if shm is not None:
+                    shm.close()
+                    shm.unlink()
+            return
+        
+        seen = set()
+        for params in params_iter:
+            key = _params_key(params) if cache is not None else None
+            if key is not None:
+                if key in seen:
+                    self.duplicate_hits += 1
+                seen.add(key)
+            if key is not None and key in cache:
+                self.cache_hits += 1
+                yield params, _reused(cache[key])
+                continue
+            try:
+                outcome = self._evaluate_params(params, symbol, start_date, end_date, initial_capital, data)
+            except Exception as e:
+                outcome = e
+            if key is not None:
+                cache[key] = outcome
+            yield params, outcome
+    
+    def _pool_evaluations(self, params_list: List[Dict], context: tuple, workers: int, cache):
+        """Pool half of _evaluations: each distinct, uncached parameter set is submitted once"""
+        keys = [_params_key(params) if cache is not None else None for params in params_list]
+        # Every repeat of a key within this pass is served from its first occurrence
+        self.duplicate_hits = len(keys) - keys.count(None) - len(set(keys) - {None})
+        pending = sum(1 for key in set(keys) if key is not None and key not in cache) + keys.count(None)
+        if not pending:
+            for params, key in zip(params_list, keys):
+                self.cache_hits += 1
+                yield params, _reused(cache[key])
+            return
+        with ProcessPoolExecutor(max_workers=min(workers, pending),
+                                 initializer=_init_worker, initargs=context) as pool:
+            submitted = {}  # params key -> future of its first occurrence
+            futures = []
+            for params, key in zip(params_list, keys):
+                if key is not None and key in cache:
+                    futures.append((True, None))
+                elif key is not None and key in submitted:
+                    futures.append((True, submitted[key]))
+                else:
+                    future = pool.submit(_evaluate_outcome, params)
+                    if key is not None:
+                        submitted[key] = future
+                    futures.append((False, future))
+            for params, key, (repeat, future) in zip(params_list, keys, futures):
+                if future is None:
+                    outcome = cache[key]
+                else:
+                    try:
+                        outcome = future.result()
+                    except Exception as e:  # worker crashed or arguments failed to unpickle
+                        outcome = e
+                if repeat:
+                    self.cache_hits += 1
+                    outcome = _reused(outcome)
+                elif key is not None:
+                    cache[key] = outcome
+                yield params, outcome
+    
+    def _successive_halving(self, params_list: List[Dict], symbol: str, start_date, end_date,
+                            initial_capital: float, data, n_jobs: int, initial_fraction: float):
+        """
+        First round of a two-round tournament: the parameter sets worth a full backtest
+        
+        Every set is backtested on the leading initial_fraction of the data and
+        those scoring below the median partial score are dropped. Sets whose
+        partial run fails or scores non-finite are kept, since a short window
+        can starve long lookbacks that work on the full history. Partial
+        outcomes bypass the outcome cache, which stays keyed to the full data.
+        
+        Returns:
+            (survivors, threshold) - threshold is None when nothing scored
+        """
+        head = data.iloc[:max(2, int(len(data) * initial_fraction))]
+        partial = []
+        for params, outcome in self._evaluations(params_list, symbol, start_date, end_date,
+                                                 initial_capital, head, n_jobs, use_cache=False):
+            score = None if isinstance(outcome, Exception) else outcome[0]
+            partial.append(score if score is not None and math.isfinite(score) else None)
+        scored = [score for score in partial if score is not None]
+        if not scored:
+            return params_list, None
+        threshold = float(np.quantile(scored, 0.5))
+        survivors = [params for params, score in zip(params_list, partial)
+                     if score is None or score >= threshold]
+        return survivors, threshold
+    
+    def _outcome_cache(self, data, symbol: str, start_date, end_date, initial_capital: float):
+        """
+        The outcome cache for these search inputs, or None if the strategy opts out
+        
+        The data object itself is held (and compared by identity) so a new
+        frame, even one reusing a freed object's id, starts a fresh cache.
+        The strategy class and metric are part of the key, since a cached
+        outcome carries the score computed for them.
+        """
+        if not getattr(self.strategy_class, 'STRATEGY_IS_DETERMINISTIC', True):
+            return None
+        key = (self.strategy_class, self.metric, symbol, start_date, end_date, initial_capital)
+        inputs = self._eval_cache_inputs
+        if inputs is None or inputs[0] is not data or inputs[1:] != key:
+            self._eval_cache = {}
+            self._eval_cache_inputs = (data,) + key
+        return self._eval_cache
+    
+    def _picklable_strategy(self) -> bool:
+        """Whether strategy_class can be sent to worker processes"""
+        try:
+            pickle.dumps(self.strategy_class)
+            return True
+        except Exception:
+            return False
+    
     def _evaluate_params(self, params: Dict, symbol: str, 
                          start_date, end_date, initial_capital: float, 
                          data=None) -> Tuple[float, Dict, str]:
@@ -586,62 +1186,43 @@ class StrategyOptimizer:
                 # Handle different trade formats
                 if isinstance(trades[0], dict):
                     # ML strategy format (list of dicts)
-                    wins = sum(1 for t in trades if t.get('profit', 0) > 0)
+                    # Running sums in one pass: no per-evaluation lists or numpy conversions
+                    wins, n_losses, sum_profit, sum_loss = 0, 0, 0.0, 0.0
+                    for t in trades:
+                        profit = t.get('profit', 0)
+                        if profit > 0:
+                            wins += 1
+                            sum_profit += profit
+                        elif profit < 0:
+                            n_losses += 1
+                            sum_loss -= profit
                     win_rate = wins / len(trades)
                     
-                    profits = [t['profit'] for t in trades if t.get('profit', 0) > 0]
-                    losses = [abs(t['profit']) for t in trades if t.get('profit', 0) < 0]
+                    avg_win = sum_profit / wins if wins else 0
+                    avg_loss = sum_loss / n_losses if n_losses else 1
+                    profit_factor = (sum_profit / sum_loss) if n_losses and sum_loss > 0 else 0
                 else:
                     # Simple strategy format (list of tuples)
-                    # Trades come in pairs: buy, sell
-                    wins = 0
-                    profits = []
-                    losses = []
-                    for i in range(0, len(trades)-1, 2):
-                        if i+1 < len(trades):
-                            buy_price = trades[i][2]
-                            sell_price = trades[i+1][2]
-                            profit = sell_price - buy_price
-                            if profit > 0:
-                                wins += 1
-                                profits.append(profit)
-                            else:
-                                losses.append(abs(profit))
-                    win_rate = wins / (len(trades)//2) if len(trades) > 0 else 0
-                
-                avg_win = np.mean(profits) if profits else 0
-                avg_loss = np.mean(losses) if losses else 1
-                profit_factor = (sum(profits) / sum(losses)) if losses and sum(losses) > 0 else 0
+                    # Trades come in pairs: buy, sell; prices are reduced in one compiled pass
+                    n_pairs = len(trades) // 2
+                    buys = np.fromiter((t[2] for t in trades[0:2 * n_pairs:2]), dtype=np.float64, count=n_pairs)
+                    sells = np.fromiter((t[2] for t in trades[1:2 * n_pairs:2]), dtype=np.float64, count=n_pairs)
+                    wins, n_losses, sum_profit, sum_loss = trade_pair_stats(buys, sells)
+                    win_rate = wins / n_pairs
+                    
+                    avg_win = sum_profit / wins if wins else 0
+                    avg_loss = sum_loss / n_losses if n_losses else 1
+                    profit_factor = (sum_profit / sum_loss) if n_losses and sum_loss > 0 else 0
             else:
                 win_rate = 0
                 profit_factor = 0
                 avg_win = 0
                 avg_loss = 0
             
-            # Calculate Sharpe ratio
-            if equity_curve and len(equity_curve) > 1:
-                # Handle both list of dicts and list of values
-                if isinstance(equity_curve, list) and len(equity_curve) > 0:
-                    if isinstance(equity_curve[0], dict):
-                        values = [e['Value'] for e in equity_curve]
-                    else:
-                        values = equity_curve
-                    
-                    equity_series = pd.Series(values)
-                    returns = equity_series.pct_change().dropna()
-                    
-                    if len(returns) > 0 and returns.std() > 0:
-                        sharpe_ratio = (returns.mean() / returns.std()) * np.sqrt(252)
-                    else:
-                        sharpe_ratio = 0
-                    
-                    # Calculate max drawdown
-                    rolling_max = equity_series.expanding().max()
-                    drawdowns = (equity_series - rolling_max) / rolling_max
-                    max_drawdown = abs(drawdowns.min()) * 100 if len(drawdowns) > 0 else 0
-                else:
-                    sharpe_ratio = 0
-                    max_drawdown = 0
+            # Calculate Sharpe ratio and drawdown in one compiled pass over a float64 array
+            equity = _to_equity_array(equity_curve)
+            if len(equity) > 1:
+                sharpe_ratio, max_drawdown = equity_stats(equity)
             else:
                 sharpe_ratio = 0
                 max_drawdown = 0
@@ -704,12 +1285,35 @@ class StrategyOptimizer:
             # If estimation fails, return None (skip check)
             return None
     
-    def save_results(self, filename: str = None):
-        """Save optimization results"""
+    def save_results(self, filename: str = None, file_format: str = 'json'):
+        """
+        Save optimization results
+        
+        file_format='parquet' writes one row per result (parameter columns plus
+        score), zstd-compressed, with best_params/best_score/metric/timestamp
+        in the file metadata (pd.read_parquet(path).attrs). It needs a parquet
+        engine such as pyarrow; without one the results are saved as JSON.
+        """
         if filename is None:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f'optimization_results_{timestamp}.json'
         
+        if file_format == 'parquet':
+            parquet_file = os.path.splitext(filename)[0] + '.parquet'
+            table = pd.DataFrame([{**r['params'], 'score': r['score']} for r in self.optimization_results])
+            table.attrs = {
+                'best_params': self.best_params,
+                'best_score': self.best_score,
+                'metric': self.metric,
+                'timestamp': datetime.now().isoformat()
+            }
+            try:
+                table.to_parquet(parquet_file, compression='zstd', index=False)
+                print(f"\n💾 Results saved to {parquet_file}")
+                return
+            except ImportError:
+                print("   No parquet engine (pyarrow) installed; saving JSON instead")
+        
         data = {
             'best_params': self.best_params,
             'best_score': self.best_score,
@@ -718,8 +1322,13 @@ class StrategyOptimizer:
             'timestamp': datetime.now().isoformat()
         }
         
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2, default=str)
+        # Both encoders stream: results are written one entry at a time
+        if orjson is not None:
+            with open(filename, 'wb', buffering=_SAVE_BUFFER_SIZE) as f:
+                _write_json_streamed(f, data)
+        else:
+            with open(filename, 'w', buffering=_SAVE_BUFFER_SIZE) as f:
+                json.dump(data, f, indent=2, default=str)
         
         print(f"\n💾 Results saved to {filename}")
         
@@ -729,19 +1338,25 @@ class StrategyOptimizer:
             import matplotlib.pyplot as plt
             from mpl_toolkits.mplot3d import Axes3D
             
-            # Extract data for 2 parameters
-            x = [r['params'][param1] for r in self.optimization_results if param1 in r['params']]
-            y = [r['params'][param2] for r in self.optimization_results if param2 in r['params']]
-            z = [r['score'] for r in self.optimization_results if param1 in r['params'] and param2 in r['params']]
-            
-            if len(x) < 3:
+            # Extract (param1, param2, score) in one pass over results having both parameters
+            points = [(r['params'][param1], r['params'][param2], r['score'])
+                      for r in self.optimization_results
+                      if param1 in r['params'] and param2 in r['params']]
+            if len(points) < 3:
                 print("Not enough data points for surface plot")
                 return
+            x, y, z = np.asarray(points, dtype=np.float64).T
+            dense = len(points) > _DENSE_SURFACE_POINTS
             
             fig = plt.figure(figsize=(12, 8))
             ax = fig.add_subplot(111, projection='3d')
             
-            scatter = ax.scatter(x, y, z, c=z, cmap='viridis', s=50)
+            if dense:
+                # Small edgeless markers without depth shading keep large clouds cheap to draw
+                scatter = ax.scatter(x, y, z, c=z, cmap='viridis', s=10,
+                                     depthshade=False, linewidths=0)
+            else:
+                scatter = ax.scatter(x, y, z, c=z, cmap='viridis', s=50)
             ax.set_xlabel(param1)
             ax.set_ylabel(param2)
             ax.set_zlabel(self.metric)
@@ -751,7 +1366,8 @@ class StrategyOptimizer:
             plt.tight_layout()
             
             filename = f'optimization_surface_{param1}_{param2}.png'
-            plt.savefig(filename, dpi=150)
+            plt.savefig(filename, dpi=100 if dense else 150)
+            plt.close(fig)
             print(f"📊 Surface plot saved to {filename}")
             
         except ImportError:
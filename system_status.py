@@ -4,13 +4,110 @@ System Status Checker
 Comprehensive validation of all platform features
 """
 
+import ast
+import io
 import sys
 import os
+import threading
+from contextlib import redirect_stdout
 from pathlib import Path
 import importlib
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+
+from json_utils import loads_json
+
+# Real imports (deep checks) run one at a time even when checks overlap, so a
+# module is never observed half-initialized by another check's thread
+_IMPORT_LOCK = threading.Lock()
+
+
+def _import(module: str):
+    """importlib.import_module, serialized across check threads"""
+    with _IMPORT_LOCK:
+        return importlib.import_module(module)
+
+
+class _ThreadOutput(io.TextIOBase):
+    """
+    Stand-in for sys.stdout that sends each capturing thread's writes to its
+    own buffer; other threads write through to the wrapped stream
+    """
+    
+    def __init__(self, stream):
+        super().__init__()
+        self.stream = stream
+        self.buffers = {}
+    
+    def write(self, text):
+        return self.buffers.get(threading.get_ident(), self.stream).write(text)
+    
+    def flush(self):
+        self.stream.flush()
+    
+    def capture(self, func, buffer: io.StringIO):
+        """Call func, collecting what it prints on this thread in buffer"""
+        ident = threading.get_ident()
+        self.buffers[ident] = buffer
+        try:
+            return func()
+        finally:
+            del self.buffers[ident]
+
+
+def _module_available(module: str, deep: bool = False) -> bool:
+    """
+    Whether module can be imported
+    
+    By default only the import system's metadata is consulted (find_spec),
+    so heavy packages are located without running their code. deep=True
+    performs the real import, which also catches packages that are present
+    but broken.
+    """
+    if deep:
+        try:
+            _import(module)
+            return True
+        except ImportError:
+            return False
+    try:
+        return importlib.util.find_spec(module) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def _defines_method(module: str, class_name: str, method: str) -> bool:
+    """
+    Whether module's source defines class_name with a method named method
+    
+    The source is located and parsed, not executed, so the check costs no
+    imports of the module's (often heavy) dependencies. Inherited methods
+    are not seen; use the deep check for those.
+    """
+    spec = importlib.util.find_spec(module)
+    if spec is None or not spec.origin or not spec.origin.endswith('.py'):
+        raise ImportError(f"No module named '{module}'")
+    tree = ast.parse(Path(spec.origin).read_text(encoding='utf-8'), filename=spec.origin)
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == class_name:
+            return any(isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and item.name == method
+                       for item in node.body)
+    raise ImportError(f"cannot find '{class_name}' in '{module}'")
+
+
+def _cwd_names() -> set:
+    """Names in the working directory, from a single directory scan"""
+    with os.scandir('.') as entries:
+        return {entry.name for entry in entries}
+
 
 class SystemStatus:
-    def __init__(self):
+    # Independent checks run by run_all_checks, reported in this order
+    CHECKS = ('check_imports', 'check_files', 'check_strategies',
+              'check_data_directories', 'check_json_files', 'test_data_download')
+    
+    def __init__(self, deep: bool = False):
+        self.deep = deep  # Import modules instead of only locating them
         self.checks_passed = []
         self.checks_failed = []
         self.warnings = []
@@ -33,17 +130,15 @@ class SystemStatus:
         ]
         
         for module, package in required_modules:
-            try:
-                importlib.import_module(module)
+            if _module_available(module, self.deep):
                 self.checks_passed.append(f"✓ {package}")
-            except ImportError:
+            else:
                 self.checks_failed.append(f"✗ {package} (required)")
         
         for module, package in optional_modules:
-            try:
-                importlib.import_module(module)
+            if _module_available(module, self.deep):
                 self.checks_passed.append(f"✓ {package}")
-            except ImportError:
+            else:
                 self.warnings.append(f"⚠ {package} (optional - some features unavailable)")
     
     def check_files(self):
@@ -61,9 +156,9 @@ class SystemStatus:
             'strategy_exporter.py',
         ]
         
+        existing = _cwd_names()
         for filename in required_files:
-            filepath = Path(filename)
-            if filepath.exists():
+            if filename in existing:
                 self.checks_passed.append(f"✓ {filename}")
             else:
                 self.checks_failed.append(f"✗ {filename} missing")
@@ -72,28 +167,27 @@ class SystemStatus:
         """Check strategy classes"""
         print("🔍 Checking strategies...")
         
-        try:
-            from simple_strategy import SimpleMeanReversionStrategy
-            from ml_strategy import MLTradingStrategy
-            from short_term_strategy import ShortTermStrategy
-            from optimized_ml_strategy import OptimizedMLStrategy
-            
-            strategies = [
-                ('Simple', SimpleMeanReversionStrategy),
-                ('ML', MLTradingStrategy),
-                ('ShortTerm', ShortTermStrategy),
-                ('Optimized', OptimizedMLStrategy),
-            ]
-            
-            for name, cls in strategies:
+        strategies = [
+            ('Simple', 'simple_strategy', 'SimpleMeanReversionStrategy'),
+            ('ML', 'ml_strategy', 'MLTradingStrategy'),
+            ('ShortTerm', 'short_term_strategy', 'ShortTermStrategy'),
+            ('Optimized', 'optimized_ml_strategy', 'OptimizedMLStrategy'),
+        ]
+        
+        for name, module, class_name in strategies:
+            try:
                 # Check if backtest method exists
-                if hasattr(cls, 'backtest'):
+                if self.deep:
+                    cls = getattr(_import(module), class_name)
+                    has_backtest = hasattr(cls, 'backtest')
+                else:
+                    has_backtest = _defines_method(module, class_name, 'backtest')
+                if has_backtest:
                     self.checks_passed.append(f"✓ {name} strategy")
                 else:
                     self.checks_failed.append(f"✗ {name} strategy missing backtest")
-                    
-        except Exception as e:
-            self.checks_failed.append(f"✗ Strategy import failed: {e}")
+            except Exception as e:
+                self.checks_failed.append(f"✗ Strategy import failed: {e}")
     
     def check_data_directories(self):
         """Check/create required directories"""
@@ -108,13 +202,13 @@ class SystemStatus:
             'custom_strategies',
         ]
         
+        existing = _cwd_names()
         for dirname in dirs:
-            dirpath = Path(dirname)
-            if dirpath.exists():
+            if dirname in existing:
                 self.checks_passed.append(f"✓ {dirname}/")
             else:
                 try:
-                    dirpath.mkdir(exist_ok=True)
+                    Path(dirname).mkdir(exist_ok=True)
                     self.checks_passed.append(f"✓ {dirname}/ (created)")
                 except Exception as e:
                     self.checks_failed.append(f"✗ {dirname}/ ({e})")
@@ -130,20 +224,20 @@ class SystemStatus:
             'strategy_history.json': [],
         }
         
+        existing = _cwd_names()
         for filename, default_content in json_files.items():
-            filepath = Path(filename)
-            if filepath.exists():
+            if filename in existing:
                 try:
                     import json
-                    with open(filepath, 'r') as f:
-                        json.load(f)
+                    with open(filename, 'rb') as f:
+                        loads_json(f.read())
                     self.checks_passed.append(f"✓ {filename}")
                 except json.JSONDecodeError:
                     self.warnings.append(f"⚠ {filename} (corrupted, will backup)")
             else:
                 try:
                     import json
-                    with open(filepath, 'w') as f:
+                    with open(filename, 'w') as f:
                         json.dump(default_content, f, indent=2)
                     self.checks_passed.append(f"✓ {filename} (created)")
                 except Exception as e:
@@ -170,18 +264,37 @@ class SystemStatus:
         except Exception as e:
             self.checks_failed.append(f"✗ Data download failed: {e}")
     
+    def run_checks_concurrently(self):
+        """
+        Run every check in CHECKS on its own thread and merge the results in order
+        
+        The checks are I/O-bound (network download, file system, imports), so
+        the wall-clock time is that of the slowest one. Each check records into
+        its own SystemStatus, so no list is shared between threads and the
+        merged report matches a serial run. What each check prints is buffered
+        per thread and written out in CHECKS order once all have finished, so
+        headers and messages from different checks do not interleave.
+        """
+        parts = [SystemStatus(deep=self.deep) for _ in self.CHECKS]
+        outputs = [io.StringIO() for _ in self.CHECKS]
+        router = _ThreadOutput(sys.stdout)
+        with redirect_stdout(router), ThreadPoolExecutor(max_workers=len(parts)) as pool:
+            futures = [pool.submit(router.capture, getattr(part, name), output)
+                       for part, name, output in zip(parts, self.CHECKS, outputs)]
+        for part, output, future in zip(parts, outputs, futures):
+            sys.stdout.write(output.getvalue())
+            future.result()
+            self.checks_passed.extend(part.checks_passed)
+            self.checks_failed.extend(part.checks_failed)
+            self.warnings.extend(part.warnings)
+    
     def run_all_checks(self):
         """Run all system checks"""
         print("\n" + "="*70)
         print("SYSTEM STATUS CHECK")
         print("="*70)
         
-        self.check_imports()
-        self.check_files()
-        self.check_strategies()
-        self.check_data_directories()
-        self.check_json_files()
-        self.test_data_download()
+        self.run_checks_concurrently()
         
         print("\n" + "="*70)
         print("RESULTS")
@@ -230,6 +343,6 @@ class SystemStatus:
         return len(self.checks_failed) == 0
 
 if __name__ == '__main__':
-    checker = SystemStatus()
+    checker = SystemStatus(deep='--deep' in sys.argv[1:])
     success = checker.run_all_checks()
     sys.exit(0 if success else 1)
@@ -0,0 +1,54 @@
+"""
+Test json_utils.py: shared JSON encoding with and without orjson
+"""
+
+import math
+from decimal import Decimal
+
+import pytest
+import numpy as np
+import pandas as pd
+
+import json_utils
+from json_utils import dumps_json, loads_json
+
+
+def _payload():
+    return {
+        1: pd.Timestamp('2024-01-02 09:30'),
+        'price': Decimal('101.25'),
+        'count': np.int64(3),
+        'curve': np.array([1.0, np.nan]),
+        'sharpe': float('nan'),
+        'big': 2 ** 70,
+        'name': 'Zürich',
+    }
+
+
+class TestDumpsJson:
+    """Test encoding of values the stdlib and orjson treat differently"""
+
+    def test_output_independent_of_orjson(self, monkeypatch):
+        """orjson and the stdlib fallback write the same bytes"""
+        if json_utils.orjson is None:
+            pytest.skip('orjson not installed')
+        with_orjson = dumps_json(_payload())
+        monkeypatch.setattr(json_utils, 'orjson', None)
+
+        assert dumps_json(_payload()) == with_orjson
+
+    @pytest.mark.parametrize('has_orjson', [False, True])
+    def test_round_trip(self, has_orjson, monkeypatch):
+        """Keys become strings, unknown types str(), NaN stays NaN"""
+        if not has_orjson:
+            monkeypatch.setattr(json_utils, 'orjson', None)
+        elif json_utils.orjson is None:
+            pytest.skip('orjson not installed')
+
+        data = loads_json(dumps_json(_payload()))
+
+        assert data['1'] == '2024-01-02 09:30:00'
+        assert data['price'] == '101.25' and data['count'] == 3 and data['big'] == 2 ** 70
+        assert data['curve'][0] == 1.0 and math.isnan(data['curve'][1])
+        assert math.isnan(data['sharpe'])
+        assert data['name'] == 'Zürich'
@@ -0,0 +1,334 @@
+"""
+Test strategy_builder.py Python exports: generated classes import and backtest correctly
+"""
+
+import ast
+import importlib.util
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from strategy_builder import StrategyBuilder, strategy_fingerprint
+
+
+def _strategy(indicators=None):
+    return {
+        'name': 'Export Test',
+        'description': 'Generated class smoke test',
+        'type': 'momentum',
+        'indicators': indicators if indicators is not None else ['SMA', 'EMA', 'RSI', 'MACD', 'Bollinger'],
+        'entry_rules': ['Close above 5-day mean'],
+        'exit_rules': ['Stop / target / holding period'],
+        'parameters': {'lookback_period': 12, 'holding_period': 7},
+        'risk_management': {
+            'position_size_pct': 50,
+            'stop_loss_pct': 3,
+            'take_profit_pct': 6,
+            'max_positions': 1
+        },
+        'created': '2025-01-01T00:00:00'
+    }
+
+
+@pytest.fixture
+def builder(tmp_path, monkeypatch):
+    """StrategyBuilder writing into a temporary working directory"""
+    monkeypatch.chdir(tmp_path)
+    return StrategyBuilder()
+
+
+@pytest.fixture
+def price_data():
+    """Synthetic daily OHLCV frame"""
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('2020-01-01', periods=400, freq='D')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))
+    return pd.DataFrame({
+        'open': close,
+        'high': close * 1.01,
+        'low': close * 0.99,
+        'close': close,
+        'volume': 1e6
+    }, index=dates)
+
+
+def _load_export_module(builder, strategy):
+    builder._export_python_class(strategy, '20250101_test')
+    path = Path(builder.exports_dir) / 'export_Export_Test_20250101_test.py'
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _reference_backtest(df, entry, stop, tp, hold, size_pct, cash):
+    """Straightforward per-bar reference simulation (fractional shares)"""
+    close = df['close'].to_numpy()
+    position, entry_price, entry_idx = 0.0, None, None
+    trades = []
+    for idx, price in enumerate(close):
+        if position > 0:
+            if (price <= entry_price * (1 - stop) or price >= entry_price * (1 + tp)
+                    or idx - entry_idx >= hold):
+                cash += position * price
+                trades.append((entry_idx, idx, position))
+                position = 0.0
+        elif entry[idx]:
+            shares = cash * size_pct / price
+            cash -= shares * price
+            position, entry_price, entry_idx = shares, price, idx
+    if position > 0:
+        cash += position * close[-1]
+        trades.append((entry_idx, len(close) - 1, position))
+    return trades, cash
+
+
+class TestPythonExport:
+    """Test the generated standalone Python strategy class"""
+
+    def test_backtest_without_signals_makes_no_trades(self, builder, price_data):
+        """Default stub signals never trade and keep capital intact"""
+        cls = _load_export_module(builder, _strategy()).Export_TestStrategy
+        strategy = cls('SPY', 100000)
+
+        df, trades, final_value, equity_curve = strategy.backtest(price_data, '2020-03-01', '2020-12-31')
+
+        assert trades == []
+        assert final_value == pytest.approx(100000)
+        assert isinstance(equity_curve, np.ndarray)
+        assert equity_curve.shape == (len(df),)
+
+    def test_backtest_matches_reference_simulation(self, builder, price_data):
+        """Vectorised signals + simulation kernel match a per-bar reference loop"""
+        cls = _load_export_module(builder, _strategy()).Export_TestStrategy
+
+        class Strategy(cls):
+            def entry_signals(self, df, ohlc):
+                return (df['close'] > df['close'].rolling(5).mean()).to_numpy()
+
+        strategy = Strategy('SPY', 100000)
+        df, trades, final_value, equity_curve = strategy.backtest(price_data, '2020-03-01', '2020-12-31')
+
+        entry = (df['close'] > df['close'].rolling(5).mean()).to_numpy()
+        ref_trades, ref_cash = _reference_backtest(df, entry, 0.03, 0.06, 7, 0.5, 100000)
+
+        assert len(trades) == len(ref_trades) > 0
+        for trade, (start, end, shares) in zip(trades, ref_trades):
+            assert isinstance(trade['entry_date'], pd.Timestamp)
+            assert trade['entry_date'] == df.index[start]
+            assert trade['exit_date'] == df.index[end]
+            assert trade['shares'] == pytest.approx(shares)
+        assert final_value == pytest.approx(ref_cash)
+        assert equity_curve[-1] == pytest.approx(ref_cash)
+
+    def test_backtest_without_portfolio_config(self, builder, price_data, monkeypatch):
+        """Exports still backtest standalone, using the default sizing settings"""
+        module = _load_export_module(builder, _strategy())
+        monkeypatch.setattr(module, 'PORTFOLIO_CFG', None)
+
+        class Strategy(module.Export_TestStrategy):
+            def entry_signals(self, df, ohlc):
+                return (df['close'] > df['close'].rolling(5).mean()).to_numpy()
+
+        df, trades, final_value, _ = Strategy('SPY', 100000).backtest(price_data, '2020-03-01', '2020-12-31')
+
+        entry = (df['close'] > df['close'].rolling(5).mean()).to_numpy()
+        _, ref_cash = _reference_backtest(df, entry, 0.03, 0.06, 7, 0.5, 100000)
+        assert final_value == pytest.approx(ref_cash)
+
+    def test_ema_uses_recursive_form(self, builder, price_data, monkeypatch):
+        """EMA/MACD use the O(N) recursive EWMA with a full warm-up window"""
+        module = _load_export_module(builder, _strategy(['EMA', 'MACD']))
+        monkeypatch.setattr(module, '_HAS_TALIB', False)
+        df = module.Export_TestStrategy('SPY', 100000).calculate_indicators(price_data[['close']].copy())
+
+        close = price_data['close'].to_numpy()
+        alpha = 2 / (12 + 1)
+        expected = np.empty_like(close)
+        expected[0] = close[0]
+        for i in range(1, len(close)):
+            expected[i] = alpha * close[i] + (1 - alpha) * expected[i - 1]
+
+        assert df['EMA'].iloc[:11].isna().all()
+        np.testing.assert_allclose(df['EMA'].to_numpy()[11:], expected[11:])
+        assert df['MACD'].first_valid_index() == price_data.index[25]
+
+    @pytest.mark.parametrize('use_talib', [False, True])
+    def test_bollinger_matches_rolling_std(self, builder, price_data, monkeypatch, use_talib):
+        """Strided-window and TA-Lib Bollinger bands match pandas rolling mean/std"""
+        module = _load_export_module(builder, _strategy(['SMA', 'Bollinger']))
+        if use_talib and not module._HAS_TALIB:
+            pytest.skip("TA-Lib not installed")
+        monkeypatch.setattr(module, '_HAS_TALIB', use_talib)
+        monkeypatch.setattr(module, '_HAS_NUMBA', False)
+        df = module.Export_TestStrategy('SPY', 100000).calculate_indicators(price_data[['close']].copy())
+
+        rolling = price_data['close'].rolling(20)
+        np.testing.assert_allclose(df['SMA'], price_data['close'].rolling(12).mean(), rtol=1e-8)
+        np.testing.assert_allclose(df['BB_middle'], rolling.mean(), rtol=1e-8)
+        np.testing.assert_allclose(df['BB_upper'], rolling.mean() + 2 * rolling.std(), rtol=1e-8)
+        np.testing.assert_allclose(df['BB_lower'], rolling.mean() - 2 * rolling.std(), rtol=1e-8)
+
+    def test_bollinger_reuses_20_bar_sma(self, builder, price_data, monkeypatch):
+        """A 20-bar SMA doubles as the Bollinger middle band"""
+        strategy = _strategy(['SMA', 'Bollinger'])
+        strategy['parameters']['lookback_period'] = 20
+        module = _load_export_module(builder, strategy)
+        monkeypatch.setattr(module, '_HAS_TALIB', False)
+        monkeypatch.setattr(module, '_HAS_NUMBA', False)
+        df = module.Export_TestStrategy('SPY', 100000).calculate_indicators(price_data[['close']].copy())
+
+        rolling = price_data['close'].rolling(20)
+        pd.testing.assert_series_equal(df['BB_middle'], df['SMA'], check_names=False)
+        np.testing.assert_allclose(df['BB_middle'], rolling.mean(), rtol=1e-8)
+        np.testing.assert_allclose(df['BB_upper'], rolling.mean() + 2 * rolling.std(), rtol=1e-8)
+
+    def test_fused_kernel_matches_pandas_path(self, builder, price_data, monkeypatch):
+        """Single-pass fused indicator kernel reproduces the pandas fallback"""
+        module = _load_export_module(builder, _strategy())
+        if not module._HAS_NUMBA:
+            pytest.skip("numba not installed")
+        monkeypatch.setattr(module, '_HAS_TALIB', False)
+        fused = module.Export_TestStrategy('SPY', 100000).calculate_indicators(price_data[['close']].copy())
+        monkeypatch.setattr(module, '_HAS_NUMBA', False)
+        reference = module.Export_TestStrategy('SPY', 100000).calculate_indicators(price_data[['close']].copy())
+
+        pd.testing.assert_frame_equal(fused, reference, rtol=1e-9, atol=1e-9)
+
+    @pytest.mark.parametrize('indicator', ['SMA', 'EMA', 'RSI', 'MACD', 'Bollinger'])
+    def test_single_indicator_kernel_matches_pandas_path(self, builder, price_data, monkeypatch, indicator):
+        """Without TA-Lib a lone indicator also goes through the njit kernel"""
+        module = _load_export_module(builder, _strategy([indicator]))
+        if not module._HAS_NUMBA:
+            pytest.skip("numba not installed")
+        monkeypatch.setattr(module, '_HAS_TALIB', False)
+        fused = module.Export_TestStrategy('SPY', 100000).calculate_indicators(price_data[['close']].copy())
+        monkeypatch.setattr(module, '_HAS_NUMBA', False)
+        reference = module.Export_TestStrategy('SPY', 100000).calculate_indicators(price_data[['close']].copy())
+
+        pd.testing.assert_frame_equal(fused, reference, rtol=1e-9, atol=1e-9)
+
+    def test_shared_indicator_frame_accepted(self, builder, price_data):
+        """backtest accepts an indicator frame prepared by another instance"""
+        cls = _load_export_module(builder, _strategy()).Export_TestStrategy
+        first, second = cls('SPY', 100000), cls('QQQ', 100000)
+
+        frame = first.prepare_data(price_data)
+        shared = second.backtest(price_data, '2020-03-01', '2020-12-31', indicators_df=frame)
+        fresh = first.backtest(price_data, '2020-03-01', '2020-12-31')
+        pd.testing.assert_frame_equal(shared[0], fresh[0])
+
+    def test_lean_export_renders_valid_python(self, builder):
+        """LEAN template substitutes every field into parseable source"""
+        builder._export_lean_algorithm(_strategy(), '20250101_test')
+        source = (Path(builder.exports_dir) / 'export_Export_Test_20250101_test_lean.py').read_text()
+
+        tree = ast.parse(source)
+        assert 'Export_TestAlgorithm' in [node.name for node in tree.body if isinstance(node, ast.ClassDef)]
+        assert '        # Close above 5-day mean' in source
+        assert '$' not in source
+
+
+class TestStrategyPersistence:
+    """Test saving, loading and JSON export of strategy definitions"""
+
+    def test_save_load_roundtrip(self, builder):
+        """Saved strategies load back unchanged"""
+        strategy = _strategy()
+        builder.save_strategy(strategy)
+
+        assert builder.load_strategy('Export Test') == strategy
+        assert builder.list_strategies() == ['Export Test']
+
+    def test_json_config_export(self, builder):
+        """JSON config export wraps the strategy with export metadata"""
+        builder._export_json_config(_strategy(), '20250101_test')
+        path = next(Path(builder.exports_dir).glob('export_*_config.json'))
+        config = json.loads(path.read_text())
+
+        assert config['strategy'] == _strategy()
+        assert config['export_info']['format'] == 'json_config'
+
+    def test_load_strategy_cached_until_file_changes(self, builder):
+        """Repeated loads reuse the parsed strategy without sharing it; saves invalidate it"""
+        strategy = _strategy()
+        builder.save_strategy(strategy)
+
+        first = builder.load_strategy('Export Test')
+        parsed = next(iter(builder._strategy_cache.values()))[1]
+        first['indicators'].append('VWAP')
+        second = builder.load_strategy('Export Test')
+        assert next(iter(builder._strategy_cache.values()))[1] is parsed
+        assert second is not first and second['indicators'] == _strategy()['indicators']
+
+        strategy['description'] = 'Updated'
+        builder.save_strategy(strategy)
+        assert builder.load_strategy('Export Test')['description'] == 'Updated'
+        assert builder.load_strategy('Missing') is None
+
+    def test_list_includes_symlinked_files(self, builder, tmp_path):
+        """Strategy files linked into the directory are listed like regular ones"""
+        builder.save_strategy(_strategy())
+        target = tmp_path / 'elsewhere.json'
+        target.write_text('{}')
+        (Path(builder.strategies_dir) / 'Linked_Rules.json').symlink_to(target)
+        (Path(builder.strategies_dir) / 'notes.json').mkdir()
+
+        assert builder.list_strategies() == ['Export Test', 'Linked Rules']
+
+    def test_compare_notes_duplicate_configurations(self, builder, capsys):
+        """Strategies differing only in name/description are all listed, duplicates noted"""
+        builder.save_strategy(_strategy())
+        clone = dict(_strategy(), name='Export Clone', description='Same rules')
+        builder.save_strategy(clone)
+
+        results = builder.compare_strategies(['Export Test', 'Export Clone'], 'SPY', '2024-01-01', '2024-12-31')
+        assert [r['name'] for r in results] == ['Export Test', 'Export Clone']
+        out = capsys.readouterr().out
+        assert out.count(': Type=') == 2
+        assert "(same configuration as 'Export Test')" in out
+
+    def test_removed_directories_recreated(self, builder):
+        """A builder constructed after its directories were deleted creates them again"""
+        shutil.rmtree(builder.exports_dir)
+        shutil.rmtree(builder.strategies_dir)
+
+        rebuilt = StrategyBuilder()
+        assert Path(rebuilt.exports_dir).is_dir() and Path(rebuilt.strategies_dir).is_dir()
+
+    def test_json_export_records_fingerprint(self, builder):
+        """JSON exports carry the strategy content fingerprint"""
+        builder._export_json_config(_strategy(), '20250101_test')
+        path = next(Path(builder.exports_dir).glob('export_*_config.json'))
+        config = json.loads(path.read_text())
+
+        assert config['export_info']['fingerprint'] == strategy_fingerprint(_strategy())
+        assert strategy_fingerprint(_strategy()) != strategy_fingerprint(dict(_strategy(), type='breakout'))
+
+
+class TestAOTExport:
+    """Test ahead-of-time compiled kernels for Python exports"""
+
+    def test_aot_kernel_used_and_matches_reference(self, builder, price_data, monkeypatch):
+        """export_aot builds an extension module that the exported class imports"""
+        pytest.importorskip('numba.pycc')
+        builder.export_aot = True
+        monkeypatch.syspath_prepend(str(Path(builder.exports_dir).resolve()))
+        module = _load_export_module(builder, _strategy())
+        if hasattr(module._simulate, 'py_func'):
+            pytest.skip("AOT kernel could not be compiled here")
+
+        class Strategy(module.Export_TestStrategy):
+            def entry_signals(self, df, ohlc):
+                return (df['close'] > df['close'].rolling(5).mean()).to_numpy()
+
+        df, trades, final_value, _ = Strategy('SPY', 100000).backtest(price_data, '2020-03-01', '2020-12-31')
+
+        entry = (df['close'] > df['close'].rolling(5).mean()).to_numpy()
+        ref_trades, ref_cash = _reference_backtest(df, entry, 0.03, 0.06, 7, 0.5, 100000)
+        assert len(trades) == len(ref_trades)
+        assert final_value == pytest.approx(ref_cash)
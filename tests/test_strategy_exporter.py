@@ -0,0 +1,155 @@
+"""
+Test strategy_exporter.py: config exports and deployment packages
+"""
+
+import importlib.util
+import json
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from strategy_exporter import StrategyExporter
+
+
+@pytest.fixture
+def exporter(tmp_path):
+    """StrategyExporter writing into a temporary directory"""
+    return StrategyExporter(export_dir=tmp_path / 'live')
+
+
+class TestConfigExport:
+    """Test strategy configuration export"""
+
+    def test_config_roundtrip(self, exporter):
+        """Exported config is readable JSON with the risk parameters filled in"""
+        path = exporter.export_strategy_config(
+            'Demo', 'MomentumStrategy', {'lookback': 20, 'stop_loss': 0.05},
+            backtest_results={'return_pct': np.float64(12.5), 'trades': 7})
+
+        config = json.loads(path.read_text())
+        assert config['strategy_name'] == 'Demo'
+        assert config['parameters'] == {'lookback': 20, 'stop_loss': 0.05}
+        assert config['backtest_results'] == {'return_pct': 12.5, 'trades': 7}
+        assert config['risk_parameters']['max_position_size'] == 0.95
+        assert config['status'] == 'ready_for_deployment'
+
+    def test_list_exported_strategies(self, exporter, capsys):
+        """Listing shows config files and deployment packages, skipping models/"""
+        exporter.export_strategy_config('Demo', 'MomentumStrategy', {}, backtest_results={'return_pct': 12.5})
+        (exporter.export_dir / 'models').mkdir()
+        (exporter.export_dir / 'Demo').mkdir()
+        (exporter.export_dir / 'Demo' / 'README.md').write_text('readme')
+
+        exporter.list_exported_strategies()
+        out = capsys.readouterr().out
+
+        assert 'Demo_MomentumStrategy_config.json' in out
+        assert 'Backtest Return: 12.50%' in out
+        assert '📦 Demo/' in out and 'Files: 1' in out
+        assert 'models/' not in out
+
+    def test_list_exported_strategies_sorted(self, exporter, capsys):
+        """Configs read concurrently are still listed in name order"""
+        for name in ('Gamma', 'Alpha', 'Beta'):
+            exporter.export_strategy_config(name, 'MeanReversion', {})
+        capsys.readouterr()
+
+        exporter.list_exported_strategies()
+        out = capsys.readouterr().out
+
+        positions = [out.index(f"{name}_MeanReversion_config.json") for name in ('Alpha', 'Beta', 'Gamma')]
+        assert positions == sorted(positions)
+
+
+class TestDeploymentPackage:
+    """Test deployment package creation"""
+
+    def test_package_files_share_one_timestamp(self, exporter):
+        """Config, script and README carry the same generation time"""
+        class Strategy:
+            symbol = 'QQQ'
+            lookback = 30
+
+        package_dir = exporter.create_deployment_package('Demo', Strategy(), {'return_pct': 3.0})
+
+        config = json.loads((exporter.export_dir / 'Demo_Strategy_config.json').read_text())
+        generated = config['created_at']
+        assert f"Generated: {generated}" in (package_dir / 'deploy_Demo.py').read_text()
+        assert f"Generated: {generated}" in (package_dir / 'README.md').read_text()
+        assert config['parameters'] == {'symbol': 'QQQ', 'lookback': 30, 'initial_capital': 100000}
+
+    def test_exported_model_roundtrip(self, exporter):
+        """Exported models load back with their feature names"""
+        joblib = pytest.importorskip('joblib')
+        model = {'weights': np.arange(1000, dtype=np.float64)}
+
+        path = exporter.export_ml_model('Demo', model, ['rsi', 'sma'])
+        model_data = joblib.load(path)
+
+        np.testing.assert_array_equal(model_data['model']['weights'], model['weights'])
+        assert model_data['feature_names'] == ['rsi', 'sma']
+        assert model_data['model_type'] == 'dict'
+        assert path.name == 'Demo_model.joblib'
+
+    def test_deploy_script_loads_exported_model(self, exporter, monkeypatch):
+        """The deploy script and README name the model file in the format it was written"""
+        import strategy_exporter
+        monkeypatch.setattr(strategy_exporter, 'joblib', None)
+
+        class Strategy:
+            model = {'weights': [1.0, 2.0]}
+            feature_names = ['rsi']
+
+        package_dir = exporter.create_deployment_package('Demo', Strategy(), {'return_pct': 3.0})
+        assert 'models/Demo_model.pkl`: Trained ML model (if applicable; plain pickle' in (
+            package_dir / 'README.md').read_text()
+
+        # The script reads models/ beside itself
+        (package_dir / 'models').mkdir()
+        (exporter.export_dir / 'models' / 'Demo_model.pkl').rename(package_dir / 'models' / 'Demo_model.pkl')
+        spec = importlib.util.spec_from_file_location('deploy_demo_model', package_dir / 'deploy_Demo.py')
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+        assert module.load_model() == ({'weights': [1.0, 2.0]}, ['rsi'])
+
+    def test_array_results_exported_beside_summary(self, exporter):
+        """Array-valued results become result files; only scalars stay in JSON"""
+        equity = pd.Series(np.linspace(100000, 110000, 300),
+                           index=pd.date_range('2024-01-01', periods=300, freq='D'))
+        results = {'return_pct': 10.0, 'equity_curve': equity, 'weights': np.ones((5, 2))}
+
+        package_dir = exporter.create_deployment_package('Demo', object(), results)
+
+        config = json.loads((exporter.export_dir / 'Demo_object_config.json').read_text())
+        assert config['backtest_results'] == {'return_pct': 10.0}
+        readme = (package_dir / 'README.md').read_text()
+        assert 'results_equity_curve' in readme and '110000' not in readme
+
+        spec = importlib.util.spec_from_file_location('deploy_demo', package_dir / 'deploy_Demo.py')
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        loaded = module.load_results()
+
+        assert sorted(loaded) == ['equity_curve', 'weights']
+        np.testing.assert_allclose(loaded['equity_curve']['equity_curve'], equity.to_numpy())
+        assert loaded['weights'].shape == (5, 2)
+
+    def test_result_keys_cannot_escape_package(self, exporter):
+        """Keys with path characters map to safe file names and load back under the original key"""
+        results = {'../escape': np.arange(3.0), 'a/b': np.arange(4.0), 'a_b': np.arange(5.0)}
+
+        package_dir = exporter.create_deployment_package('Demo', object(), results)
+
+        names = sorted(p.name for p in package_dir.glob('results_*'))
+        assert [n.rsplit('.', 1)[0] for n in names] == ['results__escape', 'results_a_b', 'results_a_b_2']
+        assert not list(exporter.export_dir.glob('*escape*'))
+
+        spec = importlib.util.spec_from_file_location('deploy_demo_keys', package_dir / 'deploy_Demo.py')
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        loaded = module.load_results()
+
+        assert sorted(loaded) == ['../escape', 'a/b', 'a_b']
+        assert len(loaded['a_b']) == 5 and len(loaded['a/b']) == 4
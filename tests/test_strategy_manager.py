@@ -0,0 +1,242 @@
+"""
+Test strategy_manager.py: saved strategy configurations
+"""
+
+import json
+import os
+import pickle
+
+import pytest
+
+from strategy_manager import StrategyManager, StrategyConfig, create_strategy_from_execution
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """StrategyManager backed by a temporary config file"""
+    return StrategyManager(config_file=str(tmp_path / 'strategy_configs.json'))
+
+
+def _config(name, strategy_type='MomentumStrategy', **parameters):
+    return StrategyConfig(name=name, strategy_type=strategy_type, parameters=parameters)
+
+
+class TestBestPerforming:
+    """Test ranking of strategies by their latest results"""
+
+    def test_top_n_by_latest_metric(self, manager):
+        """Only the latest run counts and strategies without the metric are skipped"""
+        for name, returns in [('A', [50, 1]), ('B', [5]), ('C', [12]), ('D', [12]), ('E', [])]:
+            config = _config(name)
+            for value in returns:
+                config.update_performance({'return': value})
+            manager.strategies[name] = config
+        manager.strategies['F'] = _config('F')
+        manager.strategies['F'].update_performance({'sharpe': 3.0})
+
+        assert [c.name for c in manager.get_best_performing(n=3)] == ['C', 'D', 'B']
+        assert [c.name for c in manager.get_best_performing(n=10)] == ['C', 'D', 'B', 'A']
+        assert manager.get_best_performing(metric='drawdown') == []
+
+
+class TestPersistence:
+    """Test saving, exporting and importing configurations"""
+
+    def test_save_and_reload_keeps_backup(self, manager):
+        """Saved strategies reload intact and the previous file is kept as .backup"""
+        manager.save_strategy(_config('First', lookback=14))
+        config = _config('Second', entry_threshold=0.02)
+        config.update_performance({'return': 3.5})
+        manager.save_strategy(config)
+
+        reloaded = StrategyManager(config_file=manager.config_file)
+        assert reloaded.get_strategy('Second').to_dict() == config.to_dict()
+        assert reloaded.get_strategy('First').parameters == {'lookback': 14}
+        backup = StrategyManager(config_file=manager.config_file + '.backup')
+        assert list(backup.strategies) == ['First']
+
+    def test_export_import_roundtrip(self, manager, tmp_path):
+        """An exported strategy imports under a new name with the same settings"""
+        manager.save_strategy(_config('Source', lookback=20))
+        export_path = str(tmp_path / 'source.json')
+
+        assert manager.export_strategy('Source', export_path)
+        assert manager.import_strategy(export_path, new_name='Copy')
+        assert manager.get_strategy('Copy').parameters == {'lookback': 20}
+        assert not manager.import_strategy(export_path)
+
+
+class TestListStrategies:
+    """Test type and tag filtering through the secondary indices"""
+
+    def test_filters_follow_updates_and_deletes(self, manager):
+        """Type/tag filters reflect saves, tag updates, clones and deletes"""
+        manager.save_strategy(StrategyConfig('Mom', 'MomentumStrategy', tags=['spy', 'fast']))
+        manager.save_strategy(StrategyConfig('Rev', 'MeanReversion', tags=['spy']))
+        manager.save_strategy(StrategyConfig('Slow', 'MomentumStrategy', tags=['qqq']))
+
+        def names(**filters):
+            return sorted(c.name for c in manager.list_strategies(**filters))
+
+        assert names() == ['Mom', 'Rev', 'Slow']
+        assert names(strategy_type='MomentumStrategy') == ['Mom', 'Slow']
+        assert names(tags=['fast', 'qqq']) == ['Mom', 'Slow']
+        assert names(strategy_type='MomentumStrategy', tags=['spy']) == ['Mom']
+        assert names(strategy_type='Unknown') == []
+
+        manager.update_strategy('Mom', {'tags': ['qqq']})
+        manager.clone_strategy('Rev', 'RevCopy')
+        manager.delete_strategy('Slow')
+
+        assert names(tags=['fast']) == []
+        assert names(tags=['qqq']) == ['Mom']
+        assert names(strategy_type='MeanReversion', tags=['spy']) == ['Rev', 'RevCopy']
+        assert names(strategy_type='MomentumStrategy') == ['Mom']
+
+        reloaded = StrategyManager(config_file=manager.config_file)
+        assert sorted(c.name for c in reloaded.list_strategies(tags=['spy'])) == ['Rev', 'RevCopy']
+
+    def test_sorted_newest_first(self, manager):
+        """Listing orders by last modification time, unparseable stamps last"""
+        stamps = {'Old': '2024-01-05T09:00:00', 'New': '2024-03-01T10:30:00.250000',
+                  'Mid': '2024-02-10T00:00:00', 'Bad': 'not-a-date'}
+        for name, stamp in stamps.items():
+            manager.strategies[name] = StrategyConfig.from_dict(
+                {'name': name, 'strategy_type': 'T', 'parameters': {}, 'last_modified': stamp})
+        manager._rebuild_indices()
+
+        assert [c.name for c in manager.list_strategies()] == ['New', 'Mid', 'Old', 'Bad']
+        manager.strategies['Old'].add_metadata('note', 'touched')
+        assert manager.list_strategies(strategy_type='T')[0].name == 'Old'
+
+
+class TestStrategyConfig:
+    """Test the StrategyConfig record"""
+
+    def test_slots_roundtrip(self):
+        """Slotted configs have no __dict__ and still round-trip through dict and pickle"""
+        config = StrategyConfig('S', 'MomentumStrategy', {'lookback': 5}, tags=['x'], symbol='SPY')
+        config.update_performance({'return': 1.0})
+
+        assert not hasattr(config, '__dict__')
+        assert StrategyConfig.from_dict(config.to_dict()).to_dict() == config.to_dict()
+        restored = pickle.loads(pickle.dumps(config))
+        assert restored.to_dict() == config.to_dict()
+        assert restored._last_modified_ts == config._last_modified_ts
+
+    def test_stored_timestamp_used_on_load(self):
+        """from_dict trusts a stored last_modified_ts and parses the ISO string otherwise"""
+        config = StrategyConfig('S', 'MomentumStrategy')
+        data = config.to_dict()
+        assert data['last_modified_ts'] == config._last_modified_ts
+
+        data['last_modified_ts'] = 123.0
+        assert StrategyConfig.from_dict(data)._last_modified_ts == 123.0
+        del data['last_modified_ts']
+        assert StrategyConfig.from_dict(data)._last_modified_ts == config._last_modified_ts
+
+    def test_one_clock_read_per_change(self):
+        """A change stamps its history entry and last_modified with the same time"""
+        config = StrategyConfig('S', 'MomentumStrategy')
+        assert config.created_at == config.last_modified
+
+        config.update_performance({'return': 2.0})
+        assert config.performance_history[-1]['timestamp'] == config.last_modified
+        assert StrategyConfig.from_dict({'name': 'S', 'strategy_type': 'T', 'parameters': {},
+                                         'created_at': '2024-01-01T00:00:00'}).last_modified == '2024-01-01T00:00:00'
+
+
+class TestLazyLoading:
+    """Test on-demand construction of stored configs"""
+
+    def test_configs_built_on_first_access(self, manager):
+        """Loading parses the file but builds only the configs that are read"""
+        for name in ('A', 'B', 'C'):
+            manager.save_strategy(StrategyConfig(name, 'MeanReversion' if name == 'B' else 'Momentum',
+                                                 tags=[name.lower()]))
+
+        reloaded = StrategyManager(config_file=manager.config_file)
+        built = lambda: sorted(n for n, v in reloaded.strategies._data.items() if isinstance(v, StrategyConfig))
+
+        assert len(reloaded.strategies) == 3 and 'C' in reloaded.strategies
+        assert built() == []
+        assert [c.name for c in reloaded.list_strategies(strategy_type='MeanReversion')] == ['B']
+        assert built() == ['B']
+
+        reloaded.update_strategy('B', {'description': 'edited'})
+        assert built() == ['B']
+        again = StrategyManager(config_file=manager.config_file)
+        assert again.get_strategy('B').description == 'edited'
+        assert again.get_strategy('A').to_dict() == manager.get_strategy('A').to_dict()
+
+    def test_null_tags_indexed_as_empty(self, manager):
+        """A stored config with null tags loads and lists like one with no tags"""
+        manager.save_strategy(StrategyConfig('A', 'Momentum'))
+        with open(manager.config_file) as f:
+            data = json.load(f)
+        data['A']['tags'] = None
+        with open(manager.config_file, 'w') as f:
+            json.dump(data, f)
+
+        reloaded = StrategyManager(config_file=manager.config_file)
+        assert [c.name for c in reloaded.list_strategies(strategy_type='Momentum')] == ['A']
+        assert reloaded.list_strategies(tags=['x']) == []
+        assert reloaded.get_strategy('A').tags == []
+
+
+class TestIncrementalEncoding:
+    """Test reuse of encoded JSON for configs that were never built"""
+
+    def test_encoding_matches_whole_file_dump(self, manager):
+        """Member-wise encoding gives the same bytes as dumping the full mapping"""
+        from json_utils import dumps_json
+
+        for i, tags in enumerate([['a'], [], ['b', 'c']]):
+            config = StrategyConfig(f'S{i}', 'MomentumStrategy', {'lookback': i, 'name': 'ü'}, tags=tags)
+            config.update_performance({'return': 1.5 * i, 'trades': [1, 2]})
+            manager.save_strategy(config)
+
+        expected = dumps_json({name: c.to_dict() for name, c in manager.strategies.items()})
+        with open(manager.config_file, 'rb') as f:
+            assert f.read() == expected
+
+        reloaded = StrategyManager(config_file=manager.config_file)
+        assert reloaded.strategies.encode() == expected
+        assert StrategyManager(config_file=str(manager.config_file) + '.missing').strategies.encode() == b'{}'
+
+    def test_only_built_configs_reencoded(self, manager):
+        """Unbuilt entries reuse their cached bytes; edits to built configs are saved"""
+        for name in ('A', 'B', 'C'):
+            manager.save_strategy(_config(name))
+
+        reloaded = StrategyManager(config_file=manager.config_file)
+        reloaded.update_strategy('B', {'description': 'edited'})
+        assert sorted(reloaded.strategies._encoded) == ['A', 'C']
+
+        reloaded.get_strategy('A').update_performance({'return': 9.0})
+        reloaded.save_strategies()
+        again = StrategyManager(config_file=manager.config_file)
+        assert again.get_strategy('A').performance_history[-1]['results'] == {'return': 9.0}
+        assert again.get_strategy('B').description == 'edited'
+        assert sorted(again.strategies) == ['A', 'B', 'C']
+
+
+class TestCreateFromExecution:
+    """Test capturing a strategy object's settings"""
+
+    def test_instance_and_class_attributes_recorded(self):
+        """Present attributes are recorded, including class-level and None values"""
+        class MLStrategy:
+            n_estimators = 200
+
+            def __init__(self):
+                self.symbol = 'QQQ'
+                self.cash = 5000
+                self.lookback = 30
+                self.exit_threshold = None
+
+        config = create_strategy_from_execution(MLStrategy(), 'Run', tags=['ml'])
+
+        assert config.strategy_type == 'MLStrategy'
+        assert config.parameters == {'symbol': 'QQQ', 'initial_capital': 5000, 'lookback': 30,
+                                     'exit_threshold': None, 'n_estimators': 200}
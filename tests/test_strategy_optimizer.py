@@ -0,0 +1,814 @@
+"""
+Test strategy_optimizer.py: scoring metrics and search bookkeeping
+"""
+
+import pickle
+from types import SimpleNamespace
+from datetime import datetime
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from strategy_optimizer import StrategyOptimizer
+
+
+START = datetime(2024, 1, 1)
+END = datetime(2024, 12, 31)
+
+
+def _tuple_trades(prices):
+    """BUY/SELL tuple trades (date, side, price, shares) alternating over prices"""
+    sides = ['BUY', 'SELL'] * len(prices)
+    return [(pd.Timestamp('2024-01-01') + pd.Timedelta(days=i), sides[i], price, 10)
+            for i, price in enumerate(prices)]
+
+
+class FixedStrategy:
+    """Strategy stub whose backtest returns canned trades and equity"""
+
+    trades = []
+    equity = []
+
+    def __init__(self, symbol, initial_capital, **params):
+        self.initial_capital = initial_capital
+        self.params = params
+
+    def backtest(self, start_date, end_date, data=None):
+        return data, self.trades, self.initial_capital * 1.1, self.equity
+
+
+class LookbackStrategy:
+    """Deterministic strategy whose trades depend on its lookback parameter"""
+
+    def __init__(self, symbol, initial_capital, lookback=5, threshold=0.5):
+        self.initial_capital = initial_capital
+        self.lookback = int(lookback)
+        self.threshold = threshold
+
+    def backtest(self, start_date, end_date, data=None):
+        if self.lookback > 40:
+            raise ValueError("Insufficient history for lookback")
+        close = data['Close'].to_numpy()
+        sampled = close[::self.lookback]
+        trades = _tuple_trades(list(sampled[:2 * int(10 * self.threshold)]))
+        equity = list(self.initial_capital * sampled / sampled[0])
+        return data, trades, equity[-1], equity
+
+
+@pytest.fixture
+def close_data():
+    """Synthetic normalized price frame"""
+    rng = np.random.default_rng(7)
+    close = 100 * np.cumprod(1 + rng.normal(0.0005, 0.01, 400))
+    return pd.DataFrame({'Close': close}, index=pd.date_range('2023-01-01', periods=400, freq='D'))
+
+
+def _reference_trade_metrics(trades):
+    """Per-pair Python loop the optimizer used to run"""
+    wins, profits, losses = 0, [], []
+    for i in range(0, len(trades) - 1, 2):
+        profit = trades[i + 1][2] - trades[i][2]
+        if profit > 0:
+            wins += 1
+            profits.append(profit)
+        else:
+            losses.append(abs(profit))
+    return {
+        'win_rate': wins / (len(trades) // 2),
+        'avg_win': np.mean(profits) if profits else 0,
+        'avg_loss': np.mean(losses) if losses else 1,
+        'profit_factor': (sum(profits) / sum(losses)) if losses and sum(losses) > 0 else 0,
+    }
+
+
+class TestEvaluateParams:
+    """Test metrics computed by _evaluate_params"""
+
+    @pytest.mark.parametrize('prices', [
+        [100, 105, 104, 101, 99, 99, 98, 110, 50],   # odd count: trailing BUY ignored
+        [100, 101, 102, 103],                        # all wins
+        [100, 90, 100, 100],                         # loss plus break-even
+    ])
+    def test_tuple_trade_metrics_match_pairwise_loop(self, prices, monkeypatch):
+        """Compiled pair reduction reproduces the per-pair Python loop"""
+        trades = _tuple_trades(prices)
+        monkeypatch.setattr(FixedStrategy, 'trades', trades)
+        optimizer = StrategyOptimizer(FixedStrategy, metric='win_rate')
+
+        score, metrics, category = optimizer._evaluate_params({}, 'SPY', START, END, 10000, data=None)
+
+        assert category is None
+        assert score == metrics['win_rate']
+        for key, value in _reference_trade_metrics(trades).items():
+            assert metrics[key] == pytest.approx(value)
+
+    def test_dict_trade_metrics(self, monkeypatch):
+        """Per-trade profit dicts: break-even trades count in win_rate but not in avg_loss"""
+        trades = [{'profit': 30.0}, {'profit': -10.0}, {'profit': 0}, {'profit': 15.0}, {'profit': -20.0}, {}]
+        monkeypatch.setattr(FixedStrategy, 'trades', trades)
+        optimizer = StrategyOptimizer(FixedStrategy, metric='profit_factor')
+
+        score, metrics, _ = optimizer._evaluate_params({}, 'SPY', START, END, 10000)
+
+        assert metrics['win_rate'] == pytest.approx(2 / 6)
+        assert metrics['avg_win'] == pytest.approx(22.5)
+        assert metrics['avg_loss'] == pytest.approx(15.0)
+        assert score == metrics['profit_factor'] == pytest.approx(1.5)
+
+    @pytest.mark.parametrize('as_dicts', [False, True])
+    def test_sharpe_and_drawdown_match_pandas(self, as_dicts, monkeypatch):
+        """NumPy Sharpe/drawdown reproduce the pandas pct_change/expanding formulas"""
+        rng = np.random.default_rng(1)
+        values = list(10000 * np.cumprod(1 + rng.normal(0.0005, 0.01, 500)))
+        equity = [{'Value': v} for v in values] if as_dicts else values
+        monkeypatch.setattr(FixedStrategy, 'trades', _tuple_trades([100, 101, 102, 99]))
+        monkeypatch.setattr(FixedStrategy, 'equity', equity)
+        optimizer = StrategyOptimizer(FixedStrategy, metric='sharpe_ratio')
+
+        score, metrics, _ = optimizer._evaluate_params({}, 'SPY', START, END, 10000)
+
+        series = pd.Series(values)
+        returns = series.pct_change().dropna()
+        drawdowns = (series - series.expanding().max()) / series.expanding().max()
+        assert score == pytest.approx(returns.mean() / returns.std() * np.sqrt(252))
+        assert metrics['max_drawdown'] == pytest.approx(abs(drawdowns.min()) * 100)
+
+    @pytest.mark.parametrize('wrap', [np.asarray, pd.Series, tuple])
+    def test_array_like_equity_curves(self, wrap, monkeypatch):
+        """Equity curves returned as arrays, Series or tuples score like lists"""
+        values = [10000.0, 10100.0, 9900.0, 10300.0, 10250.0]
+        monkeypatch.setattr(FixedStrategy, 'trades', _tuple_trades([100, 101, 102, 99]))
+        monkeypatch.setattr(FixedStrategy, 'equity', values)
+        optimizer = StrategyOptimizer(FixedStrategy)
+        _, expected, _ = optimizer._evaluate_params({}, 'SPY', START, END, 10000)
+
+        monkeypatch.setattr(FixedStrategy, 'equity', wrap(values))
+        _, metrics, _ = optimizer._evaluate_params({}, 'SPY', START, END, 10000)
+
+        assert metrics == expected
+
+    def test_flat_equity_has_zero_sharpe(self, monkeypatch):
+        """Constant equity gives zero Sharpe and zero drawdown"""
+        monkeypatch.setattr(FixedStrategy, 'trades', _tuple_trades([100, 101, 102, 99]))
+        monkeypatch.setattr(FixedStrategy, 'equity', [10000.0] * 50)
+        optimizer = StrategyOptimizer(FixedStrategy)
+
+        _, metrics, _ = optimizer._evaluate_params({}, 'SPY', START, END, 10000)
+
+        assert metrics['sharpe_ratio'] == 0
+        assert metrics['max_drawdown'] == 0
+
+
+class TestKernels:
+    """Test the compiled metric kernels against the array formulas"""
+
+    @pytest.mark.parametrize('with_nan', [False, True])
+    def test_equity_stats_matches_numpy(self, with_nan):
+        """One-pass Sharpe/drawdown equal the vectorized computation"""
+        from optimizer_kernels import equity_stats
+
+        rng = np.random.default_rng(3)
+        equity = 10000 * np.cumprod(1 + rng.normal(0.0002, 0.02, 300))
+        if with_nan:
+            equity[120] = np.nan
+
+        sharpe, max_drawdown = equity_stats(equity)
+
+        returns = equity[1:] / equity[:-1] - 1
+        returns = returns[~np.isnan(returns)]
+        assert sharpe == pytest.approx(returns.mean() / returns.std(ddof=1) * np.sqrt(252))
+        drawdowns = (equity - np.maximum.accumulate(equity)) / np.maximum.accumulate(equity)
+        if with_nan:
+            assert np.isnan(max_drawdown)
+        else:
+            assert max_drawdown == pytest.approx(abs(drawdowns.min()) * 100)
+        kernel = getattr(equity_stats, 'py_func', equity_stats)
+        assert kernel(equity)[0] == pytest.approx(sharpe)
+
+    def test_warmup_compiles_every_kernel(self):
+        """warmup leaves each kernel with a compiled float64 signature"""
+        import optimizer_kernels
+
+        optimizer_kernels.warmup()
+        if not optimizer_kernels.HAS_NUMBA:
+            pytest.skip('numba not installed')
+        assert optimizer_kernels.trade_pair_stats.signatures
+        assert optimizer_kernels.equity_stats.signatures
+
+
+class TestDataCache:
+    """Test sharing of fetched data across searches"""
+
+    def test_repeat_window_fetched_once(self, close_data, monkeypatch):
+        """Searches over the same window fetch once, reuse outcomes and cannot alter the cached frame"""
+        import data_manager
+        from strategy_optimizer import clear_data_cache, _fetch_and_normalize
+
+        fetches = []
+
+        class StubManager:
+            def fetch_data(self, symbol, start, end):
+                fetches.append((symbol, start, end))
+                return close_data.copy() if symbol == 'SPY' else None
+
+        monkeypatch.setattr(data_manager, 'DataManager', StubManager)
+        clear_data_cache()
+        try:
+            optimizer = StrategyOptimizer(LookbackStrategy)
+            for metric in ('sharpe_ratio', 'total_return'):
+                optimizer.metric = metric
+                assert optimizer.grid_search({'lookback': [3, 5]}, 'SPY', START, END, verbose=False)['success']
+            optimizer.grid_search({'lookback': [3, 5]}, 'SPY', START, END, verbose=False)
+            assert optimizer.cache_hits == 2
+            optimizer.random_search({'lookback': (3, 5)}, 'SPY', START, END, n_iterations=2, verbose=False)
+            assert fetches == [('SPY', '2024-01-01', '2024-12-31')]
+
+            first, source = _fetch_and_normalize('SPY', '2024-01-01', '2024-12-31')
+            first.loc[first.index[0], 'Close'] = -1.0
+            assert source['Close'].iloc[0] > 0
+            again, same_source = _fetch_and_normalize('SPY', '2024-01-01', '2024-12-31')
+            assert same_source is source and again['Close'].iloc[0] > 0
+
+            for _ in range(2):
+                result = optimizer.grid_search({'lookback': [3]}, 'QQQ', START, END, verbose=False)
+                assert result['failure_summary'] == {'data_fetch': 1}
+            assert len(fetches) == 3
+        finally:
+            clear_data_cache()
+
+    def test_cached_data_expires_next_day(self, close_data, monkeypatch):
+        """A search on a later day fetches again and does not reuse earlier outcomes"""
+        import datetime as dt
+        import data_manager
+        import strategy_optimizer
+        from strategy_optimizer import clear_data_cache
+
+        fetches = []
+
+        class StubManager:
+            def fetch_data(self, symbol, start, end):
+                fetches.append(symbol)
+                return close_data.copy()
+
+        class FakeDate(dt.date):
+            day = dt.date(2025, 3, 3)
+
+            @classmethod
+            def today(cls):
+                return cls.day
+
+        monkeypatch.setattr(data_manager, 'DataManager', StubManager)
+        monkeypatch.setattr(strategy_optimizer, 'date', FakeDate)
+        clear_data_cache()
+        try:
+            optimizer = StrategyOptimizer(LookbackStrategy)
+            optimizer.grid_search({'lookback': [3, 5]}, 'SPY', START, END, verbose=False)
+            optimizer.grid_search({'lookback': [3, 5]}, 'SPY', START, END, verbose=False)
+            assert len(fetches) == 1 and optimizer.cache_hits == 2
+
+            FakeDate.day = dt.date(2025, 3, 4)
+            optimizer.grid_search({'lookback': [3, 5]}, 'SPY', START, END, verbose=False)
+            assert len(fetches) == 2 and optimizer.cache_hits == 0
+        finally:
+            clear_data_cache()
+
+
+class TestOptimizeLayout:
+    """Test contiguous column layout of fetched data"""
+
+    def test_strided_columns_made_contiguous(self):
+        """Columns viewing a row-major array get contiguous copies with the same values"""
+        from strategy_optimizer import _optimize_layout
+
+        rows = np.random.default_rng(3).random((50, 3))
+        df = pd.DataFrame(rows, columns=['Open', 'Close', 'Volume'], copy=False)
+        df['Symbol'] = 'SPY'
+        assert not df['Close'].to_numpy().flags.c_contiguous
+
+        assert _optimize_layout(df) is df
+        assert all(df[col].to_numpy().flags.c_contiguous for col in ['Open', 'Close', 'Volume'])
+        np.testing.assert_array_equal(df[['Open', 'Close', 'Volume']].to_numpy(), rows)
+        assert (df['Symbol'] == 'SPY').all()
+
+
+class TestParallelSearch:
+    """Test process-pool evaluation matches the serial search"""
+
+    @staticmethod
+    def _summary(result):
+        return (result['best_params'], result['best_score'], result['tested'], result['valid'],
+                result['failure_summary'], [(r['params'], r['score']) for r in result['top_results']])
+
+    def test_grid_search_parallel_matches_serial(self, close_data):
+        """n_jobs > 1 gives the same results as a serial grid search"""
+        grid = {'lookback': [3, 5, 8, 13, 50], 'threshold': [0.3, 0.6]}
+        runs = [StrategyOptimizer(LookbackStrategy).grid_search(
+                    grid, 'SPY', START, END, data=close_data, verbose=False, n_jobs=n_jobs)
+                for n_jobs in (1, 2)]
+
+        assert self._summary(runs[0]) == self._summary(runs[1])
+        assert runs[1]['failure_summary'] == {'insufficient_history': 2}
+
+    def test_random_search_parallel_matches_serial(self, close_data):
+        """Sampled parameters and scores do not depend on n_jobs"""
+        dists = {'lookback': (2, 20), 'threshold': (0.2, 0.9)}
+        runs = [StrategyOptimizer(LookbackStrategy).random_search(
+                    dists, 'SPY', START, END, n_iterations=12, data=close_data, verbose=False, n_jobs=n_jobs)
+                for n_jobs in (1, 2)]
+
+        assert self._summary(runs[0]) == self._summary(runs[1])
+
+    def test_worker_context_set_once(self, close_data, monkeypatch):
+        """Workers get the search context from the initializer; tasks carry only params"""
+        import strategy_optimizer
+
+        monkeypatch.setattr(strategy_optimizer, '_WORKER_CONTEXT', None)
+        strategy_optimizer._init_worker(LookbackStrategy, 'total_return', 'SPY', START, END, 10000, close_data)
+
+        expected = StrategyOptimizer(LookbackStrategy, metric='total_return')._evaluate_params(
+            {'lookback': 5}, 'SPY', START, END, 10000, close_data)
+        assert strategy_optimizer._evaluate_outcome({'lookback': 5}) == expected
+        assert isinstance(strategy_optimizer._evaluate_outcome({'lookback': 60}), Exception)
+
+    def test_shared_memory_data_matches_serial(self, close_data, monkeypatch):
+        """Workers reading the data from shared memory score exactly as a serial run"""
+        import strategy_optimizer
+
+        monkeypatch.setattr(strategy_optimizer, '_share_data_in_memory', lambda: True)
+        grid = {'lookback': [3, 5, 8, 50], 'threshold': [0.3, 0.6]}
+        runs = [StrategyOptimizer(LookbackStrategy).grid_search(
+                    grid, 'SPY', START, END, data=close_data, verbose=False, n_jobs=n_jobs)
+                for n_jobs in (1, 2)]
+
+        assert self._summary(runs[0]) == self._summary(runs[1])
+
+    def test_shared_frame_roundtrip(self, close_data):
+        """Attached frames are zero-copy views equal to the original; object columns are not shared"""
+        from strategy_optimizer import _SharedFrame
+
+        df = close_data.assign(Volume=np.arange(len(close_data)), Flag=close_data['Close'] > 100)
+        shm, handle = _SharedFrame.create(df)
+        try:
+            view_shm, shared = pickle.loads(pickle.dumps(handle)).attach()
+            pd.testing.assert_frame_equal(shared, df)
+            assert np.shares_memory(shared['Volume'].to_numpy(), np.asarray(view_shm.buf))
+            del shared
+            view_shm.close()
+        finally:
+            shm.close()
+            shm.unlink()
+
+        assert _SharedFrame.create(df.assign(Symbol='SPY')) == (None, None)
+
+    def test_random_search_sampling_is_local_and_typed(self, close_data):
+        """Samples are plain Python scalars in range and leave the global RNG untouched"""
+        np.random.seed(123)
+        expected_next = np.random.random()
+        np.random.seed(123)
+
+        optimizer = StrategyOptimizer(LookbackStrategy)
+        optimizer.random_search({'lookback': (2, 20), 'threshold': (0.2, 0.9)}, 'SPY', START, END,
+                                n_iterations=8, data=close_data, verbose=False, seed=5)
+
+        assert np.random.random() == expected_next
+        for entry in optimizer.optimization_results:
+            assert type(entry['params']['lookback']) is int and 2 <= entry['params']['lookback'] <= 20
+            assert type(entry['params']['threshold']) is float
+
+    def test_unpicklable_strategy_runs_serially(self, close_data):
+        """Locally defined strategy classes fall back to in-process evaluation"""
+        class LocalStrategy(LookbackStrategy):
+            pass
+
+        result = StrategyOptimizer(LocalStrategy).grid_search(
+            {'lookback': [3, 5]}, 'SPY', START, END, data=close_data, verbose=False, n_jobs=2)
+
+        assert result['valid'] == 2
+
+
+class TestDuplicateParams:
+    """Test reuse of outcomes for repeated parameter sets"""
+
+    @pytest.mark.parametrize('n_jobs', [1, 2])
+    def test_repeated_samples_backtested_once(self, close_data, n_jobs, monkeypatch):
+        """Random search over a tiny integer range re-runs no backtest twice"""
+        calls = []
+        original = LookbackStrategy.backtest
+
+        def counting_backtest(self, start_date, end_date, data=None):
+            calls.append(self.lookback)
+            return original(self, start_date, end_date, data=data)
+
+        if n_jobs == 1:
+            monkeypatch.setattr(LookbackStrategy, 'backtest', counting_backtest)
+        optimizer = StrategyOptimizer(LookbackStrategy)
+        result = optimizer.random_search({'lookback': (3, 5)}, 'SPY', START, END, n_iterations=10,
+                                         data=close_data, verbose=False, n_jobs=n_jobs)
+
+        assert result['tested'] == 10
+        assert optimizer.cache_hits == 10 - len({r['params']['lookback'] for r in optimizer.optimization_results})
+        assert optimizer.duplicate_hits == optimizer.cache_hits
+        if n_jobs == 1:
+            assert sorted(calls) == sorted(set(calls))
+        entries = optimizer.optimization_results
+        assert entries[0]['metrics'] is not entries[1]['metrics']
+
+
+class TestProgress:
+    """Test verbose progress reporting"""
+
+    @pytest.mark.parametrize('has_tqdm', [False, True])
+    def test_progress_reporting(self, close_data, has_tqdm, monkeypatch, capsys):
+        """Periodic progress lines only without tqdm; new-best lines either way"""
+        import strategy_optimizer
+
+        if not has_tqdm:
+            monkeypatch.setattr(strategy_optimizer, 'tqdm', None)
+        elif strategy_optimizer.tqdm is None:
+            pytest.skip('tqdm not installed')
+        StrategyOptimizer(LookbackStrategy).grid_search(
+            {'lookback': list(range(2, 14))}, 'SPY', START, END, data=close_data)
+
+        out = capsys.readouterr().out
+        assert 'OK New best' in out
+        assert ('Progress: 12/12' in out) is not has_tqdm
+
+    @pytest.mark.parametrize('has_tqdm', [False, True])
+    def test_skipped_combinations_complete_progress(self, close_data, has_tqdm, monkeypatch, capsys):
+        """Combinations rejected by constraints (including the last) count toward the total"""
+        import strategy_optimizer
+
+        bars = []
+
+        class RecordingBar:
+            def __init__(self, total, **kwargs):
+                self.total, self.n = total, 0
+                bars.append(self)
+
+            def update(self, n):
+                self.n += n
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            write = staticmethod(print)
+
+        monkeypatch.setattr(strategy_optimizer, 'tqdm', RecordingBar if has_tqdm else None)
+        result = StrategyOptimizer(LookbackStrategy).grid_search(
+            {'lookback': [3, 5, 8], 'threshold': [0.2, 0.4, 0.6]}, 'SPY', START, END, data=close_data,
+            constraints=lambda p: 1 < p['lookback'] * p['threshold'] < 4)
+
+        assert result['skipped'] == 3
+        if has_tqdm:
+            assert [(bar.n, bar.total) for bar in bars] == [(9, 9)]
+        else:
+            assert 'Progress: 9/9 (100.0%)' in capsys.readouterr().out
+
+    def test_fallback_lines_throttled_by_time(self, monkeypatch, capsys):
+        """Without tqdm, lines appear per elapsed interval plus one final line"""
+        import strategy_optimizer
+
+        clock = iter([0.0, 0.1, 0.2, 0.6, 0.7, 0.8, 0.9])
+        monkeypatch.setattr(strategy_optimizer, 'time', SimpleNamespace(monotonic=lambda: next(clock)))
+        items = list(strategy_optimizer._progress_lines(iter('abcde'), 5))
+
+        lines = capsys.readouterr().out.splitlines()
+        assert items == list('abcde')
+        assert [line.split()[1] for line in lines] == ['3/5', '5/5']
+        assert '5.0/s, ETA 0s' in lines[0]
+
+
+class TestOutcomeCache:
+    """Test reuse of outcomes across searches on the same inputs"""
+
+    @pytest.mark.parametrize('n_jobs', [1, 2])
+    def test_second_search_reuses_outcomes(self, close_data, n_jobs):
+        """Repeating a search on the same data object re-runs no backtest"""
+        grid = {'lookback': [3, 5, 50]}
+        optimizer = StrategyOptimizer(LookbackStrategy)
+        first = optimizer.grid_search(grid, 'SPY', START, END, data=close_data, verbose=False, n_jobs=n_jobs)
+        assert optimizer.cache_hits == 0
+
+        second = optimizer.grid_search(grid, 'SPY', START, END, data=close_data, verbose=False, n_jobs=n_jobs)
+        assert optimizer.cache_hits == 3 and optimizer.duplicate_hits == 0
+        assert TestParallelSearch._summary(first) == TestParallelSearch._summary(second)
+
+        optimizer.grid_search(grid, 'SPY', START, END, data=close_data.copy(), verbose=False, n_jobs=n_jobs)
+        assert optimizer.cache_hits == 0
+
+    def test_summary_separates_duplicates_from_earlier_outcomes(self, close_data, capsys, monkeypatch):
+        """Repeats within a search and outcomes cached by earlier searches are reported apart"""
+        import strategy_optimizer
+        monkeypatch.setattr(strategy_optimizer, 'tqdm', None)
+        optimizer = StrategyOptimizer(LookbackStrategy)
+        optimizer.grid_search({'lookback': [3, 5]}, 'SPY', START, END, data=close_data, verbose=False)
+
+        optimizer.grid_search({'lookback': [3, 5, 5, 8]}, 'SPY', START, END, data=close_data, verbose=True)
+
+        assert (optimizer.cache_hits, optimizer.duplicate_hits) == (3, 1)
+        out = capsys.readouterr().out
+        assert 'Duplicate parameter sets reused: 1' in out
+        assert 'Outcomes reused from earlier searches: 2' in out
+
+    def test_metric_or_strategy_change_not_served_from_cache(self, close_data):
+        """Outcomes scored for one metric or strategy class are not reused for another"""
+        class OtherStrategy(LookbackStrategy):
+            pass
+
+        grid = {'lookback': [3, 5, 8]}
+        optimizer = StrategyOptimizer(LookbackStrategy)
+        optimizer.grid_search(grid, 'SPY', START, END, data=close_data, verbose=False)
+
+        optimizer.metric = 'total_return'
+        changed = optimizer.grid_search(grid, 'SPY', START, END, data=close_data, verbose=False)
+        fresh = StrategyOptimizer(LookbackStrategy, metric='total_return').grid_search(
+            grid, 'SPY', START, END, data=close_data, verbose=False)
+        assert optimizer.cache_hits == 0
+        assert ([(r['params'], r['score']) for r in changed['top_results']]
+                == [(r['params'], r['score']) for r in fresh['top_results']])
+
+        optimizer.strategy_class = OtherStrategy
+        optimizer.grid_search(grid, 'SPY', START, END, data=close_data, verbose=False)
+        assert optimizer.cache_hits == 0
+
+    def test_nondeterministic_strategy_not_cached(self, close_data):
+        """STRATEGY_IS_DETERMINISTIC = False disables outcome reuse"""
+        class NoisyStrategy(LookbackStrategy):
+            STRATEGY_IS_DETERMINISTIC = False
+
+        optimizer = StrategyOptimizer(NoisyStrategy)
+        result = optimizer.random_search({'lookback': (3, 4)}, 'SPY', START, END, n_iterations=6,
+                                         data=close_data, verbose=False)
+
+        assert result['tested'] == 6
+        assert optimizer.cache_hits == 0
+
+
+class TestRanking:
+    """Test top-10 selection and deferred sorting of results"""
+
+    @pytest.mark.parametrize('scores', [
+        [0.5, 2.0, 1.0, 2.0, -1.0, 3.0, 1.0, 0.0, 2.0, 0.7, 1.0, 1.5, None, 0.2],
+        [1.0, 2.0, 1.0, None, 1.0, 3.0, 1.0, 1.0, 2.0, 1.0, 1.0, 1.0, 1.0, 0.5],
+        [2.0, None, 1.0],
+    ])
+    def test_top_results_match_full_sort(self, scores):
+        """Top 10 equal the head of a stable descending sort, ties in evaluation order"""
+        results = [None if score is None else {'params': {'i': i}, 'score': score}
+                   for i, score in enumerate(scores)]
+        optimizer = StrategyOptimizer(LookbackStrategy)
+
+        top = optimizer._set_results(results, np.array([-np.inf if s is None else s for s in scores]))
+        expected = sorted((r for r in results if r is not None), key=lambda x: x['score'], reverse=True)
+
+        assert top == expected[:10]
+        assert not optimizer._results_ranked
+        assert optimizer.optimization_results == expected
+        assert optimizer._results_ranked
+
+
+class TestConstraints:
+    """Test rejection of invalid parameter sets before backtesting"""
+
+    @pytest.mark.parametrize('search', ['grid_search', 'random_search'])
+    def test_rejected_params_never_backtested(self, close_data, search, monkeypatch):
+        """Combinations failing the predicate are counted as skipped, not run"""
+        calls = []
+        original = LookbackStrategy.backtest
+
+        def counting_backtest(self, start_date, end_date, data=None):
+            calls.append((self.lookback, self.threshold))
+            return original(self, start_date, end_date, data=data)
+
+        monkeypatch.setattr(LookbackStrategy, 'backtest', counting_backtest)
+        optimizer = StrategyOptimizer(LookbackStrategy)
+        constraint = lambda p: p['lookback'] * p['threshold'] > 1
+        if search == 'grid_search':
+            result = optimizer.grid_search({'lookback': [3, 5, 8], 'threshold': [0.2, 0.4, 0.6]},
+                                           'SPY', START, END, data=close_data, verbose=False,
+                                           constraints=constraint)
+            assert result['skipped'] == 2
+        else:
+            result = optimizer.random_search({'lookback': (2, 8), 'threshold': (0.1, 0.6)},
+                                             'SPY', START, END, n_iterations=30, data=close_data,
+                                             verbose=False, constraints=constraint)
+            assert result['skipped'] > 0
+
+        assert calls and all(lookback * threshold > 1 for lookback, threshold in calls)
+        assert result['tested'] == len(calls)
+
+    def test_monotone(self):
+        """monotone(a, b) accepts only strictly increasing pairs"""
+        from strategy_optimizer import monotone
+
+        fast_below_slow = monotone('fast_period', 'slow_period')
+        assert fast_below_slow({'fast_period': 5, 'slow_period': 20})
+        assert not fast_below_slow({'fast_period': 20, 'slow_period': 20})
+
+
+class TestSuccessiveHalving:
+    """Test pruning of combinations on a partial backtest"""
+
+    @pytest.mark.parametrize('n_jobs', [1, 2])
+    def test_below_median_pruned_before_full_run(self, close_data, n_jobs):
+        """Only combinations at or above the partial median (or failing it) get a full run"""
+        grid = {'lookback': [2, 3, 4, 5, 6, 7, 8, 9, 50]}
+        optimizer = StrategyOptimizer(LookbackStrategy)
+        head = close_data.iloc[:80]
+        partial = {lb: optimizer._evaluate_params({'lookback': lb}, 'SPY', START, END, 10000, head)[0]
+                   for lb in grid['lookback'][:-1]}
+        median = np.median(list(partial.values()))
+
+        result = optimizer.grid_search(grid, 'SPY', START, END, data=close_data, verbose=False,
+                                       n_jobs=n_jobs, use_successive_halving=True)
+
+        survivors = sorted(lb for lb, score in partial.items() if score >= median) + [50]
+        assert result['tested'] == len(survivors)
+        assert result['skipped'] == len(grid['lookback']) - len(survivors)
+        assert any('Successive halving pruned' in w for w in result['warnings'])
+        assert result['failure_summary'] == {'insufficient_history': 1}
+
+        optimizer.grid_search(grid, 'SPY', START, END, data=close_data, verbose=False)
+        assert optimizer.cache_hits == len(survivors)
+        best_survivor = next(r['params'] for r in optimizer.optimization_results
+                             if r['params']['lookback'] in survivors)
+        assert result['best_params'] == best_survivor
+
+    def test_invalid_fraction_rejected(self, close_data):
+        """initial_fraction must leave both a partial and a remaining window"""
+        with pytest.raises(ValueError):
+            StrategyOptimizer(LookbackStrategy).grid_search(
+                {'lookback': [3]}, 'SPY', START, END, data=close_data, verbose=False,
+                use_successive_halving=True, initial_fraction=1.0)
+
+
+class TestSaveResults:
+    """Test persisting optimization results"""
+
+    @pytest.mark.parametrize('has_orjson', [False, True])
+    def test_results_round_trip(self, close_data, tmp_path, has_orjson, monkeypatch):
+        """Saved files parse back with ranked results, with or without orjson"""
+        import json
+        import strategy_optimizer
+
+        if not has_orjson:
+            monkeypatch.setattr(strategy_optimizer, 'orjson', None)
+        elif strategy_optimizer.orjson is None:
+            pytest.skip('orjson not installed')
+        optimizer = StrategyOptimizer(LookbackStrategy)
+        optimizer.grid_search({'lookback': [3, 5, 8]}, 'SPY', START, END, data=close_data, verbose=False)
+        path = tmp_path / 'results.json'
+        optimizer.save_results(str(path))
+
+        saved = json.loads(path.read_text())
+        assert saved['best_params'] == optimizer.best_params
+        assert [r['params'] for r in saved['results']] == [r['params'] for r in optimizer.optimization_results]
+        assert saved['results'][0]['score'] == pytest.approx(optimizer.best_score)
+
+    def test_streamed_bytes_match_single_dump(self, tmp_path):
+        """Element-wise writing produces the same file as encoding the dict at once"""
+        import io
+        import strategy_optimizer
+
+        orjson = pytest.importorskip('orjson')
+        option = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        for data in [{'best_params': {'a': 1}, 'best_score': np.float64(1.5), 'metric': 'sharpe_ratio',
+                      'results': [{'params': {'a': 1, 'b': [1, 2]}, 'score': 1.5,
+                                   'metrics': {'when': START, 1: np.int64(3)}}, {'params': {}, 'score': 0.0}],
+                      'timestamp': 'now'},
+                     {'best_params': None, 'results': [], 'nested': {'x': []}}, {}]:
+            buffer = io.BytesIO()
+            strategy_optimizer._write_json_streamed(buffer, data)
+            assert buffer.getvalue() == orjson.dumps(data, default=str, option=option)
+
+    def test_parquet_format(self, close_data, tmp_path):
+        """Parquet output has a row per result and the run summary in its metadata"""
+        optimizer = StrategyOptimizer(LookbackStrategy)
+        optimizer.grid_search({'lookback': [3, 5, 8]}, 'SPY', START, END, data=close_data, verbose=False)
+        optimizer.save_results(str(tmp_path / 'results.json'), file_format='parquet')
+
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            assert not (tmp_path / 'results.parquet').exists()
+            assert (tmp_path / 'results.json').exists()
+            return
+        table = pd.read_parquet(tmp_path / 'results.parquet')
+        assert list(table.columns) == ['lookback', 'score']
+        assert table['lookback'].tolist() == [r['params']['lookback'] for r in optimizer.optimization_results]
+        assert table.attrs['best_params'] == optimizer.best_params
+
+
+class TestPlotSurface:
+    """Test the optimization surface plot"""
+
+    def test_points_with_both_params_plotted(self, tmp_path, monkeypatch, capsys):
+        """Results missing either parameter are left out without misaligning the axes"""
+        matplotlib = pytest.importorskip('matplotlib')
+        matplotlib.use('Agg')
+        monkeypatch.chdir(tmp_path)
+        optimizer = StrategyOptimizer(LookbackStrategy)
+        optimizer.optimization_results = (
+            [{'params': {'lookback': lb, 'threshold': lb / 10}, 'score': lb / 3} for lb in range(2, 7)]
+            + [{'params': {'lookback': 9}, 'score': 5.0}, {'params': {'threshold': 0.1}, 'score': 4.0}])
+
+        optimizer.plot_optimization_surface('lookback', 'threshold')
+
+        assert 'Surface plot saved' in capsys.readouterr().out
+        assert (tmp_path / 'optimization_surface_lookback_threshold.png').exists()
+
+    def test_dense_results_use_light_markers(self, tmp_path, monkeypatch, capsys):
+        """Large result sets are drawn as one edgeless, unshaded scatter"""
+        matplotlib = pytest.importorskip('matplotlib')
+        matplotlib.use('Agg')
+        from mpl_toolkits.mplot3d import Axes3D
+        import strategy_optimizer
+
+        calls = []
+        original = Axes3D.scatter
+        monkeypatch.setattr(Axes3D, 'scatter',
+                            lambda self, *args, **kwargs: calls.append(kwargs) or original(self, *args, **kwargs))
+        monkeypatch.setattr(strategy_optimizer, '_DENSE_SURFACE_POINTS', 10)
+        monkeypatch.chdir(tmp_path)
+        optimizer = StrategyOptimizer(LookbackStrategy)
+        optimizer.optimization_results = [{'params': {'a': i % 7, 'b': i % 5}, 'score': float(i)}
+                                          for i in range(20)]
+
+        optimizer.plot_optimization_surface('a', 'b')
+
+        assert 'Surface plot saved' in capsys.readouterr().out
+        assert len(calls) == 1 and calls[0]['depthshade'] is False and calls[0]['linewidths'] == 0
+
+
+class TestCombinationSampling:
+    """Test sampling of large parameter grids"""
+
+    def test_empty_dimension_returns_before_fetch(self, monkeypatch):
+        """A parameter with no values fails fast, naming it, without loading data"""
+        optimizer = StrategyOptimizer(LookbackStrategy)
+        monkeypatch.setattr(optimizer, '_evaluations', None)
+
+        result = optimizer.grid_search({'lookback': [3, 5], 'threshold': []}, 'SPY', START, END,
+                                       verbose=False)
+
+        assert not result['success'] and result['tested'] == 0
+        assert result['failure_summary'] == {'empty_grid': 1}
+        assert 'threshold' in result['error']
+
+    @pytest.mark.parametrize('n_iterations', [0, -3])
+    def test_non_positive_iterations_run_nothing(self, close_data, n_iterations):
+        """random_search with no iterations returns an empty result instead of raising"""
+        result = StrategyOptimizer(LookbackStrategy).random_search(
+            {'lookback': (3, 5)}, 'SPY', START, END, n_iterations=n_iterations, data=close_data, verbose=False)
+
+        assert not result['success'] and result['tested'] == 0
+
+    def test_combination_at_matches_product_order(self):
+        """Mixed-radix decoding reproduces itertools.product"""
+        from itertools import product
+        from strategy_optimizer import _combination_at
+
+        param_values = [[1, 2, 3], ['a', 'b'], [0.1, 0.2, 0.3, 0.4]]
+        sizes = [len(v) for v in param_values]
+        expected = list(product(*param_values))
+
+        assert [_combination_at(param_values, sizes, i) for i in range(len(expected))] == expected
+
+    def test_sampled_grid_is_deterministic_subset(self, close_data):
+        """Oversized grids sample max_combinations distinct combinations per seed"""
+        grid = {'lookback': list(range(2, 30)), 'threshold': [0.2, 0.4, 0.6, 0.8]}
+        runs = [StrategyOptimizer(LookbackStrategy).grid_search(
+                    grid, 'SPY', START, END, max_combinations=15, data=close_data, verbose=False)
+                for _ in range(2)]
+
+        assert runs[0]['tested'] == 15
+        assert TestParallelSearch._summary(runs[0]) == TestParallelSearch._summary(runs[1])
+        assert any('sampling 15' in w for w in runs[0]['warnings'])
+
+    @pytest.mark.parametrize('n', [10, 1000, 10**12, 2**63 - 1, 2**63, 10**20])
+    def test_floyd_sample_distinct_in_range(self, n):
+        """Floyd sampling draws k distinct indices below n, deterministically per seed"""
+        from strategy_optimizer import _floyd_sample
+
+        k = min(n, 25)
+        picks = _floyd_sample(n, k, np.random.default_rng(9))
+
+        assert len(picks) == k
+        assert all(0 <= idx < n for idx in picks)
+        assert picks == _floyd_sample(n, k, np.random.default_rng(9))
+
+    def test_astronomical_grid_is_sampled(self, monkeypatch):
+        """A 10**20-combination grid samples max_combinations without enumerating it"""
+        monkeypatch.setattr(FixedStrategy, 'trades', _tuple_trades([100, 101, 102, 99]))
+        grid = {f'p{i}': list(range(10)) for i in range(20)}
+
+        result = StrategyOptimizer(FixedStrategy, metric='win_rate').grid_search(
+            grid, 'SPY', START, END, max_combinations=6, data=pd.DataFrame(), verbose=False)
+
+        assert result['tested'] == 6
+        assert len({tuple(r['params'].values()) for r in result['all_results']}) == 6
+
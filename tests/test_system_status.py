@@ -0,0 +1,136 @@
+"""
+Test system_status.py: platform readiness checks
+"""
+
+import sys
+import time
+
+import pytest
+
+import system_status
+from system_status import SystemStatus, _defines_method, _module_available
+
+
+class TestCheckImports:
+    """Test module availability checks"""
+
+    def test_shallow_check_does_not_import(self, monkeypatch):
+        """Modules are located without being executed unless deep=True"""
+        monkeypatch.delitem(sys.modules, 'json.tool', raising=False)
+
+        assert _module_available('json.tool')
+        assert 'json.tool' not in sys.modules
+        assert not _module_available('no_such_module_xyz')
+        assert not _module_available('no_such_module_xyz.sub')
+
+        assert _module_available('json.tool', deep=True)
+        assert 'json.tool' in sys.modules
+
+    def test_missing_required_fails_optional_warns(self, monkeypatch):
+        """Missing required packages fail the check; missing optional ones only warn"""
+        present = {'pandas', 'numpy', 'yfinance', 'sklearn', 'optuna'}
+        monkeypatch.setattr(system_status, '_module_available',
+                            lambda module, deep=False: module in present)
+
+        status = SystemStatus()
+        status.check_imports()
+
+        assert status.checks_failed == ['✗ xgboost (required)']
+        assert len(status.warnings) == 1 and 'QuantLib' in status.warnings[0]
+        assert len(status.checks_passed) == 5
+
+
+class TestRunChecks:
+    """Test concurrent execution of the checks"""
+
+    def test_results_merged_in_check_order(self, monkeypatch):
+        """Checks overlap in time but their results are reported in declaration order"""
+        def make_check(name, delay):
+            def check(self):
+                time.sleep(delay)
+                self.checks_passed.append(name)
+                if name == 'check_files':
+                    self.warnings.append('warn')
+            return check
+
+        for i, name in enumerate(SystemStatus.CHECKS):
+            monkeypatch.setattr(SystemStatus, name, make_check(name, 0.3 - 0.05 * i))
+
+        status = SystemStatus()
+        started = time.monotonic()
+        status.run_checks_concurrently()
+
+        assert time.monotonic() - started < 0.9
+        assert status.checks_passed == list(SystemStatus.CHECKS)
+        assert status.warnings == ['warn'] and status.checks_failed == []
+
+    def test_output_printed_in_check_order(self, monkeypatch, capsys):
+        """Each check's printed lines appear together, in declaration order"""
+        def make_check(name, delay):
+            def check(self):
+                print(f"start {name}")
+                time.sleep(delay)
+                print(f"end {name}")
+            return check
+
+        for i, name in enumerate(SystemStatus.CHECKS):
+            monkeypatch.setattr(SystemStatus, name, make_check(name, 0.2 - 0.03 * i))
+
+        SystemStatus().run_checks_concurrently()
+
+        expected = [line for name in SystemStatus.CHECKS for line in (f"start {name}", f"end {name}")]
+        assert capsys.readouterr().out.splitlines() == expected
+
+
+class TestFileChecks:
+    """Test the file, directory and JSON checks"""
+
+    def test_checks_against_working_directory(self, tmp_path, monkeypatch):
+        """Present files pass, missing ones fail or are created, corrupt JSON warns"""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / 'ml_strategy.py').write_text('')
+        (tmp_path / 'results').mkdir()
+        (tmp_path / 'settings.json').write_text('{"default_capital": 5}')
+        (tmp_path / 'portfolios.json').write_text('{not json')
+
+        status = SystemStatus()
+        status.check_files()
+        status.check_data_directories()
+        status.check_json_files()
+
+        assert '✓ ml_strategy.py' in status.checks_passed
+        assert '✗ simple_strategy.py missing' in status.checks_failed
+        assert '✓ results/' in status.checks_passed and '✓ saved_strategies/ (created)' in status.checks_passed
+        assert (tmp_path / 'saved_strategies').is_dir()
+        assert '✓ settings.json' in status.checks_passed
+        assert '✓ watchlists.json (created)' in status.checks_passed
+        assert status.warnings == ['⚠ portfolios.json (corrupted, will backup)']
+
+
+class TestCheckStrategies:
+    """Test the strategy class checks"""
+
+    @pytest.mark.parametrize('deep', [False, True])
+    def test_backtest_methods_found(self, deep):
+        """Every shipped strategy class defines backtest"""
+        status = SystemStatus(deep=deep)
+        status.check_strategies()
+
+        assert status.checks_failed == []
+        assert len(status.checks_passed) == 4
+
+    def test_static_check_does_not_import(self, tmp_path, monkeypatch):
+        """The default check parses source and never runs it"""
+        (tmp_path / 'fake_strategy_mod.py').write_text(
+            "raise RuntimeError('executed')\n"
+            "class Good:\n    def backtest(self):\n        pass\n"
+            "class Bad:\n    backtest = None\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        assert _defines_method('fake_strategy_mod', 'Good', 'backtest')
+        assert not _defines_method('fake_strategy_mod', 'Bad', 'backtest')
+        assert 'fake_strategy_mod' not in sys.modules
+        with pytest.raises(ImportError):
+            _defines_method('fake_strategy_mod', 'Missing', 'backtest')
+        with pytest.raises(ImportError):
+            _defines_method('no_such_module_xyz', 'Good', 'backtest')